@@ -3,13 +3,20 @@
 #Functional programming emphasizes pure functions that don't modify input data and have no side effects.
 #Each function takes habit objects or lists and returns computed results without altering original state.
 
+# bisect finds the ends of a date range in a sorted history
+from bisect import bisect_left
+# datetime module provides the single "now" shared by one analytics run
+from datetime import date, datetime, time
 # typing module helps with type hints for better code documentation
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Tuple
 # Import the Habit class from habit module
-from habit import Habit
+from habit import Habit, expected_periods
+from history import DAY_US, to_micros
+from metrics import timed
 
 # Basic habit information 
 
+@timed("analytics.list_habit_title")
 def list_habit_title(habits: List[Habit]) -> List[str]:
     """
     Return the names of all habits.
@@ -17,6 +24,7 @@ def list_habit_title(habits: List[Habit]) -> List[str]:
     return [habit.title for habit in habits]
 
 
+@timed("analytics.filter_by_frequency")
 def filter_by_frequency(habits: List[Habit], target_frequency: str) -> List[Habit]:
     """
     Select habits matching a certain frequency ("daily", "weekly").
@@ -26,6 +34,7 @@ def filter_by_frequency(habits: List[Habit], target_frequency: str) -> List[Habi
 
 # Streak related calculations
 
+@timed("analytics.largest_streak")
 def largest_streak(habits: List[Habit]) -> int:
     """
     Return the largest streak value across all habits.
@@ -35,6 +44,7 @@ def largest_streak(habits: List[Habit]) -> int:
     return max(habit.calculate_current_streak() for habit in habits)
 
 
+@timed("analytics.largest_streak_for_habit")
 def largest_streak_for_habit(habit: Habit) -> int:
     """
     Return the current streak for a single habit.
@@ -44,6 +54,7 @@ def largest_streak_for_habit(habit: Habit) -> int:
 # Completion rate calculations
 
 
+@timed("analytics.completion_rates")
 def completion_rates(habits: List[Habit]) -> Dict[str, float]:
     """
     Return a dictionary mapping habit names -> completion rate (0.0 to 1.0).
@@ -51,18 +62,21 @@ def completion_rates(habits: List[Habit]) -> Dict[str, float]:
     return {habit.title: habit.completion_rate() for habit in habits}
 
 
+@timed("analytics.average_completion_rate")
 def average_completion_rate(habits: List[Habit]) -> float:
     """
     Compute the mean completion rate for all habits.
     """
     if not habits:
         return 0.0
-    rates = [habit.completion_rate() for habit in habits]
+    now = datetime.now()
+    rates = [habit.completion_rate(now) for habit in habits]
     return sum(rates) / len(rates) if rates else 0.0
 
 
 # Ranking & comparison
 
+@timed("analytics.rank_by_streak")
 def rank_by_streak(habits: List[Habit]) -> List[Habit]:
     """
     Return habits sorted from highest streak to lowest streak.
@@ -72,6 +86,7 @@ def rank_by_streak(habits: List[Habit]) -> List[Habit]:
 
 # Broken habit analytics
 
+@timed("analytics.broken_habits")
 def broken_habits(habits: List[Habit]) -> List[Habit]:
     """
     Return a list of habits that were ever broken.
@@ -79,6 +94,7 @@ def broken_habits(habits: List[Habit]) -> List[Habit]:
     return [habit for habit in habits if habit.broken()]
 
 
+@timed("analytics.unbroken_habits")
 def unbroken_habits(habits: List[Habit]) -> List[Habit]:
     """
     Return a list of habits that were never broken.
@@ -86,25 +102,171 @@ def unbroken_habits(habits: List[Habit]) -> List[Habit]:
     return [habit for habit in habits if not habit.broken()]
 
 
+# Per-habit statistics
+
+@timed("analytics.habit_statistics")
+def habit_statistics(habit: Habit, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Compute every per-habit figure in one forward pass over the (sorted) history.
+
+    Returns current_streak, longest_streak, broken, total_completed_days,
+    completion_count, last_completion and completion_rate.
+    """
+    completions = habit.history.micros
+    period = habit.period_length()
+
+    # Gaps are measured from the creation date first, exactly like Habit.broken()
+    checkpoint = to_micros(habit.start_date)
+    broken = not completions
+    run = longest = days = 0
+    previous = previous_day = None
+
+    for completion in completions:
+        if completion - checkpoint > period:
+            broken = True
+        # A run of completions close enough together is a streak
+        run = run + 1 if previous is not None and completion - previous <= period else 1
+        if run > longest:
+            longest = run
+        day = completion // DAY_US
+        if day != previous_day:
+            days += 1
+            previous_day = day
+        checkpoint = previous = completion
+
+    return {
+        "current_streak": run,
+        "longest_streak": longest,
+        "broken": broken,
+        "total_completed_days": days,
+        "completion_count": len(completions),
+        "last_completion": habit.history.last(),
+        "completion_rate": habit.completion_rate(now),
+    }
+
+
 # Summary
 
+@timed("analytics.summary_and_statistics")
+def summary_and_statistics(habits: List[Habit]) -> Tuple[Dict[str, Optional[float]], Dict[str, Dict[str, Any]]]:
+    """
+    Build the overall summary and the per-habit statistics it was derived from,
+    touching each history exactly once.
+    """
+    now = datetime.now()
+    statistics = {habit.title: habit_statistics(habit, now) for habit in habits}
+
+    rates = [stats["completion_rate"] for stats in statistics.values()]
+    broken_count = sum(1 for stats in statistics.values() if stats["broken"])
+    summary = {
+        "total_habits": len(habits),
+        "strongest_streak": max((stats["current_streak"] for stats in statistics.values()), default=0),
+        "average_completion_rate": sum(rates) / len(rates) if rates else 0.0,
+        "broken_habits": broken_count,
+        "unbroken_habits": len(habits) - broken_count,
+    }
+    return summary, statistics
+
+
+@timed("analytics.overall_summary")
 def overall_summary(habits: List[Habit]) -> Dict[str, Optional[float]]:
     """
     Provide a global analytical summary of the entire habit list.
     """
+    summary, _ = summary_and_statistics(habits)
+    return summary
+
+
+# Fast path over maintained statistics
+# These take the title -> statistics mapping of DatabaseHandler.load_habit_stats(),
+# so they cost O(habits) and never touch a completion history.
+
+@timed("analytics.completion_rates_from_stats")
+def completion_rates_from_stats(stats: Dict[str, Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, float]:
+    """
+    Return a dictionary mapping habit names -> completion rate (0.0 to 1.0).
+    """
+    if now is None:
+        now = datetime.now()
     return {
-        "total_habits": len(habits),
-        "strongest_streak": largest_streak(habits),
-        "average_completion_rate": average_completion_rate(habits),
-        "broken_habits": len(broken_habits(habits)),
-        "unbroken_habits": len(unbroken_habits(habits)),
+        title: min(row["completion_count"] / expected_periods(row["frequency"], row["start_date"], now), 1.0)
+        for title, row in stats.items()
     }
 
 
+@timed("analytics.overall_summary_from_stats")
+def overall_summary_from_stats(stats: Dict[str, Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, Optional[float]]:
+    """
+    Provide the same global summary as overall_summary from maintained statistics.
+    """
+    rates = list(completion_rates_from_stats(stats, now).values())
+    broken_count = sum(1 for row in stats.values() if row["broken"])
+    return {
+        "total_habits": len(stats),
+        "strongest_streak": max((row["current_streak"] for row in stats.values()), default=0),
+        "average_completion_rate": sum(rates) / len(rates) if rates else 0.0,
+        "broken_habits": broken_count,
+        "unbroken_habits": len(stats) - broken_count,
+    }
 
 
+# Time ranges
+# start and end are inclusive dates. With a storage that keeps rollups
+# (DatabaseHandler.completions_between / completed_days_between) a range costs
+# O(weeks in range) whatever the number of completions; otherwise the sorted
+# history is searched directly.
 
+def _range_micros(start: date, end: date) -> Tuple[int, int]:
+    """
+    Epoch microseconds of the first instant of start and of the day after end.
+    """
+    return to_micros(datetime.combine(start, time())), to_micros(datetime.combine(end, time())) + DAY_US
 
 
+@timed("analytics.completions_between")
+def completions_between(habit: Habit, start: date, end: date, storage: Any = None) -> int:
+    """
+    Number of completions of a habit on the days start..end.
+    """
+    if storage is not None and hasattr(storage, "completions_between"):
+        return storage.completions_between(habit.title, start, end)
+    if end < start:
+        return 0
+    completions = habit.history.micros
+    low, high = _range_micros(start, end)
+    return bisect_left(completions, high) - bisect_left(completions, low)
 
 
+@timed("analytics.total_completed_days_between")
+def total_completed_days_between(habit: Habit, start: date, end: date, storage: Any = None) -> int:
+    """
+    Number of distinct days in start..end on which a habit was completed.
+    """
+    if storage is not None and hasattr(storage, "completed_days_between"):
+        return storage.completed_days_between(habit.title, start, end)
+    if end < start:
+        return 0
+    completions = habit.history.micros
+    low, high = _range_micros(start, end)
+    days = 0
+    previous_day = None
+    for index in range(bisect_left(completions, low), bisect_left(completions, high)):
+        day = completions[index] // DAY_US
+        if day != previous_day:
+            days += 1
+            previous_day = day
+    return days
+
+
+@timed("analytics.completion_rate_between")
+def completion_rate_between(habit: Habit, start: date, end: date, storage: Any = None) -> float:
+    """
+    Completions in start..end divided by the periods expected in that range (0.0 to 1.0).
+    Days before the habit was created are not expected, so a range covering the whole
+    life of a habit gives the same rate as Habit.completion_rate().
+    """
+    first = max(start, habit.start_date.date())
+    if end < first:
+        return 0.0
+    expected = expected_periods(habit.frequency, datetime.combine(first, time()), datetime.combine(end, time()))
+    return min(completions_between(habit, first, end, storage) / expected, 1.0)
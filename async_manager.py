@@ -0,0 +1,192 @@
+#Asyncio front end for the Habit Tracking App.
+#SQLite connections may only be used from the thread that created them, so every
+#storage call and every manager operation runs on one dedicated executor thread.
+#Coroutines await that thread instead of blocking the event loop, which lets many
+#request handlers share one process. The synchronous DatabaseHandler and HabitManager
+#are used unchanged underneath.
+
+# Import necessary built in modules
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+# Import custom modules
+from habit import Habit
+from manager import HabitManager
+from storage import DatabaseHandler
+
+
+class AsyncDatabaseHandler:
+    """
+    Awaitable wrapper around a DatabaseHandler that owns a single worker thread.
+    Each method awaits the DatabaseHandler method of the same name.
+    Create it with ``await AsyncDatabaseHandler.open(path)``.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="habit-storage")
+        self.handler: Optional[DatabaseHandler] = None
+
+
+    @classmethod
+    async def open(cls, db_path: str = "habits.db", **options) -> "AsyncDatabaseHandler":
+        """
+        Opens the database on the worker thread. Options are passed to DatabaseHandler.
+        """
+        storage = cls()
+        storage.handler = await storage.run(DatabaseHandler, db_path, **options)
+        return storage
+
+
+    async def run(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Runs any callable on the storage thread and returns its result.
+        Use it for work that touches the connection or objects owned by it.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+
+    async def save_habit(self, habit: Habit) -> bool:
+        return await self.run(self.handler.save_habit, habit)
+
+
+    async def load_habits(self) -> List[Habit]:
+        return await self.run(self.handler.load_habits)
+
+
+    async def record_completion(self, habit_title: str, time: Optional[datetime] = None) -> bool:
+        return await self.run(self.handler.record_completion, habit_title, time)
+
+
+    async def record_completions(self, events: Iterable[Tuple[str, datetime]]) -> int:
+        return await self.run(self.handler.record_completions, events)
+
+
+    async def delete_habit(self, habit_title: str) -> bool:
+        return await self.run(self.handler.delete_habit, habit_title)
+
+
+    async def flush(self):
+        await self.run(self.handler.flush)
+
+
+    async def close(self):
+        """
+        Closes the connection and stops the worker thread.
+        """
+        await self.run(self.handler.close)
+        self._executor.shutdown(wait=True)
+
+
+class AsyncHabitManager:
+    """
+    Awaitable counterpart of HabitManager.
+
+    The wrapped HabitManager lives on the storage thread, so its in-memory state and its
+    connection are only ever touched by that one thread. Habit objects returned to the
+    caller are the live objects; treat them as read-only.
+    Each method awaits the HabitManager method of the same name.
+    Create it with ``await AsyncHabitManager.open(path)``.
+    """
+
+    def __init__(self, storage: AsyncDatabaseHandler, manager: HabitManager):
+        self.storage = storage
+        self.manager = manager
+
+
+    @classmethod
+    async def open(cls, database_path: str = "habits.db", **options) -> "AsyncHabitManager":
+        """
+        Opens the database and loads all habits without blocking the event loop.
+        """
+        storage = await AsyncDatabaseHandler.open(database_path, **options)
+        manager = await storage.run(HabitManager, storage=storage.handler)
+        return cls(storage, manager)
+
+
+    async def _call(self, method: str, *args) -> Any:
+        """
+        Calls a HabitManager method on the storage thread.
+        """
+        return await self.storage.run(getattr(self.manager, method), *args)
+
+
+    # Habit operations
+
+    async def create_habit(self, title: str, frequency: str) -> bool:
+        return await self._call("create_habit", title, frequency)
+
+
+    async def mark_habit_complete(self, title: str) -> bool:
+        return await self._call("mark_habit_complete", title)
+
+
+    async def record_completions(self, events: Iterable[Tuple[str, datetime]]) -> int:
+        return await self._call("record_completions", events)
+
+
+    async def delete_habit(self, title: str) -> bool:
+        return await self._call("delete_habit", title)
+
+
+    async def list_habits(self) -> List[Habit]:
+        return await self._call("list_habits")
+
+
+    async def get_habit_titles(self) -> List[str]:
+        return await self._call("get_habit_titles")
+
+
+    async def get_habit_by_title(self, title: str) -> Optional[Habit]:
+        return await self._call("get_habit_by_title", title)
+
+
+    async def refresh(self):
+        await self._call("refresh")
+
+
+    # Analytics
+
+    async def filter_by_frequency(self, frequency: str) -> List[Habit]:
+        return await self._call("filter_by_frequency", frequency)
+
+
+    async def largest_streak(self) -> int:
+        return await self._call("largest_streak")
+
+
+    async def largest_streak_for_habit(self, title: str) -> Optional[int]:
+        return await self._call("largest_streak_for_habit", title)
+
+
+    async def broken_habits(self) -> List[Habit]:
+        return await self._call("broken_habits")
+
+
+    async def get_unbroken_habits(self) -> List[Habit]:
+        return await self._call("get_unbroken_habits")
+
+
+    async def get_completion_rates(self) -> Dict[str, float]:
+        return await self._call("get_completion_rates")
+
+
+    async def get_average_completion_rate(self) -> float:
+        return await self._call("get_average_completion_rate")
+
+
+    async def get_habits_ranked_by_streak(self) -> List[Habit]:
+        return await self._call("get_habits_ranked_by_streak")
+
+
+    async def summary(self):
+        return await self._call("summary")
+
+
+    async def close(self):
+        """
+        Closes the manager's storage and stops its worker thread.
+        """
+        await self.storage.close()
@@ -0,0 +1,339 @@
+# Benchmark module for the Habit Tracking App.
+# Builds a synthetic SQLite database and times how long it takes to load it.
+# Run it directly:  python benchmark.py --habits 10000 --completions 1000
+#
+# With --suite it times loading, writes, exports, HabitManager construction and every
+# analytics_module function at several scales, and can save the results as a JSON
+# baseline or compare against one:
+#   python benchmark.py --suite --scales 100x50 1000x200 --save-baseline baseline.json
+#   python benchmark.py --suite --scales 100x50 1000x200 --baseline baseline.json
+# The comparison exits with status 1 when an operation got slower than the threshold.
+
+# Import necessary built in modules
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple
+# Import custom modules
+import analytics_module as analytics
+import exporter
+from habit import Habit
+from manager import HabitManager
+from storage import DatabaseHandler, TIMESTAMP_FORMATS
+
+# Every synthetic habit starts here, so generated data does not depend on the current date
+GENERATOR_START = datetime(2020, 1, 1, 8, 0)
+
+
+def generate_completions(frequency: str, count: int, generator: random.Random) -> Iterator[datetime]:
+    """
+    Yield count completion times with realistic gaps: usually one period apart with a few
+    hours of jitter, sometimes a missed period or two, and now and then a second
+    completion on the same day.
+    """
+    period = timedelta(days=1) if frequency == "daily" else timedelta(weeks=1)
+    moment = GENERATOR_START
+    for _ in range(count):
+        roll = generator.random()
+        if roll < 0.05:
+            moment += timedelta(hours=generator.randint(1, 4))
+        else:
+            skipped = generator.randint(2, 3) if roll < 0.15 else 1
+            moment += period * skipped + timedelta(minutes=generator.randint(-180, 180))
+        yield moment
+
+
+def generate_dataset(habit_count: int, completions_per_habit: int,
+                     seed: int = 0) -> Iterator[Tuple[str, str, List[datetime]]]:
+    """
+    Deterministically yield (title, frequency, completions) for habit_count habits;
+    two out of three habits are daily, the rest weekly.
+    """
+    generator = random.Random(seed)
+    for index in range(habit_count):
+        frequency = "weekly" if index % 3 == 2 else "daily"
+        yield f"habit-{index}", frequency, list(generate_completions(frequency, completions_per_habit, generator))
+
+
+def build_database(db_path: str, habit_count: int, completions_per_habit: int, seed: int = 0):
+    """
+    Fill a fresh database with habit_count habits, each with completions_per_habit completions.
+    """
+    storage = DatabaseHandler(db_path)
+    dataset = list(generate_dataset(habit_count, completions_per_habit, seed))
+
+    storage.cursor.executemany(
+        "INSERT INTO habits (title, frequency, start_date) VALUES (?, ?, ?)",
+        ((title, frequency, GENERATOR_START.isoformat()) for title, frequency, _ in dataset)
+    )
+    # Completions are interleaved across habits, like real usage over time
+    storage.cursor.executemany(
+        "INSERT INTO habit_history (habit_id, completion_time) VALUES (?, ?)",
+        (
+            (habit_id, completions[position].isoformat())
+            for position in range(completions_per_habit)
+            for habit_id, (_, _, completions) in enumerate(dataset, start=1)
+        )
+    )
+    storage.connection.commit()
+    storage.close()
+
+
+def load_habits_per_row(storage: DatabaseHandler) -> List[Habit]:
+    """
+    The previous loader: one history query per habit (N+1 queries), kept for comparison.
+    """
+    storage.cursor.execute("SELECT id, title, frequency, start_date FROM habits")
+    habits: List[Habit] = []
+
+    for habit_id, title, frequency, start_date_str in storage.cursor.fetchall():
+        habit = Habit(title=title, frequency=frequency)
+        habit.start_date = datetime.fromisoformat(start_date_str)
+        storage.cursor.execute(
+            "SELECT completion_time FROM habit_history WHERE habit_id = ?",
+            (habit_id,)
+        )
+        for (time_str,) in storage.cursor.fetchall():
+            habit.history.append(datetime.fromisoformat(time_str))
+        habits.append(habit)
+
+    return habits
+
+
+def load_and_decode(storage: DatabaseHandler) -> List[Habit]:
+    """
+    Load every habit and force its (lazily decoded) history into datetimes.
+    """
+    habits = storage.load_habits()
+    for habit in habits:
+        len(habit.history)
+    return habits
+
+
+def time_call(function: Callable, *args) -> float:
+    """
+    Return the wall-clock seconds a single call takes.
+    """
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def best_of(repeat: int, function: Callable, setup: Callable = None) -> float:
+    """
+    Return the fastest of repeat timed calls; setup() runs untimed before each call
+    and its result is passed to function.
+    """
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        started = time.perf_counter()
+        function(argument) if setup is not None else function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def fresh_habits(storage: DatabaseHandler) -> Callable[[], List[Habit]]:
+    """
+    Setup for analytics timings: fully decoded habits with empty streak caches,
+    so every run measures the real computation.
+    """
+    def setup():
+        return load_and_decode(storage)
+    return setup
+
+
+# Every analytics_module function, called the way HabitManager calls it
+ANALYTICS = {
+    "list_habit_title": analytics.list_habit_title,
+    "filter_by_frequency": lambda habits: analytics.filter_by_frequency(habits, "daily"),
+    "largest_streak": analytics.largest_streak,
+    "largest_streak_for_habit": lambda habits: analytics.largest_streak_for_habit(habits[0] if habits else None),
+    "completion_rates": analytics.completion_rates,
+    "average_completion_rate": analytics.average_completion_rate,
+    "rank_by_streak": analytics.rank_by_streak,
+    "broken_habits": analytics.broken_habits,
+    "unbroken_habits": analytics.unbroken_habits,
+    "habit_statistics": lambda habits: [analytics.habit_statistics(habit) for habit in habits],
+    "overall_summary": analytics.overall_summary,
+}
+
+
+def benchmark_scale(directory: str, habit_count: int, completions_per_habit: int,
+                    repeat: int = 3, writes: int = 200, seed: int = 0) -> Dict[str, float]:
+    """
+    Time every benchmarked operation on one synthetic database; returns seconds per operation.
+    record_completion is reported per call.
+    """
+    db_path = os.path.join(directory, f"suite-{habit_count}x{completions_per_habit}.db")
+    build_database(db_path, habit_count, completions_per_habit, seed)
+    results: Dict[str, float] = {}
+
+    storage = DatabaseHandler(db_path)
+    results["load_habits"] = best_of(repeat, lambda: load_and_decode(storage))
+    results["load_habit_stats"] = best_of(repeat, storage.load_habit_stats)
+    for name, function in ANALYTICS.items():
+        results[f"analytics.{name}"] = best_of(repeat, function, fresh_habits(storage))
+    stats = storage.load_habit_stats()
+    results["analytics.overall_summary_from_stats"] = best_of(
+        repeat, lambda: analytics.overall_summary_from_stats(stats)
+    )
+    for file_format in exporter.FORMATS:
+        results[f"export.{file_format}"] = time_export(db_path, directory, file_format, repeat)
+
+    # Writes go last, so they do not change the data the reads above were timed on
+    titles = [f"habit-{index}" for index in range(min(habit_count, writes))]
+    if titles:
+        moment = datetime.now()
+        started = time.perf_counter()
+        for index in range(writes):
+            storage.record_completion(titles[index % len(titles)], moment)
+        results["record_completion"] = (time.perf_counter() - started) / writes
+    storage.close()
+
+    results["HabitManager"] = best_of(repeat, lambda: HabitManager(db_path).close())
+    results["HabitManager(lazy)"] = best_of(repeat, lambda: HabitManager(db_path, lazy=True).close())
+    os.remove(db_path)
+    return results
+
+
+def time_export(db_path: str, directory: str, file_format: str, repeat: int = 1) -> float:
+    """
+    Best time of exporting every completion of a database in one format.
+    """
+    out_path = os.path.join(directory, f"export.{file_format}")
+    seconds = best_of(repeat, lambda: exporter.export_database(db_path, out_path, file_format))
+    os.remove(out_path)
+    return seconds
+
+
+def run_suite(scales: List[Tuple[int, int]], repeat: int = 3, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """
+    Run benchmark_scale for every (habits, completions) scale; keys are "<habits>x<completions>".
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for habit_count, completions_per_habit in scales:
+            results[f"{habit_count}x{completions_per_habit}"] = benchmark_scale(
+                directory, habit_count, completions_per_habit, repeat, seed=seed
+            )
+    return results
+
+
+def compare_results(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]],
+                    threshold: float = 0.25, min_delta: float = 0.0005) -> List[Tuple[str, str, float, float]]:
+    """
+    Return (scale, operation, baseline seconds, current seconds) for every operation that
+    is more than threshold (a fraction) slower than the baseline. Differences below
+    min_delta seconds are treated as timer noise.
+    """
+    regressions = []
+    for scale, operations in current.items():
+        for operation, seconds in operations.items():
+            previous = baseline.get(scale, {}).get(operation)
+            if previous is None:
+                continue
+            if seconds > previous * (1 + threshold) and seconds - previous > min_delta:
+                regressions.append((scale, operation, previous, seconds))
+    return regressions
+
+
+def parse_scale(text: str) -> Tuple[int, int]:
+    """
+    Parse a "<habits>x<completions>" scale argument.
+    """
+    habits, _, completions = text.lower().partition("x")
+    try:
+        return int(habits), int(completions)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected <habits>x<completions>, got {text!r}")
+
+
+def run_suite_command(args) -> int:
+    """
+    Run the suite from the command line, print it, and save or compare a baseline.
+    """
+    results = run_suite(args.scales, args.repeat, args.seed)
+    for scale, operations in results.items():
+        print(f"\n{scale} (habits x completions)")
+        for operation, seconds in operations.items():
+            print(f"  {operation:<40} {seconds * 1000:10.3f} ms")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump({"python": sys.version.split()[0], "results": results}, handle, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+        regressions = compare_results(baseline, results, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for scale, operation, previous, seconds in regressions:
+                print(f"  {scale} {operation}: {previous * 1000:.3f} ms -> {seconds * 1000:.3f} ms")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark habit loading.")
+    parser.add_argument("--habits", type=int, default=10000)
+    parser.add_argument("--completions", type=int, default=1000)
+    parser.add_argument("--timestamp-format", choices=TIMESTAMP_FORMATS, default="iso",
+                        help="On-disk format of completion times.")
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="Do not time the per-habit (N+1) loader.")
+    parser.add_argument("--suite", action="store_true",
+                        help="Run the full suite (loads, writes, manager, analytics) instead.")
+    parser.add_argument("--scales", type=parse_scale, nargs="+", default=[(100, 50), (1000, 100), (1000, 1000)],
+                        help="Suite scales as <habits>x<completions>.")
+    parser.add_argument("--repeat", type=int, default=3, help="Suite runs per operation (best is kept).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generator.")
+    parser.add_argument("--save-baseline", help="Write suite results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare suite results against this JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Slowdown (fraction) that counts as a regression.")
+    parser.add_argument("--min-delta", type=float, default=0.001,
+                        help="Slowdowns smaller than this many seconds are ignored as noise.")
+    args = parser.parse_args()
+
+    if args.suite:
+        sys.exit(run_suite_command(args))
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        print(f"Building {args.habits} habits x {args.completions} completions ...")
+        build_database(db_path, args.habits, args.completions, args.seed)
+
+        storage = DatabaseHandler(db_path, timestamp_format=args.timestamp_format)
+        lazy = time_call(storage.load_habits)
+        print(f"load_habits (lazy):      {lazy:.3f}s")
+        bulk = time_call(load_and_decode, storage)
+        print(f"load_habits (decoded):   {bulk:.3f}s")
+        print(f"Database size:           {os.path.getsize(db_path) / 1e6:.1f} MB")
+
+        if not args.skip_legacy:
+            legacy = time_call(load_habits_per_row, storage)
+            print(f"load_habits (per habit): {legacy:.3f}s")
+            print(f"Speedup: {legacy / bulk:.1f}x")
+        storage.close()
+
+        rows = args.habits * args.completions
+        for file_format in exporter.FORMATS:
+            seconds = time_export(db_path, directory, file_format)
+            label = f"export ({file_format}):"
+            print(f"{label:<25}{seconds:.3f}s ({rows / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
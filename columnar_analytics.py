@@ -0,0 +1,270 @@
+#Columnar analytics engine for the Habit Tracking App.
+#Loads every completion of every habit into flat integer columns and answers the
+#fleet-wide questions of analytics_module with vectorized NumPy operations.
+#When NumPy is not installed, the same columns are processed with plain Python loops.
+#List results are habit titles (not Habit objects), because the columns can be
+#built straight from the database without creating any Habit.
+
+# Import built-in modules
+from array import array
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+# Import custom modules
+from habit import Habit
+from history import DAY_US, WEEK_US, to_micros
+from storage import DatabaseHandler, stored_to_micros
+
+# NumPy is optional: everything below falls back to pure Python without it
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+class ColumnarHabits:
+    """
+    A column-oriented snapshot of many habits.
+
+    Completions of habit i are completions[offsets[i]:offsets[i + 1]], sorted in time,
+    stored as epoch microseconds.
+    """
+
+    def __init__(self, titles: List[str], frequencies: List[str], start_micros: Sequence[int],
+                 offsets: Sequence[int], completions: array):
+        self.titles = titles
+        self.frequencies = frequencies
+        self.start_micros = start_micros
+        self.offsets = offsets
+        self.completions = completions
+
+
+    @classmethod
+    def from_habits(cls, habits: List[Habit]) -> "ColumnarHabits":
+        """
+        Builds the columns from loaded Habit objects (their histories are already sorted).
+        """
+        completions = array("q")
+        offsets = [0]
+        for habit in habits:
+            completions.extend(habit.history.micros)
+            offsets.append(len(completions))
+        return cls(
+            [habit.title for habit in habits],
+            [habit.frequency for habit in habits],
+            [to_micros(habit.start_date) for habit in habits],
+            offsets,
+            completions,
+        )
+
+
+    @classmethod
+    def from_database(cls, storage: DatabaseHandler) -> "ColumnarHabits":
+        """
+        Builds the columns straight from SQLite, without creating Habit objects.
+        """
+        titles: List[str] = []
+        frequencies: List[str] = []
+        start_micros: List[int] = []
+        positions: Dict[int, int] = {}
+        for habit_id, title, frequency, start_date in storage.connection.execute(
+            "SELECT id, title, frequency, start_date FROM habits ORDER BY id"
+        ):
+            positions[habit_id] = len(titles)
+            titles.append(title)
+            frequencies.append(frequency.lower())
+            start_micros.append(to_micros(datetime.fromisoformat(start_date)))
+
+        # One pass over the (habit_id, completion_time) index yields grouped, sorted rows
+        counts = [0] * len(titles)
+        completions = array("q")
+        convert = None if storage.timestamp_format == "epoch_us" else stored_to_micros
+        for habit_id, value in storage.connection.execute(
+            "SELECT habit_id, completion_time FROM habit_history ORDER BY habit_id, completion_time"
+        ):
+            position = positions.get(habit_id)
+            if position is None:
+                continue
+            counts[position] += 1
+            completions.append(value if convert is None else convert(value))
+
+        offsets = [0]
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        return cls(titles, frequencies, start_micros, offsets, completions)
+
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+
+# Core per-habit columns
+
+def _today_day(today: Optional[date]) -> int:
+    """
+    Day number (days since 1970-01-01) of today or of the given date.
+    """
+    today = today or datetime.now().date()
+    return to_micros(datetime(today.year, today.month, today.day)) // DAY_US
+
+
+def _numpy_columns(data: ColumnarHabits, today: int):
+    """
+    Computes (current streaks, broken flags, completion rates) with NumPy.
+    """
+    habit_count = len(data)
+    if habit_count == 0:
+        return [], [], []
+    offsets = np.asarray(data.offsets, dtype=np.int64)
+    counts = np.diff(offsets)
+    if len(data.completions):
+        # Shares memory with the array('q'), no copy
+        timestamps = np.frombuffer(data.completions, dtype=np.int64)
+    else:
+        timestamps = np.zeros(0, dtype=np.int64)
+    periods = np.where(np.asarray(data.frequencies) == "daily", DAY_US, WEEK_US)
+    starts = np.asarray(data.start_micros, dtype=np.int64)
+
+    streaks = np.zeros(habit_count, dtype=np.int64)
+    broken = counts == 0
+
+    if len(timestamps):
+        owner = np.repeat(np.arange(habit_count), counts)
+        gaps = np.diff(timestamps)
+        same_habit = owner[1:] == owner[:-1]
+        allowed = periods[owner[1:]]
+
+        # A completion continues the streak when it follows its predecessor closely enough;
+        # every other position (including the first of each habit) starts a new run
+        run_start = np.ones(len(timestamps), dtype=bool)
+        run_start[1:] = ~(same_habit & (gaps <= allowed))
+        positions = np.arange(len(timestamps))
+        latest_start = np.maximum.accumulate(np.where(run_start, positions, 0))
+
+        has_history = counts > 0
+        last = offsets[1:][has_history] - 1
+        streaks[has_history] = last - latest_start[last] + 1
+
+        # Broken: a late first completion or any too-long gap inside the history
+        first = offsets[:-1][has_history]
+        late_start = np.zeros(habit_count, dtype=bool)
+        late_start[has_history] = timestamps[first] - starts[has_history] > periods[has_history]
+        long_gaps = np.bincount(owner[1:][same_habit & (gaps > allowed)], minlength=habit_count) > 0
+        broken = broken | late_start | long_gaps
+
+    days = today - starts // DAY_US
+    expected = np.where(periods == DAY_US, days + 1, days // 7 + 1)
+    expected = np.maximum(expected, 1)
+    rates = np.minimum(counts / expected, 1.0)
+
+    return streaks.tolist(), broken.tolist(), rates.tolist()
+
+
+def _python_columns(data: ColumnarHabits, today: int):
+    """
+    Computes (current streaks, broken flags, completion rates) with plain loops.
+    """
+    completions = data.completions
+    offsets = data.offsets
+    streaks: List[int] = []
+    broken: List[bool] = []
+    rates: List[float] = []
+
+    for index, frequency in enumerate(data.frequencies):
+        period = DAY_US if frequency == "daily" else WEEK_US
+        begin, end = offsets[index], offsets[index + 1]
+        start = data.start_micros[index]
+
+        # Current streak: walk back from the latest completion
+        streak = 0
+        if end > begin:
+            reference = completions[end - 1]
+            for position in range(end - 1, begin - 1, -1):
+                if reference - completions[position] > period:
+                    break
+                streak += 1
+                reference = completions[position]
+        streaks.append(streak)
+
+        # Broken: walk forward from the start date
+        is_broken = end == begin
+        checkpoint = start
+        for position in range(begin, end):
+            if completions[position] - checkpoint > period:
+                is_broken = True
+                break
+            checkpoint = completions[position]
+        broken.append(is_broken)
+
+        days = today - start // DAY_US
+        expected = max(days + 1 if period == DAY_US else days // 7 + 1, 1)
+        rates.append(min((end - begin) / expected, 1.0))
+
+    return streaks, broken, rates
+
+
+def _columns(data: ColumnarHabits, today: Optional[date] = None):
+    """
+    Dispatches to the NumPy engine when available, otherwise to the pure-Python one.
+    """
+    day = _today_day(today)
+    if np is not None:
+        return _numpy_columns(data, day)
+    return _python_columns(data, day)
+
+
+# Analytics mirroring analytics_module
+
+def current_streaks(data: ColumnarHabits) -> Dict[str, int]:
+    """
+    Return a dictionary mapping habit names -> current streak.
+    """
+    streaks, _, _ = _columns(data)
+    return dict(zip(data.titles, streaks))
+
+
+def completion_rates(data: ColumnarHabits, today: Optional[date] = None) -> Dict[str, float]:
+    """
+    Return a dictionary mapping habit names -> completion rate (0.0 to 1.0).
+    """
+    _, _, rates = _columns(data, today)
+    return dict(zip(data.titles, rates))
+
+
+def largest_streak(data: ColumnarHabits) -> int:
+    """
+    Return the largest streak value across all habits.
+    """
+    streaks, _, _ = _columns(data)
+    return max(streaks, default=0)
+
+
+def broken_habits(data: ColumnarHabits) -> List[str]:
+    """
+    Return the titles of habits that were ever broken.
+    """
+    _, broken, _ = _columns(data)
+    return [title for title, is_broken in zip(data.titles, broken) if is_broken]
+
+
+def rank_by_streak(data: ColumnarHabits) -> List[str]:
+    """
+    Return habit titles sorted from highest streak to lowest (ties keep their order).
+    """
+    streaks, _, _ = _columns(data)
+    order = sorted(range(len(streaks)), key=streaks.__getitem__, reverse=True)
+    return [data.titles[index] for index in order]
+
+
+def overall_summary(data: ColumnarHabits, today: Optional[date] = None) -> Dict[str, Optional[float]]:
+    """
+    Provide the same global summary as analytics_module.overall_summary in one computation.
+    """
+    streaks, broken, rates = _columns(data, today)
+    broken_count = sum(broken)
+    return {
+        "total_habits": len(data),
+        "strongest_streak": max(streaks, default=0),
+        "average_completion_rate": sum(rates) / len(rates) if rates else 0.0,
+        "broken_habits": broken_count,
+        "unbroken_habits": len(data) - broken_count,
+    }
@@ -0,0 +1,262 @@
+# Export module for the Habit Tracking App.
+# Streams habits or their completions out of a database into CSV, JSONL or columnar files.
+# Run it directly:  python exporter.py completions.csv --db habits.db
+#                   python exporter.py habits.jsonl --db habits.db --habits
+#
+# Rows are read through a cursor in fetchmany() batches and written as they arrive, so
+# memory stays flat however large the database is. The database is opened read-only.
+#
+# CSV and JSONL completion files use the importer's layout ("title" and "timestamp"
+# columns), so they can be imported into another database with importer.py once the
+# habits exist there. Habit files hold "title", "frequency" and "start_date".
+#
+# Columnar files (.col) keep completions as raw 64-bit integer columns:
+#   MAGIC | header length (4 bytes, little-endian) | header (JSON) | chunk* | 0 (4 bytes)
+# The header lists the habits as [id, title, frequency, start date]; each chunk is its
+# row count (4 bytes) followed by the habit_id column and the completion_us column
+# (epoch microseconds), both in the header's byte order.
+
+# Import necessary built in modules
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, TextIO, Tuple, Union
+# Import custom modules
+from history import from_micros
+from metrics import timed
+from storage import read_only_uri, stored_to_micros
+
+MAGIC = b"HABITCOL"
+FORMAT_VERSION = 1
+FORMATS = ("csv", "jsonl", "columnar")
+
+# Completions in habit and time order; answered by walking idx_history_habit_time, so
+# SQLite never has to sort (or hold) the whole table
+COMPLETIONS_SQL = """
+    SELECT habits.title, habit_history.completion_time
+    FROM habits JOIN habit_history ON habit_history.habit_id = habits.id
+    ORDER BY habits.id, habit_history.completion_time
+"""
+COMPLETION_COLUMNS_SQL = """
+    SELECT habit_id, completion_time FROM habit_history ORDER BY habit_id, completion_time
+"""
+HABITS_SQL = "SELECT id, title, frequency, start_date FROM habits ORDER BY id"
+
+
+def open_database(db_path: str) -> sqlite3.Connection:
+    """
+    Open a database file read-only, so an export never locks out the app for writing.
+    """
+    return sqlite3.connect(read_only_uri(db_path), uri=True)
+
+
+def fetch_batches(connection: sqlite3.Connection, sql: str, chunk_size: int = 10000) -> Iterator[List[tuple]]:
+    """
+    Yield the rows of a query in lists of at most chunk_size rows.
+    """
+    cursor = connection.execute(sql)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def iso_timestamp(value: Union[int, str]) -> str:
+    """
+    A stored completion time as ISO-8601 text; ISO values are passed through unparsed.
+    """
+    if isinstance(value, int):
+        return from_micros(value).isoformat()
+    return value
+
+
+def iter_habits(connection: sqlite3.Connection, chunk_size: int = 10000) -> Iterator[Dict[str, str]]:
+    """
+    Yield every habit as a {"title", "frequency", "start_date"} dictionary.
+    """
+    for rows in fetch_batches(connection, HABITS_SQL, chunk_size):
+        for _, title, frequency, start_date in rows:
+            yield {"title": title, "frequency": frequency, "start_date": start_date}
+
+
+def iter_completions(connection: sqlite3.Connection, chunk_size: int = 10000) -> Iterator[Dict[str, str]]:
+    """
+    Yield every completion as a {"title", "timestamp"} dictionary, habit by habit in time order.
+    """
+    for rows in fetch_batches(connection, COMPLETIONS_SQL, chunk_size):
+        for title, completion_time in rows:
+            yield {"title": title, "timestamp": iso_timestamp(completion_time)}
+
+
+def iter_columnar_chunks(connection: sqlite3.Connection, chunk_size: int = 10000) -> Iterator[Dict[str, array]]:
+    """
+    Yield completions as {"habit_id", "completion_us"} columns of at most chunk_size values.
+    """
+    for rows in fetch_batches(connection, COMPLETION_COLUMNS_SQL, chunk_size):
+        yield {
+            "habit_id": array("q", [habit_id for habit_id, _ in rows]),
+            "completion_us": array("q", [stored_to_micros(value) for _, value in rows]),
+        }
+
+
+def write_csv(records: Iterator[Dict[str, str]], fields: Tuple[str, ...], handle: TextIO) -> int:
+    """
+    Write records as CSV with a header row; returns the number of records.
+    """
+    writer = csv.writer(handle)
+    writer.writerow(fields)
+    count = 0
+    for record in records:
+        writer.writerow([record[field] for field in fields])
+        count += 1
+    return count
+
+
+def write_jsonl(records: Iterator[Dict[str, str]], handle: TextIO) -> int:
+    """
+    Write records as JSON Lines; returns the number of records.
+    """
+    count = 0
+    for record in records:
+        handle.write(json.dumps(record, ensure_ascii=False))
+        handle.write("\n")
+        count += 1
+    return count
+
+
+def write_columnar(connection: sqlite3.Connection, handle, chunk_size: int = 10000) -> int:
+    """
+    Write every completion to a binary file handle in the columnar layout; returns the number of completions.
+    The habit list in the header is the only part whose size grows with the database (one entry per habit).
+    """
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "habits": [list(row) for rows in fetch_batches(connection, HABITS_SQL, chunk_size) for row in rows],
+    }).encode("utf-8")
+    handle.write(MAGIC)
+    handle.write(struct.pack("<I", len(header)))
+    handle.write(header)
+
+    count = 0
+    for columns in iter_columnar_chunks(connection, chunk_size):
+        handle.write(struct.pack("<I", len(columns["habit_id"])))
+        columns["habit_id"].tofile(handle)
+        columns["completion_us"].tofile(handle)
+        count += len(columns["habit_id"])
+    handle.write(struct.pack("<I", 0))
+    return count
+
+
+def read_columnar(path: str) -> Tuple[List[List[Any]], Iterator[Dict[str, array]]]:
+    """
+    Read a columnar export: returns its habit list and an iterator over its chunks,
+    which reads the file one chunk at a time.
+    Raises ValueError when the file is not a columnar export.
+    """
+    with open(path, "rb") as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar habit export")
+        (header_length,) = struct.unpack("<I", handle.read(4))
+        header = json.loads(handle.read(header_length))
+        offset = handle.tell()
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar export format: {header.get('format')!r}")
+
+    def chunks() -> Iterator[Dict[str, array]]:
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            while True:
+                (count,) = struct.unpack("<I", handle.read(4))
+                if count == 0:
+                    return
+                columns = {}
+                for name in ("habit_id", "completion_us"):
+                    column = array("q")
+                    column.fromfile(handle, count)
+                    if header["byteorder"] != sys.byteorder:
+                        column.byteswap()
+                    columns[name] = column
+                yield columns
+
+    return header["habits"], chunks()
+
+
+def detect_format(path: str) -> str:
+    """
+    Pick the export format from a file extension: .jsonl/.json, .col, otherwise CSV.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".json"):
+        return "jsonl"
+    if extension == ".col":
+        return "columnar"
+    return "csv"
+
+
+@timed("exporter.export_database")
+def export_database(db_path: str, out_path: str, file_format: str = "auto", habits: bool = False,
+                    chunk_size: int = 10000) -> int:
+    """
+    Export the completions (or, with habits=True, the habits) of a database file to out_path.
+    Returns the number of records written.
+    """
+    if file_format == "auto":
+        file_format = detect_format(out_path)
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {file_format!r}")
+    if file_format == "columnar" and habits:
+        raise ValueError("Columnar exports always hold completions; their header lists the habits")
+
+    connection = open_database(db_path)
+    try:
+        if file_format == "columnar":
+            with open(out_path, "wb") as handle:
+                return write_columnar(connection, handle, chunk_size)
+
+        if habits:
+            records, fields = iter_habits(connection, chunk_size), ("title", "frequency", "start_date")
+        else:
+            records, fields = iter_completions(connection, chunk_size), ("title", "timestamp")
+        with open(out_path, "w", newline="", encoding="utf-8") as handle:
+            if file_format == "jsonl":
+                return write_jsonl(records, handle)
+            return write_csv(records, fields, handle)
+    finally:
+        connection.close()
+
+
+def main():
+    """
+    Entry point for the export command.
+    """
+    parser = argparse.ArgumentParser(description="Export habits or completions to CSV, JSONL or columnar files.")
+    parser.add_argument("path", help="File to write.")
+    parser.add_argument("--db", default="habits.db", help="Database file to export from.")
+    parser.add_argument("--format", choices=("auto",) + FORMATS, default="auto",
+                        help="Output format (auto: by extension, .jsonl / .col / otherwise CSV).")
+    parser.add_argument("--habits", action="store_true",
+                        help="Export the habits instead of their completions (CSV or JSONL).")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="Rows fetched from the database at a time.")
+    args = parser.parse_args()
+
+    try:
+        written = export_database(args.db, args.path, args.format, args.habits, args.chunk_size)
+    except (sqlite3.Error, ValueError) as error:
+        print(f"⚠️  Export failed: {error}")
+        sys.exit(1)
+    print(f"✅ Exported {written} {'habits' if args.habits else 'completions'} to {args.path}.")
+
+
+if __name__ == "__main__":
+    main()
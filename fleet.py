@@ -0,0 +1,153 @@
+# Fleet report for the Habit Tracking App.
+# Summarizes many habits.db files (one per user) in parallel and merges the results.
+# Run it directly:  python fleet.py users/ --workers 8 --top 10
+#
+# Files are sharded across a ProcessPoolExecutor. Each worker opens its files read-only
+# and computes completion rates and streaks with sql_analytics, so no history is loaded
+# into Python and only small per-file results travel back to the parent process.
+
+# Import necessary built in modules
+import argparse
+import glob
+import heapq
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+# Import custom modules
+import sql_analytics
+from storage import read_only_uri
+
+
+def find_databases(paths: Iterable[str]) -> List[str]:
+    """
+    Expand directories into the *.db files they contain; other paths are kept as given.
+    """
+    databases: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            databases.extend(sorted(glob.glob(os.path.join(path, "*.db"))))
+        else:
+            databases.append(path)
+    return databases
+
+
+def summarize_database(path: str, today: Optional[date] = None, top: int = 10) -> Dict[str, Any]:
+    """
+    Compute overall_summary, completion_rates and the top streaks of one database file.
+    The file is opened read-only; a file that cannot be read is reported in "error".
+    """
+    result: Dict[str, Any] = {"path": path}
+    try:
+        connection = sqlite3.connect(read_only_uri(path), uri=True)
+        try:
+            rates = sql_analytics.completion_rates(connection, today)
+            streaks = sql_analytics.streak_statistics(connection)
+        finally:
+            connection.close()
+    except sqlite3.Error as error:
+        result["error"] = str(error)
+        return result
+
+    result["summary"] = sql_analytics.summarize(rates, streaks)
+    result["completion_rates"] = rates
+    result["top_streaks"] = heapq.nlargest(
+        top, ((stats["current_streak"], title) for title, stats in streaks.items())
+    )
+    return result
+
+
+def _summarize_shard(paths: List[str], today: Optional[date], top: int) -> List[Dict[str, Any]]:
+    """
+    Worker entry point: summarizes one shard of files.
+    """
+    return [summarize_database(path, today, top) for path in paths]
+
+
+def merge_results(results: Iterable[Dict[str, Any]], top: int = 10) -> Dict[str, Any]:
+    """
+    Merge per-file results into fleet-wide aggregates.
+
+    The global average rate is taken over all habits (not the mean of per-file averages),
+    and the top streaks are (streak, path, title) triples across all files.
+    """
+    files = habits = broken = 0
+    rate_total = 0.0
+    strongest = 0
+    top_streaks: List[Tuple[int, str, str]] = []
+    errors: Dict[str, str] = {}
+
+    for result in results:
+        if "error" in result:
+            errors[result["path"]] = result["error"]
+            continue
+        files += 1
+        summary = result["summary"]
+        habits += summary["total_habits"]
+        broken += summary["broken_habits"]
+        rate_total += sum(result["completion_rates"].values())
+        strongest = max(strongest, summary["strongest_streak"])
+        candidates = ((streak, result["path"], title) for streak, title in result["top_streaks"])
+        top_streaks = heapq.nlargest(top, top_streaks + list(candidates))
+
+    return {
+        "files": files,
+        "total_habits": habits,
+        "average_completion_rate": rate_total / habits if habits else 0.0,
+        "strongest_streak": strongest,
+        "broken_habits": broken,
+        "unbroken_habits": habits - broken,
+        "top_streaks": top_streaks,
+        "errors": errors,
+    }
+
+
+def fleet_report(paths: List[str], workers: Optional[int] = None, today: Optional[date] = None,
+                 top: int = 10, shard_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Summarize every database file in paths on a process pool and merge the results.
+
+    :param workers: Worker processes (default: CPU count); 0 runs everything in this process.
+    :param shard_size: Files per task; by default about four shards per worker, which keeps
+        the workers busy while amortizing the cost of each task hand-off.
+    """
+    today = today or date.today()
+    if workers == 0:
+        return merge_results(_summarize_shard(paths, today, top), top)
+
+    workers = workers or os.cpu_count() or 1
+    if shard_size is None:
+        shard_size = max(1, len(paths) // (workers * 4))
+    shards = [paths[index:index + shard_size] for index in range(0, len(paths), shard_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shard_results = executor.map(_summarize_shard, shards, [today] * len(shards), [top] * len(shards))
+        return merge_results((result for shard in shard_results for result in shard), top)
+
+
+def main():
+    """
+    Entry point for the fleet report.
+    """
+    parser = argparse.ArgumentParser(description="Summarize many habit databases in parallel.")
+    parser.add_argument("paths", nargs="+", help="Database files or directories of *.db files.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--top", type=int, default=10, help="How many top streaks to list.")
+    args = parser.parse_args()
+
+    report = fleet_report(find_databases(args.paths), args.workers, top=args.top)
+
+    print(f"Files:                   {report['files']}")
+    print(f"Habits:                  {report['total_habits']}")
+    print(f"Average completion rate: {report['average_completion_rate']:.1%}")
+    print(f"Broken / unbroken:       {report['broken_habits']} / {report['unbroken_habits']}")
+    print("Top streaks:")
+    for streak, path, title in report["top_streaks"]:
+        print(f"  {streak:>5}  {title}  ({path})")
+    for path, error in report["errors"].items():
+        print(f"⚠️  Skipped {path}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,25 @@
 # Import necessary built-in modules
 # datetime module provides classes for manipulating dates and times
 # We'll use it to track when habits are created and marked as completed
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 # typing module helps with type hints for better code documentation
-from typing import List, Optional
+from typing import Callable, Iterable, Optional, Sequence, Union
+# history module stores completions compactly and in sorted order
+from history import CompletionHistory, DAY_US, WEEK_US, to_micros
 
 
 
+# Number of periods a habit should have been completed in, shared with storage-backed analytics
+def expected_periods(frequency: str, start_date: datetime, now: datetime) -> int:
+    """
+    Number of days (daily) or weeks (weekly) from the start date up to now, at least 1.
+    """
+    days = (now.date() - start_date.date()).days
+    if frequency == 'daily':
+        return max(days + 1, 1)
+    return max(((days // 7) + 1), 1)
+
+
 # Define the Habit class to represent individual habits
 class Habit:
     """
@@ -16,6 +29,10 @@ class Habit:
     and helpful analysis like streaks, completion rate, last done date, etc.
     """
 
+    # Fixed attribute layout keeps large habit catalogues small in memory
+    __slots__ = ("title", "frequency", "start_date", "_history", "_encoded", "_decode",
+                 "_source", "_streak", "_streak_anchor", "_streak_version")
+
     def __init__(self, title: str, frequency: str):
         """
         Initializes a new Habit instance with basic information.
@@ -32,11 +49,97 @@ class Habit:
         # Record when this habit was first created
         self.start_date = datetime.now()
 
-        # Initialize storage for tracking history
-        self.history: List[datetime] = []
+        # Initialize storage for tracking history (always kept in chronological order)
+        self._history = CompletionHistory()
+
+        # Raw stored timestamps waiting to be decoded on first access
+        self._encoded: Optional[Sequence[Union[int, str]]] = None
+        self._decode: Optional[Callable[[Union[int, str]], int]] = None
+
+        # Optional loader that fetches the history from storage on demand (lazy mode);
+        # it must provide load(habit) -> CompletionHistory and touch(habit)
+        self._source = None
+
+        # Cached current streak, its latest completion (in microseconds) and the
+        # history version it was computed for; -1 forces a full recompute
+        self._streak = 0
+        self._streak_anchor = 0
+        self._streak_version = -1
+
+
+    @property
+    def history(self) -> CompletionHistory:
+        """
+        The completion history, decoding any stored timestamps on first access
+        and fetching it from the history source if it is not in memory.
+        """
+        if self._encoded is not None:
+            if self._decode is None:
+                self._history = CompletionHistory.from_sorted_micros(self._encoded)
+            else:
+                self._history = CompletionHistory.from_micros(map(self._decode, self._encoded))
+            self._encoded = None
+            self._decode = None
+            self._streak_version = -1
+        elif self._history is None:
+            self._history = self._source.load(self)
+            self._streak_version = -1
+        elif self._source is not None:
+            self._source.touch(self)
+        return self._history
+
+
+    @history.setter
+    def history(self, completions: Iterable[datetime]):
+        self._history = CompletionHistory(completions)
+        self._encoded = None
+        self._decode = None
+        self._streak_version = -1
+
+
+    def load_encoded_history(self, values: Sequence[Union[int, str]],
+                             decode: Optional[Callable[[Union[int, str]], int]] = None):
+        """
+        Replaces the history with raw stored values that are decoded only when first used.
 
+        :param values: Completion timestamps exactly as the storage layer read them.
+        :param decode: Function turning one stored value into epoch microseconds,
+            or None when the values already are epoch microseconds in chronological order.
+        """
+        self._history = CompletionHistory()
+        self._encoded = values
+        self._decode = decode
+        self._streak_version = -1
     
 
+    def set_history_source(self, source):
+        """
+        Switches the habit to lazy mode: the history is fetched through source.load(self)
+        on first access and may later be dropped again with unload_history().
+        """
+        self._source = source
+        self.unload_history()
+
+
+    @property
+    def history_loaded(self) -> bool:
+        """
+        Whether the history is currently held in memory.
+        """
+        return self._history is not None or self._encoded is not None
+
+
+    def unload_history(self):
+        """
+        Releases the in-memory history of a lazily loaded habit; it is fetched again when needed.
+        """
+        if self._source is not None:
+            self._history = None
+            self._encoded = None
+            self._decode = None
+            self._streak_version = -1
+
+
     def mark_complete(self, completion_time: Optional[datetime] = None):
         """
         Records the habit as completed at a specific time.
@@ -47,33 +150,66 @@ class Habit:
         if completion_time is None:
             completion_time = datetime.now()
 
+        history = self.history
+        streak_is_current = self._streak_version == history.version
+
         # Add this completion to our tracking history
-        self.history.append(completion_time)
+        index = history.add(completion_time)
+
+        # A completion that lands at the end extends or restarts the cached streak in O(1);
+        # an earlier one leaves the cache stale so the next read recomputes it
+        if streak_is_current and index == len(history) - 1:
+            latest = history.micros[index]
+            if self._streak and latest - self._streak_anchor <= self.period_length():
+                self._streak += 1
+            else:
+                self._streak = 1
+            self._streak_anchor = latest
+            self._streak_version = history.version
+
+
+    def period_length(self) -> int:
+        """
+        Returns the longest allowed gap between completions, in microseconds.
+        """
+        return DAY_US if self.frequency == 'daily' else WEEK_US
 
 
     def calculate_current_streak(self) -> int:
         """
         Determines the number of consecutive periods the habit has been maintained, 
         counting backwards from the most recent completion.
+
+        The result is cached and kept up to date by mark_complete, so repeated
+        calls cost O(1); any other change to the history triggers one recount.
         """
-        # No completions means no streak
-        if len(self.history) == 0:
-            return 0
+        history = self.history
+        if self._streak_version != history.version:
+            self._streak = self._count_streak(history.micros)
+            self._streak_anchor = history.micros[-1] if history.micros else 0
+            self._streak_version = history.version
+        return self._streak
 
-        # Sort completions from most recent to oldest
-        sorted_completions = sorted(self.history, reverse=True)
 
-        # Initialize streak counter
-        streak = 0
+    def _count_streak(self, completions) -> int:
+        """
+        Counts the current streak from scratch over sorted integer timestamps.
+        """
+        # No completions means no streak
+        if len(completions) == 0:
+            return 0
 
         # Set the period length based on habit frequency
-        period_length = timedelta(days=1) if self.frequency == 'daily' else timedelta(weeks=1)
+        period_length = self.period_length()
 
         # Reference point for streak calculation starts with most recent completion
-        streak_reference = sorted_completions[0]
+        streak_reference = completions[-1]
+
+        # Initialize streak counter
+        streak = 0
 
         # Check each completion against our streak window
-        for completion in sorted_completions:
+        for completion in reversed(completions):
             if streak_reference - completion <= period_length:
                 streak += 1
                 streak_reference = completion
@@ -86,33 +222,35 @@ class Habit:
         """
         Returns the total number of unique days this habit was completed.
         """
-        if not self.history:
-            return 0
-
-        # Convert all datetimes to just date, remove duplicates
-        completed_dates = {entry.date() for entry in self.history}
-        return len(completed_dates)
+        # Completions are sorted, so each new day shows up as a change of day number
+        completed_days = 0
+        previous_day = None
+        for completion in self.history.micros:
+            day = completion // DAY_US
+            if day != previous_day:
+                completed_days += 1
+                previous_day = day
+        return completed_days
 
 
     def broken(self) -> bool:
         """
         Checks if there was any period where the habit was not completed as required.
         """
+        completions = self.history.micros
+
         # No completions means the habit was broken from the start
-        if not self.history:
+        if not completions:
             return True
 
-        # Sort completions chronologically
-        ordered_completions = sorted(self.history)
-
         # Define the maximum allowed gap between completions
-        allowed_gap = timedelta(days=1) if self.frequency == 'daily' else timedelta(weeks=1)
+        allowed_gap = self.period_length()
 
         # Start checking from habit creation date
-        last_checkpoint = self.start_date
+        last_checkpoint = to_micros(self.start_date)
 
-        # Examine each completion for gaps
-        for completion in ordered_completions:
+        # Examine each completion (already in chronological order) for gaps
+        for completion in completions:
             if completion - last_checkpoint > allowed_gap:
                 return True
             last_checkpoint = completion
@@ -123,36 +261,24 @@ class Habit:
         """
         Checks if the habit has been completed during the current day.
         """
-        today = datetime.now().date()
+        today = datetime.combine(date.today(), time.min)
 
-        # Check if any completion occurred today
-        for completion in self.history:
-            if completion.date() == today:
-                return True
-
-        return False
+        # Binary search for any completion inside today's window
+        return self.history.count_between(today, today + timedelta(days=1)) > 0
         
 
     def get_last_completion_date(self) -> Optional[datetime]:
         """
         Retrieves the most recent date when this habit was completed.
         """
-        if not self.history:
-            return None
-        return max(self.history)
+        return self.history.last()
 
 
-    def completion_rate(self) -> float:
+    def completion_rate(self, now: Optional[datetime] = None) -> float:
         """Calculates completion rate as actual completions divided by expected periods."""
-        now = datetime.now()
-        days = (now.date() - self.start_date.date()).days
-        if self.frequency == 'daily':
-            expected_periods = max(days + 1, 1)
-        else:
-            expected_periods = max(((days // 7) + 1), 1)
-        if expected_periods == 0:
-            return 0.0
-        return min(len(self.history) / expected_periods, 1.0)
+        if now is None:
+            now = datetime.now()
+        return min(len(self.history) / expected_periods(self.frequency, self.start_date, now), 1.0)
         
 
     def clear_completion_history(self):
@@ -0,0 +1,226 @@
+#History module for the Habit Tracking App.
+#This module provides a compact, always-sorted container for completion timestamps.
+#Completions are kept as 64-bit integers (microseconds since 1970-01-01 of the
+#naive wall-clock time) and only turned into datetime objects when read.
+
+# Import built-in modules for sorted arrays and date handling
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+# Reference point and unit for the integer representation
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Length of one day and one week in microseconds
+DAY_US = 86_400_000_000
+WEEK_US = 7 * DAY_US
+
+
+# Global mutation clock: every history change takes the next value as its version,
+# so a version is unique across histories and the clock changes whenever any history does
+_clock = 0
+
+
+def _next_version() -> int:
+    global _clock
+    _clock += 1
+    return _clock
+
+
+def history_clock() -> int:
+    """
+    The version of the most recent change to any completion history.
+    Results derived from many histories stay valid while this value is unchanged.
+    """
+    return _clock
+
+
+def to_micros(moment: datetime) -> int:
+    """
+    Converts a datetime to microseconds since the epoch.
+    Timezone-aware values are shifted to local wall-clock time first.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return (moment - EPOCH) // MICROSECOND
+
+
+def from_micros(value: int) -> datetime:
+    """
+    Converts microseconds since the epoch back into a naive datetime.
+    """
+    return EPOCH + timedelta(0, 0, value)
+
+
+class CompletionHistory:
+    """
+    A list-like collection of completion times that always stays in chronological order.
+
+    Values are stored in an array('q'), so a long history costs 8 bytes per completion
+    instead of a datetime object each. Inserts use binary search, which keeps the first
+    and last completion available in O(1) and range counts in O(log n).
+    """
+
+    __slots__ = ("_micros", "version")
+
+    def __init__(self, completions: Iterable[datetime] = ()):
+        """
+        Creates a history from any iterable of datetimes.
+        """
+        self._micros = array("q", sorted(to_micros(moment) for moment in completions))
+
+        # Changes on every change, so callers can cache values derived from the history
+        self.version = _next_version()
+
+
+    @classmethod
+    def from_micros(cls, values: Iterable[int]) -> "CompletionHistory":
+        """
+        Creates a history directly from integer timestamps, without building datetimes.
+        """
+        history = cls()
+        history._micros = array("q", sorted(values))
+        return history
+
+
+    @classmethod
+    def from_sorted_micros(cls, values: Iterable[int]) -> "CompletionHistory":
+        """
+        Creates a history from integer timestamps that are already in chronological order.
+        An existing array('q') is adopted as-is, without copying.
+        """
+        history = cls()
+        history._micros = values if isinstance(values, array) and values.typecode == "q" else array("q", values)
+        return history
+
+
+    @property
+    def micros(self) -> array:
+        """
+        The sorted integer timestamps. Treat the returned array as read-only.
+        """
+        return self._micros
+
+
+    def add(self, moment: datetime) -> int:
+        """
+        Inserts a completion in chronological order and returns its position.
+        """
+        value = to_micros(moment)
+        micros = self._micros
+        if not micros or value >= micros[-1]:
+            # The common case: a new completion is the latest one
+            micros.append(value)
+            index = len(micros) - 1
+        else:
+            index = bisect_right(micros, value)
+            micros.insert(index, value)
+        self.version = _next_version()
+        return index
+
+
+    def append(self, moment: datetime):
+        """
+        Adds a completion; kept for list compatibility (the result is still sorted).
+        """
+        self.add(moment)
+
+
+    def extend(self, completions: Iterable[datetime]):
+        """
+        Adds many completions at once.
+        """
+        self.extend_micros(to_micros(moment) for moment in completions)
+
+
+    def extend_micros(self, values: Iterable[int]):
+        """
+        Adds many completions given as epoch microseconds, without building datetimes.
+        """
+        new_values = sorted(values)
+        if not new_values:
+            return
+        if self._micros and new_values[0] < self._micros[-1]:
+            self._micros = array("q", sorted(self._micros.tolist() + new_values))
+        else:
+            self._micros.extend(new_values)
+        self.version = _next_version()
+
+
+    def clear(self):
+        """
+        Removes every completion.
+        """
+        self._micros = array("q")
+        self.version = _next_version()
+
+
+    def first(self) -> Optional[datetime]:
+        """
+        Returns the earliest completion, or None if there is none.
+        """
+        return from_micros(self._micros[0]) if self._micros else None
+
+
+    def last(self) -> Optional[datetime]:
+        """
+        Returns the latest completion, or None if there is none.
+        """
+        return from_micros(self._micros[-1]) if self._micros else None
+
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        """
+        Counts completions with start <= time < end.
+        """
+        micros = self._micros
+        return bisect_left(micros, to_micros(end)) - bisect_left(micros, to_micros(start))
+
+
+    def between(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """
+        Yields completions with start <= time < end, oldest first.
+        """
+        micros = self._micros
+        for index in range(bisect_left(micros, to_micros(start)), bisect_left(micros, to_micros(end))):
+            yield from_micros(micros[index])
+
+
+    def __len__(self) -> int:
+        return len(self._micros)
+
+
+    def __iter__(self) -> Iterator[datetime]:
+        return map(from_micros, self._micros)
+
+
+    def __reversed__(self) -> Iterator[datetime]:
+        return map(from_micros, reversed(self._micros))
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [from_micros(value) for value in self._micros[index]]
+        return from_micros(self._micros[index])
+
+
+    def __contains__(self, moment) -> bool:
+        if not isinstance(moment, datetime):
+            return False
+        value = to_micros(moment)
+        index = bisect_left(self._micros, value)
+        return index < len(self._micros) and self._micros[index] == value
+
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompletionHistory):
+            return self._micros == other._micros
+        if isinstance(other, list):
+            return list(self) == sorted(other)
+        return NotImplemented
+
+
+    def __repr__(self) -> str:
+        return f"CompletionHistory({list(self)!r})"
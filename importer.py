@@ -0,0 +1,134 @@
+# Import module for the Habit Tracking App.
+# Streams (title, timestamp) completion events from a CSV or JSONL file into the database.
+# Run it directly:  python importer.py events.csv --db habits.db
+#
+# CSV files need a header with "title" and "timestamp" columns.
+# JSONL files hold one object per line: {"title": "Read", "timestamp": "2025-01-01T08:00:00"}
+# Timestamps are ISO-8601. Events for habits that do not exist are skipped.
+# A malformed line stops the import; the events before it are kept.
+
+# Import necessary built in modules
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Iterator, Tuple
+# Import custom modules
+from storage import DatabaseHandler
+
+
+class EventError(ValueError):
+    """
+    A malformed event. stored is set by import_completions to the number of events
+    stored before it.
+    """
+
+    def __init__(self, path: str, line: int, error: Exception):
+        reason = f"missing {error}" if isinstance(error, KeyError) else str(error)
+        super().__init__(f"{path}, line {line}: {reason}")
+        self.line = line
+        self.stored = 0
+
+
+def iter_csv_events(path: str) -> Iterator[Tuple[str, datetime]]:
+    """
+    Yield (title, timestamp) pairs from a CSV file, one row at a time.
+    Raises EventError for a row without a title or a valid timestamp.
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        for row in reader:
+            try:
+                event = row["title"], datetime.fromisoformat(row["timestamp"])
+            except (KeyError, TypeError, ValueError) as error:
+                raise EventError(path, reader.line_num, error) from error
+            yield event
+
+
+def iter_jsonl_events(path: str) -> Iterator[Tuple[str, datetime]]:
+    """
+    Yield (title, timestamp) pairs from a JSON Lines file, one line at a time.
+    Raises EventError for a line that is not an event object with a valid timestamp.
+    """
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                event = record["title"], datetime.fromisoformat(record["timestamp"])
+            except (KeyError, TypeError, ValueError) as error:
+                raise EventError(path, number, error) from error
+            yield event
+
+
+def iter_events(path: str, file_format: str = "auto") -> Iterator[Tuple[str, datetime]]:
+    """
+    Pick the reader by format name, or by file extension when the format is "auto".
+    """
+    if file_format == "auto":
+        file_format = "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json") else "csv"
+    if file_format == "jsonl":
+        return iter_jsonl_events(path)
+    if file_format == "csv":
+        return iter_csv_events(path)
+    raise ValueError(f"Unknown import format: {file_format!r}")
+
+
+def import_completions(storage: DatabaseHandler, path: str, file_format: str = "auto",
+                       chunk_size: int = 10000) -> Tuple[int, int]:
+    """
+    Import every event of a file and return (events read, completions stored).
+    At a malformed line the events before it are stored and its EventError is raised.
+    """
+    read = 0
+    failure = None
+
+    def counted(events):
+        nonlocal read, failure
+        try:
+            for event in events:
+                read += 1
+                yield event
+        except EventError as error:
+            # Ending the stream makes record_completions store the events read so far
+            failure = error
+
+    stored = storage.record_completions(counted(iter_events(path, file_format)), chunk_size)
+    if failure is not None:
+        failure.stored = stored
+        raise failure
+    return read, stored
+
+
+def main():
+    """
+    Entry point for the import command.
+    """
+    parser = argparse.ArgumentParser(description="Import habit completions from CSV or JSONL.")
+    parser.add_argument("path", help="File of (title, timestamp) events.")
+    parser.add_argument("--db", default="habits.db", help="Database file to import into.")
+    parser.add_argument("--format", choices=["auto", "csv", "jsonl"], default="auto")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="Completions written per transaction.")
+    args = parser.parse_args()
+
+    storage = DatabaseHandler(args.db)
+    try:
+        read, stored = import_completions(storage, args.path, args.format, args.chunk_size)
+    except EventError as error:
+        print(f"⚠️  Import stopped at {error}")
+        print(f"{error.stored} completions before that line were stored.")
+        sys.exit(1)
+    finally:
+        storage.close()
+
+    print(f"✅ Imported {stored} of {read} completions.")
+    if stored < read:
+        print(f"⚠️  {read - stored} events were skipped (unknown habit or database error).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# Load test for the Habit Tracking App's server mode.
+# Sends a mix of completions, lookups and analytics requests from many client threads
+# and reports throughput and p50/p99 latency.
+# Run it against a running server:   python loadtest.py --url http://127.0.0.1:8000
+# or let it start a local one:        python loadtest.py --local
+
+# Import necessary built in modules
+import argparse
+import http.client
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+# Import custom modules
+from manager import HabitManager
+from server import create_server
+from storage import PooledDatabaseHandler
+
+
+def request(connection: http.client.HTTPConnection, method: str, path: str,
+            body: Optional[dict] = None) -> int:
+    """
+    Sends one request over a kept-alive connection and returns the status code.
+    """
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Content-Type": "application/json"} if data else {}
+    connection.request(method, path, body=data, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def client(host: str, port: int, titles: List[str], count: int, seed: int,
+           latencies: List[float], errors: List[int]):
+    """
+    One client thread: count requests, roughly 50% writes, 40% reads and 10% analytics.
+    """
+    generator = random.Random(seed)
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    for _ in range(count):
+        title = quote(generator.choice(titles), safe="")
+        roll = generator.random()
+        if roll < 0.5:
+            method, path = "POST", f"/habits/{title}/complete"
+        elif roll < 0.9:
+            method, path = "GET", f"/habits/{title}"
+        else:
+            method, path = "GET", "/analytics/summary"
+
+        started = time.perf_counter()
+        status = request(connection, method, path)
+        latencies.append(time.perf_counter() - started)
+        if status >= 400:
+            errors.append(status)
+    connection.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+def run(host: str, port: int, clients: int, requests_per_client: int,
+        habit_count: int) -> Tuple[float, float, float, int, int]:
+    """
+    Creates the test habits, runs every client and returns
+    (requests per second, p50 seconds, p99 seconds, total requests, errors).
+    """
+    titles = [f"load-{index}" for index in range(habit_count)]
+    setup = http.client.HTTPConnection(host, port, timeout=30)
+    for title in titles:
+        request(setup, "POST", "/habits", {"title": title, "frequency": "daily"})
+    setup.close()
+
+    latencies: List[float] = []
+    errors: List[int] = []
+    threads = [
+        threading.Thread(target=client, args=(host, port, titles, requests_per_client, seed, latencies, errors))
+        for seed in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return len(latencies) / elapsed, percentile(latencies, 0.50), percentile(latencies, 0.99), len(latencies), len(errors)
+
+
+def main():
+    """
+    Entry point for the load test.
+    """
+    parser = argparse.ArgumentParser(description="Load-test the habit tracker HTTP server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server to test.")
+    parser.add_argument("--local", action="store_true",
+                        help="Start a server on a temporary database instead of using --url.")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads.")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client.")
+    parser.add_argument("--habits", type=int, default=100, help="Habits to create before the run.")
+    parser.add_argument("--workers", type=int, default=8, help="Server workers when --local is used.")
+    args = parser.parse_args()
+
+    server = manager = directory = None
+    if args.local:
+        directory = tempfile.TemporaryDirectory()
+        storage = PooledDatabaseHandler(os.path.join(directory.name, "load.db"), durability="group")
+        manager = HabitManager(storage=storage)
+        server = create_server(manager, "127.0.0.1", 0, args.workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = "127.0.0.1", server.server_port
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    try:
+        throughput, p50, p99, total, errors = run(host, port, args.clients, args.requests, args.habits)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            manager.close()
+            directory.cleanup()
+
+    print(f"Requests:   {total} ({errors} errors) from {args.clients} clients")
+    print(f"Throughput: {throughput:.0f} requests/s")
+    print(f"Latency:    p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 # Provides command-line interface for users to interact with the system
 
 #Custom modules
+import metrics
 from manager import HabitManager
 
 
@@ -19,7 +20,8 @@ def display_menu():
         print("4.  View Habit Details")
         print("5.  Delete Habit")
         print("6.  View Analytics")
-        print("7.  Exit")
+        print("7.  Diagnostics")
+        print("8.  Exit")
         print("============================================")
 
 # Helper function to display habit list with numbers
@@ -28,16 +30,30 @@ def show_habit_list(titles):
         print(f"{i}. {title}")
 
 
+# Helper function to show the timings collected by the metrics module
+def show_diagnostics():
+    operations = metrics.snapshot()
+    if not operations:
+        print("No timings recorded yet.")
+        return
+    print(f"{'Operation':<36}{'Calls':>8}{'Total ms':>12}{'Mean ms':>10}{'Max ms':>10}")
+    for name, stats in operations.items():
+        print(f"{name:<36}{stats['count']:>8}{stats['total'] * 1000:>12.2f}"
+              f"{stats['mean'] * 1000:>10.3f}{stats['max'] * 1000:>10.3f}")
+
+
 # Main program loop
 def main():
     """
     Entry point for the application.
     """
+    # Timings are cheap next to interactive use, so the CLI always records them
+    metrics.enable()
     manager = HabitManager()
 
     while True:
         display_menu()
-        choice = input("Enter your choice (1-7): ")
+        choice = input("Enter your choice (1-8): ")
         
         # Handle habit creation
         if choice == "1":
@@ -48,7 +64,7 @@ def main():
                 print("Habit name cannot be empty.")
                 continue
                 
-            if title in manager.get_habit_titles():
+            if manager.has_habit(title):
                 print(f"❌ Habit '{title}' already exists! Please choose a different name.")
                 continue
             frequency = input("Enter frequency (daily/weekly): ").strip().lower()
@@ -181,6 +197,8 @@ def main():
                         if habit.calculate_current_streak() == longest_streak:
                             print(f"Habit: {habit.title} - Streak: {longest_streak} days")
                             break
+                    else:
+                        print("No habits found.")
                         
                         
                 #Shows longest streak for a specific habit
@@ -272,14 +290,48 @@ def main():
                 else:
                     print("Invalid choice. Please enter a number between 1 and 10. ")
 
-        elif choice == "7": 
+        # Diagnostics
+        elif choice == "7":
+
+            while True:
+                print("\n--- Diagnostics Menu ---")
+                print("1. View Operation Timings")
+                print("2. Export Timings (Prometheus format)")
+                print("3. Reset Timings")
+                print("4. Back to Main Menu")
+
+                sub_choice = input("Enter your choice (1-4): ").strip()
+
+                if sub_choice == '1':
+                    print("\n--- Operation Timings ---")
+                    show_diagnostics()
+
+                elif sub_choice == '2':
+                    path = input("Export to file (default: metrics.prom): ").strip() or "metrics.prom"
+                    try:
+                        with open(path, "w", encoding="utf-8") as handle:
+                            handle.write(metrics.export_prometheus())
+                        print(f"✅ Timings exported to {path}.")
+                    except OSError as error:
+                        print(f"❌ Could not write {path}: {error}")
+
+                elif sub_choice == '3':
+                    metrics.reset()
+                    print("✅ Timings reset.")
+
+                elif sub_choice == '4':
+                    break
+                else:
+                    print("Invalid choice. Please enter a number between 1 and 4. ")
+
+        elif choice == "8": 
             print("\nThank you for using the Habit Tracking Application!")
             print("Goodbye! 👋")
             manager.close()
             break
 
         else:
-            print("Invalid choice. Please enter a number between 1 and 7.")
+            print("Invalid choice. Please enter a number between 1 and 8.")
 if __name__ == "__main__":
     main()
             
@@ -1,10 +1,18 @@
 #This module connects CLI actions with database and analytics functions.
 
 # Import necessary built in modules
-from typing import Dict, List, Optional
+import copy
+import os
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 # Import custom modules
 from habit import Habit
-from storage import DatabaseHandler
+from history import history_clock, to_micros
+from snapshot import read_snapshot, write_snapshot
+from storage import DatabaseHandler, LazyHistoryLoader
 from analytics_module import (
     filter_by_frequency,
     largest_streak,
@@ -14,22 +22,102 @@ from analytics_module import (
     completion_rates,
     average_completion_rate,
     rank_by_streak,
-    overall_summary
+    overall_summary,
+    completion_rates_from_stats,
+    overall_summary_from_stats,
+    completion_rate_between,
+    completions_between,
+    total_completed_days_between
 )
 
 
+def _memoized_analytics(method: Callable) -> Callable:
+    """
+    Caches an analytics method's result per argument list (see HabitManager._memoized).
+    """
+    @wraps(method)
+    def cached(self, *args):
+        return self._memoized((method.__name__, *args), lambda: method(self, *args))
+    return cached
+
+
 class HabitManager:
     """
     Manages all habit operations and coordinates between different modules.
     Acts as the central controller for the habit tracking application.
     """
 
-    def __init__(self, database_path: str = "habits.db"):
+    # Most analytics results kept by _memoized()
+    memo_size = 64
+
+    def __init__(self, database_path: str = "habits.db", storage: Optional[DatabaseHandler] = None,
+                 lazy: bool = False, max_loaded_histories: int = 1000,
+                 use_snapshot: bool = False, snapshot_path: Optional[str] = None):
         """
         Initializes the manager with storage and loads existing habits.
+
+        :param storage: An already opened storage handler to use instead of opening database_path.
+        :param lazy: Load only habit metadata up front; each history is read from storage
+            on first access and at most max_loaded_histories of them stay in memory.
+        :param use_snapshot: Start from the snapshot file when it still matches the database
+            and write a new one on close (see snapshot.py). Ignored in lazy mode.
+        :param snapshot_path: Snapshot file; defaults to the database path plus ".snapshot".
+        """
+        self.storage = storage if storage is not None else DatabaseHandler(database_path)
+        self.history_loader = LazyHistoryLoader(self.storage, max_loaded_histories) if lazy else None
+        # Bumped by every change made through the manager; part of the analytics cache key
+        self.generation = 0
+        self.snapshot_path = None
+        if use_snapshot and not lazy:
+            self.snapshot_path = snapshot_path or f"{database_path}.snapshot"
+
+        habits = None
+        if self.snapshot_path is not None:
+            habits = read_snapshot(self.snapshot_path, self.storage.snapshot_watermark())
+        self._set_habits(habits if habits is not None else self._load_habits())
+
+
+    def _load_habits(self) -> List[Habit]:
+        if self.history_loader is not None:
+            return self.storage.load_habits(self.history_loader)
+        return self.storage.load_habits()
+
+
+    def _set_habits(self, habits: List[Habit]):
+        """
+        Replaces the habit list and rebuilds the title -> Habit index kept alongside it.
+        """
+        self.habits = habits
+        self._habits_by_title: Dict[str, Habit] = {habit.title: habit for habit in habits}
+        # Analytics results cached by _memoized(): name -> (cache key, result), least recently used first
+        self._memo: "OrderedDict[Tuple, Tuple[Tuple, Any]]" = OrderedDict()
+
+
+    def _memoized(self, name: Tuple, compute: Callable[[], Any]) -> Any:
         """
-        self.storage = DatabaseHandler(database_path)
-        self.habits = self.storage.load_habits()
+        Returns a cached analytics result while nothing it depends on has changed.
+
+        A result is reused as long as the manager generation (habits created, deleted,
+        completed or reloaded), the global history clock (any change to any completion
+        history, including direct Habit.mark_complete calls) and today's date are unchanged.
+        Lists and dicts are returned as copies, so callers cannot alter the cached value.
+        Editing a habit's title, frequency or start date directly is not tracked; call
+        refresh() afterwards. Names include the call's arguments, which can come from
+        clients in server mode, so only the memo_size most recently used are kept.
+        """
+        today = date.today()
+        cached = self._memo.get(name)
+        if cached is not None and cached[0] == (self.generation, history_clock(), today):
+            self._memo.move_to_end(name)
+            return copy.copy(cached[1])
+
+        result = compute()
+        # Read the clock afterwards: lazily loaded histories tick it without changing any data
+        self._memo[name] = ((self.generation, history_clock(), today), result)
+        self._memo.move_to_end(name)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return copy.copy(result)
 
 
     def create_habit(self, title: str, frequency: str) -> bool:
@@ -40,7 +128,11 @@ class HabitManager:
         saved = self.storage.save_habit(habit)
 
         if saved:
+            if self.history_loader is not None:
+                habit.set_history_source(self.history_loader)
             self.habits.append(habit)
+            self._habits_by_title[title] = habit
+            self.generation += 1
 
         return saved
 
@@ -56,36 +148,76 @@ class HabitManager:
         """
         Returns titles of all habits.
         """
-        return [habit.title for habit in self.habits]
+        return list(self._habits_by_title)
+
+
+    def has_habit(self, title: str) -> bool:
+        """
+        Checks whether a habit with this title exists.
+        """
+        return title in self._habits_by_title
 
     
     def get_habit_by_title(self, title: str) -> Optional[Habit]:
         """
         Finds a habit by its title.
         """
-        for habit in self.habits:
-            if habit.title == title:
-                return habit
-        return None
+        return self._habits_by_title.get(title)
 
     
     def mark_habit_complete(self, title: str) -> bool:
         """
         Mark a habit complete and update the database.
         """
-        success = self.storage.record_completion(title)
+        # One timestamp for both, so memory (and any snapshot of it) matches the database exactly
+        completion_time = datetime.now()
+        success = self.storage.record_completion(title, completion_time)
 
         if not success:
             return False
+        self.generation += 1
 
-        # update in-memory object
-        for habit in self.habits:
-            if habit.title == title:
-                habit.mark_complete()
-                break
+        # update in-memory object; a history that is not loaded will be read with this completion
+        habit = self._habits_by_title.get(title)
+        if habit is not None and habit.history_loaded:
+            habit.mark_complete(completion_time)
 
         return True
 
+
+    def record_completions(self, events: Iterable[Tuple[str, datetime]]) -> int:
+        """
+        Record many (title, time) completions in bulk and return how many were stored.
+        Events for unknown titles are skipped.
+        """
+        pending: Dict[str, array] = {}
+        accepted = 0
+
+        def known_events():
+            # Collect each accepted event for the in-memory update while streaming it to storage
+            nonlocal accepted
+            for title, time in events:
+                if title not in self._habits_by_title:
+                    continue
+                pending.setdefault(title, array("q")).append(to_micros(time))
+                accepted += 1
+                yield title, time
+
+        stored = self.storage.record_completions(known_events())
+        self.generation += 1
+
+        if stored != accepted:
+            # Storage stopped early; the database is the source of truth
+            self.refresh()
+            return stored
+
+        # Apply each habit's new completions as one batch
+        for title, values in pending.items():
+            habit = self._habits_by_title[title]
+            if habit.history_loaded:
+                habit.history.extend_micros(values)
+        return stored
+
     
     def delete_habit(self, title: str) -> bool:
         """
@@ -94,11 +226,28 @@ class HabitManager:
         success = self.storage.delete_habit(title)
 
         if success:
-            self.habits = [h for h in self.habits if h.title != title]
+            self.generation += 1
+            habit = self._habits_by_title.pop(title, None)
+            if habit is not None:
+                self.habits.remove(habit)
+                if self.history_loader is not None:
+                    self.history_loader.forget(habit)
 
         return success
 
     
+    def _stored_stats(self) -> Optional[Dict[str, Dict]]:
+        """
+        The statistics maintained by storage in lazy mode, where reading them avoids loading
+        every history. Otherwise None: the habits in memory are the one source of truth.
+        """
+        if self.history_loader is None:
+            return None
+        load_habit_stats = getattr(self.storage, "load_habit_stats", None)
+        return load_habit_stats() if load_habit_stats is not None else None
+
+
+    @_memoized_analytics
     def filter_by_frequency(self, frequency: str) -> List[Habit]:
         """
         Filters habits by their frequency.
@@ -106,13 +255,18 @@ class HabitManager:
         return filter_by_frequency(self.habits, frequency)
 
     
+    @_memoized_analytics
     def largest_streak(self) -> int:
         """
         Gets the longest streak across all habits.
         """
+        stats = self._stored_stats()
+        if stats is not None:
+            return max((row["current_streak"] for row in stats.values()), default=0)
         return largest_streak(self.habits)
 
     
+    @_memoized_analytics
     def largest_streak_for_habit(self, title: str) -> Optional[int]:
         """
         Gets the current streak for a specific habit.
@@ -121,6 +275,7 @@ class HabitManager:
         return largest_streak_for_habit(habit) if habit else None
 
     
+    @_memoized_analytics
     def broken_habits(self) -> List[Habit]:
         """
         Gets habits that have been broken at least once.
@@ -128,6 +283,7 @@ class HabitManager:
         return broken_habits(self.habits)
 
     
+    @_memoized_analytics
     def get_unbroken_habits(self) -> List[Habit]:
         """
         Gets habits that have never been broken.
@@ -135,21 +291,58 @@ class HabitManager:
         return unbroken_habits(self.habits)
 
     
+    @_memoized_analytics
     def get_completion_rates(self) -> Dict[str, float]:
         """
         Gets completion rates for all habits.
         """
+        stats = self._stored_stats()
+        if stats is not None:
+            return completion_rates_from_stats(stats)
         return completion_rates(self.habits)
 
     
+    @_memoized_analytics
     def get_average_completion_rate(self) -> float:
         """
         Calculates average completion rate across all habits.
         """
+        stats = self._stored_stats()
+        if stats is not None:
+            rates = completion_rates_from_stats(stats)
+            return sum(rates.values()) / len(rates) if rates else 0.0
         return average_completion_rate(self.habits)
 
-    
 
+    @_memoized_analytics
+    def get_completion_rate_between(self, title: str, start: date, end: date) -> Optional[float]:
+        """
+        Gets a habit's completion rate over the days start..end (inclusive).
+        """
+        habit = self.get_habit_by_title(title)
+        return completion_rate_between(habit, start, end, self.storage) if habit else None
+
+
+    @_memoized_analytics
+    def get_completions_between(self, title: str, start: date, end: date) -> Optional[int]:
+        """
+        Gets how many times a habit was completed on the days start..end (inclusive).
+        """
+        habit = self.get_habit_by_title(title)
+        return completions_between(habit, start, end, self.storage) if habit else None
+
+
+    @_memoized_analytics
+    def get_completed_days_between(self, title: str, start: date, end: date) -> Optional[int]:
+        """
+        Gets on how many distinct days start..end (inclusive) a habit was completed.
+        """
+        habit = self.get_habit_by_title(title)
+        return total_completed_days_between(habit, start, end, self.storage) if habit else None
+
+
+
+    @_memoized_analytics
     def get_habits_ranked_by_streak(self) -> List[Habit]:
         """
         Returns habits sorted by current streak (highest first).
@@ -157,10 +350,14 @@ class HabitManager:
         return rank_by_streak(self.habits)
 
     
+    @_memoized_analytics
     def summary(self):
         """
         Provides comprehensive summary of all habits.
         """
+        stats = self._stored_stats()
+        if stats is not None:
+            return overall_summary_from_stats(stats)
         return overall_summary(self.habits)
 
     
@@ -168,10 +365,41 @@ class HabitManager:
         """
         Reload all habits from database.
         """
-        self.habits = self.storage.load_habits()
+        if self.history_loader is not None:
+            self.history_loader.clear()
+        self._set_habits(self._load_habits())
 
     def close(self):
         """
-        Closes the storage connection properly.
-        """
+        Closes the storage connection properly, saving a snapshot first when enabled.
+        """
+        if self.snapshot_path is not None:
+            self.storage.flush()
+            try:
+                # A snapshot of in-memory-only edits would be trusted over the database on the next start
+                if self._memory_matches_storage():
+                    write_snapshot(self.snapshot_path, self.habits, self.storage.snapshot_watermark())
+                elif os.path.exists(self.snapshot_path):
+                    # An older snapshot could still match the database if these edits are undone
+                    os.remove(self.snapshot_path)
+            except OSError:
+                # Without a snapshot the next start simply does a full load
+                pass
         self.storage.close()
+
+
+    def _memory_matches_storage(self) -> bool:
+        """
+        Whether every habit in memory has the definition, completion count and last
+        completion that storage records for it.
+        """
+        stats = self.storage.load_habit_stats()
+        if list(stats) != list(self._habits_by_title):
+            return False
+        for title, habit in self._habits_by_title.items():
+            row = stats[title]
+            if (habit.frequency != row["frequency"] or habit.start_date != row["start_date"]
+                    or len(habit.history) != row["completion_count"]
+                    or habit.history.last() != row["last_completion"]):
+                return False
+        return True
@@ -0,0 +1,183 @@
+#Timing instrumentation for the Habit Tracking App.
+#Storage methods and analytics functions are wrapped with @timed, which records a count,
+#total and maximum latency and a latency histogram per operation. Recording is off by
+#default; while disabled a wrapped call only pays for one flag check.
+#Enable it with metrics.enable() or by setting HABIT_METRICS=1 in the environment, read
+#it with snapshot() and export it with export_prometheus().
+
+# Import necessary built in modules
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List
+
+# Upper bounds (seconds) of the latency histogram buckets; slower calls land in +Inf
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class _State:
+    """
+    The on/off switch, kept in an object so wrapped functions see changes immediately.
+    """
+
+    __slots__ = ("enabled",)
+
+    def __init__(self):
+        self.enabled = os.environ.get("HABIT_METRICS", "") not in ("", "0")
+
+
+_state = _State()
+
+
+class OperationStats:
+    """
+    Latency figures of one operation.
+    """
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Non-cumulative counts per bucket; the last one is +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+_operations: Dict[str, OperationStats] = {}
+_lock = threading.Lock()
+
+
+def enable():
+    """
+    Start recording timings.
+    """
+    _state.enabled = True
+
+
+def disable():
+    """
+    Stop recording timings; wrapped calls go back to a single flag check.
+    """
+    _state.enabled = False
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def record(name: str, seconds: float):
+    """
+    Adds one timing to an operation.
+    """
+    with _lock:
+        stats = _operations.get(name)
+        if stats is None:
+            stats = _operations[name] = OperationStats()
+        stats.record(seconds)
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator that records the wall-clock time of every call under name while enabled.
+    """
+    def decorate(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """
+    Context manager that records the time spent in its block under name while enabled.
+    """
+    if not _state.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def snapshot() -> Dict[str, Dict]:
+    """
+    Returns operation name -> count, total, mean and max seconds and the histogram
+    as (upper bound, cumulative count) pairs, sorted by name.
+    """
+    with _lock:
+        result = {}
+        for name in sorted(_operations):
+            stats = _operations[name]
+            cumulative: List = []
+            running = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), stats.buckets):
+                running += count
+                cumulative.append((bound, running))
+            result[name] = {
+                "count": stats.count,
+                "total": stats.total,
+                "mean": stats.total / stats.count if stats.count else 0.0,
+                "max": stats.max,
+                "histogram": cumulative,
+            }
+        return result
+
+
+def reset():
+    """
+    Forgets every recorded timing.
+    """
+    with _lock:
+        _operations.clear()
+
+
+def _label(name: str) -> str:
+    return name.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def export_prometheus(prefix: str = "habit") -> str:
+    """
+    Renders every operation in the Prometheus text exposition format: a
+    <prefix>_operation_duration_seconds histogram and a _max gauge, labelled by operation.
+    """
+    metric = f"{prefix}_operation_duration_seconds"
+    lines = [
+        f"# HELP {metric} Time spent in instrumented operations.",
+        f"# TYPE {metric} histogram",
+    ]
+    operations = snapshot()
+    for name, stats in operations.items():
+        label = _label(name)
+        for bound, count in stats["histogram"]:
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{metric}_bucket{{operation="{label}",le="{le}"}} {count}')
+        lines.append(f'{metric}_sum{{operation="{label}"}} {stats["total"]!r}')
+        lines.append(f'{metric}_count{{operation="{label}"}} {stats["count"]}')
+
+    lines.append(f"# HELP {metric}_max Slowest single call of each operation.")
+    lines.append(f"# TYPE {metric}_max gauge")
+    for name, stats in operations.items():
+        lines.append(f'{metric}_max{{operation="{_label(name)}"}} {stats["max"]!r}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,259 @@
+# HTTP service module for the Habit Tracking App.
+# Exposes HabitManager operations as a small JSON API using only the standard library.
+# The manager and its habits stay in memory between requests.
+# Run it directly:  python server.py --db habits.db --port 8000 --workers 8
+#
+# Routes:
+#   GET    /habits                      list habits
+#   POST   /habits                      create {"title": ..., "frequency": "daily" | "weekly"}
+#   GET    /habits/<title>              details of one habit
+#   POST   /habits/<title>/complete     mark a habit completed now
+#   DELETE /habits/<title>              delete a habit
+#   GET    /analytics/<name>            completion_rates, average_completion_rate,
+#                                       largest_streak, streak?title=..., broken, unbroken,
+#                                       frequency?frequency=..., ranked, summary
+#   GET    /metrics                     operation timings in Prometheus text format
+#                                       (recorded when started with --metrics)
+
+# Import necessary built in modules
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+# Import custom modules
+import metrics
+from habit import Habit
+from manager import HabitManager
+from storage import DURABILITY_MODES, PooledDatabaseHandler
+
+
+def habit_to_json(habit: Habit) -> Dict[str, Any]:
+    """
+    Converts a Habit into a JSON-friendly dictionary.
+    """
+    last = habit.get_last_completion_date()
+    return {
+        "title": habit.title,
+        "frequency": habit.frequency,
+        "start_date": habit.start_date.isoformat(),
+        "completions": len(habit.history),
+        "current_streak": habit.calculate_current_streak(),
+        "last_completion": last.isoformat() if last else None,
+    }
+
+
+class HabitService:
+    """
+    Maps HTTP requests onto one shared HabitManager.
+    HabitManager is not thread-safe, so calls into it are serialized with a lock;
+    they only touch memory and the storage writer, so they are short.
+    """
+
+    def __init__(self, manager: HabitManager):
+        self.manager = manager
+        self.lock = threading.Lock()
+
+
+    def handle(self, method: str, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Any]:
+        """
+        Handles one request and returns (HTTP status, JSON payload).
+        """
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        with self.lock:
+            if parts[:1] == ["habits"]:
+                return self._habits(method, parts[1:], body)
+            if parts[:1] == ["analytics"] and len(parts) == 2 and method == "GET":
+                return self._analytics(parts[1], query)
+        return 404, {"error": "Not found"}
+
+
+    def _habits(self, method: str, parts, body) -> Tuple[int, Any]:
+        manager = self.manager
+
+        if not parts and method == "GET":
+            return 200, [habit_to_json(habit) for habit in manager.list_habits()]
+
+        if not parts and method == "POST":
+            if not isinstance(body, dict):
+                return 400, {"error": "Expected a JSON object"}
+            title = body.get("title")
+            frequency = str(body.get("frequency", "")).strip().lower()
+            if not isinstance(title, str) or not title or frequency not in ("daily", "weekly"):
+                return 400, {"error": "Expected a title and a frequency of 'daily' or 'weekly'"}
+            if manager.has_habit(title) or not manager.create_habit(title, frequency):
+                return 409, {"error": f"Habit '{title}' already exists"}
+            return 201, habit_to_json(manager.get_habit_by_title(title))
+
+        habit = manager.get_habit_by_title(parts[0]) if parts else None
+        if habit is None:
+            return 404, {"error": "Habit not found"}
+
+        if len(parts) == 1 and method == "GET":
+            return 200, habit_to_json(habit)
+        if len(parts) == 1 and method == "DELETE":
+            if not manager.delete_habit(habit.title):
+                return 500, {"error": "Failed to delete habit"}
+            return 200, {"deleted": habit.title}
+        if parts[1:] == ["complete"] and method == "POST":
+            if not manager.mark_habit_complete(habit.title):
+                return 500, {"error": "Failed to mark habit as completed"}
+            return 200, habit_to_json(habit)
+        return 405, {"error": "Method not allowed"}
+
+
+    def _analytics(self, name: str, query: Dict[str, str]) -> Tuple[int, Any]:
+        manager = self.manager
+
+        if name == "completion_rates":
+            return 200, manager.get_completion_rates()
+        if name == "average_completion_rate":
+            return 200, {"average_completion_rate": manager.get_average_completion_rate()}
+        if name == "largest_streak":
+            return 200, {"largest_streak": manager.largest_streak()}
+        if name == "streak":
+            streak = manager.largest_streak_for_habit(query.get("title", ""))
+            if streak is None:
+                return 404, {"error": "Habit not found"}
+            return 200, {"title": query["title"], "streak": streak}
+        if name == "broken":
+            return 200, [habit.title for habit in manager.broken_habits()]
+        if name == "unbroken":
+            return 200, [habit.title for habit in manager.get_unbroken_habits()]
+        if name == "frequency":
+            habits = manager.filter_by_frequency(query.get("frequency", "daily"))
+            return 200, [habit.title for habit in habits]
+        if name == "ranked":
+            return 200, [
+                {"title": habit.title, "streak": habit.calculate_current_streak()}
+                for habit in manager.get_habits_ranked_by_streak()
+            ]
+        if name == "summary":
+            return 200, manager.summary()
+        return 404, {"error": f"Unknown analytics '{name}'"}
+
+
+class HabitRequestHandler(BaseHTTPRequestHandler):
+    """
+    Parses JSON requests and writes JSON responses; keep-alive is supported.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY every
+    # kept-alive response would wait on the client's delayed ACK
+    disable_nagle_algorithm = True
+    # Seconds a kept-alive connection may sit idle (or a request may stall) before it is closed
+    timeout = 30
+    service: HabitService = None
+
+    def _dispatch(self):
+        body = None
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                self._send(400, {"error": "Request body is not valid JSON"})
+                return
+        # Only requests being handled take a worker slot; idle connections wait without one
+        with self.server.slots:
+            if self.command == "GET" and self.path == "/metrics":
+                self._write(200, metrics.export_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+                return
+            status, payload = self.service.handle(self.command, self.path, body)
+            self._send(status, payload)
+
+    def _send(self, status: int, payload: Any):
+        self._write(status, json.dumps(payload, default=str).encode("utf-8"), "application/json")
+
+    def _write(self, status: int, data: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the cost of a request
+        pass
+
+
+class PooledHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    An HTTP server that reads each connection on its own daemon thread but handles
+    at most `workers` requests at once, so idle keep-alive clients cannot starve
+    the others and shutting down never waits for a client to hang up.
+    """
+
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self, address, handler, workers: int = 8):
+        super().__init__(address, handler)
+        self.slots = threading.BoundedSemaphore(workers)
+
+
+def create_server(manager: HabitManager, host: str = "127.0.0.1", port: int = 8000,
+                  workers: int = 8) -> PooledHTTPServer:
+    """
+    Builds (but does not start) a server bound to host:port around the given manager.
+    """
+    handler = type("BoundHabitRequestHandler", (HabitRequestHandler,), {"service": HabitService(manager)})
+    return PooledHTTPServer((host, port), handler, workers)
+
+
+def start_flusher(storage: PooledDatabaseHandler, interval: float) -> threading.Event:
+    """
+    Flushes group-commit writes every interval seconds, even when no new writes arrive.
+    Set the returned event to stop the background thread.
+    """
+    stopped = threading.Event()
+
+    def run():
+        while not stopped.wait(interval):
+            storage.flush()
+
+    threading.Thread(target=run, name="habit-flusher", daemon=True).start()
+    return stopped
+
+
+def main():
+    """
+    Entry point for server mode.
+    """
+    parser = argparse.ArgumentParser(description="Serve the habit tracker over HTTP/JSON.")
+    parser.add_argument("--db", default="habits.db", help="Database file to serve.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="Maximum requests handled at once.")
+    parser.add_argument("--durability", choices=DURABILITY_MODES, default="group")
+    parser.add_argument("--metrics", action="store_true", help="Record operation timings for GET /metrics.")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    storage = PooledDatabaseHandler(args.db, durability=args.durability)
+    manager = HabitManager(storage=storage)
+    server = create_server(manager, args.host, args.port, args.workers)
+    flusher = start_flusher(storage, storage.commit_interval)
+    print(f"Serving {args.db} on http://{args.host}:{server.server_port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        flusher.set()
+        server.server_close()
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#Snapshot module for the Habit Tracking App.
+#Saves the habits a HabitManager has in memory to one compact binary file on close, and
+#loads them back on the next start instead of querying and decoding every completion.
+#
+#File layout:
+#  MAGIC | header length (4 bytes, little-endian) | header (JSON) | completions
+#The header holds the storage watermark the snapshot was taken at and, per habit,
+#(title, frequency, start date, number of completions). The completions of all habits
+#follow as one block of 64-bit epoch-microsecond integers, in habit order.
+#A snapshot is only used when its watermark equals the database's current one.
+
+# Import built-in modules
+import json
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+# Import custom modules
+from habit import Habit
+
+MAGIC = b"HABITSNP"
+FORMAT_VERSION = 1
+
+
+def write_snapshot(path: str, habits: List[Habit], watermark: Dict[str, Any]):
+    """
+    Write habits and the watermark they match to path.
+    The file is written next to its destination and moved into place, so a reader never sees half of it.
+    """
+    completions = array("q")
+    entries = []
+    for habit in habits:
+        micros = habit.history.micros
+        completions.extend(micros)
+        entries.append([habit.title, habit.frequency, habit.start_date.isoformat(), len(micros)])
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "watermark": watermark,
+        "habits": entries,
+    }).encode("utf-8")
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack("<I", len(header)))
+        handle.write(header)
+        completions.tofile(handle)
+    os.replace(temporary, path)
+
+
+def read_snapshot(path: str, watermark: Dict[str, Any]) -> Optional[List[Habit]]:
+    """
+    Load the habits saved at path if the snapshot matches watermark.
+    Returns None when the file is missing, unreadable, from another format or stale.
+    """
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except OSError:
+        return None
+
+    try:
+        if data[:len(MAGIC)] != MAGIC:
+            return None
+        offset = len(MAGIC) + 4
+        (header_length,) = struct.unpack("<I", data[len(MAGIC):offset])
+        header = json.loads(data[offset:offset + header_length])
+        if header.get("format") != FORMAT_VERSION or header.get("watermark") != watermark:
+            return None
+
+        completions = array("q")
+        completions.frombytes(data[offset + header_length:])
+        if header["byteorder"] != sys.byteorder:
+            completions.byteswap()
+        if len(completions) != sum(entry[3] for entry in header["habits"]):
+            return None
+
+        habits: List[Habit] = []
+        position = 0
+        for title, frequency, start_date, count in header["habits"]:
+            habit = Habit(title, frequency)
+            habit.start_date = datetime.fromisoformat(start_date)
+            # Already sorted epoch microseconds: adopted as-is on first access
+            habit.load_encoded_history(completions[position:position + count])
+            position += count
+            habits.append(habit)
+        return habits
+    except (ValueError, KeyError, TypeError, struct.error):
+        # A damaged snapshot just means a full load
+        return None
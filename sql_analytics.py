@@ -0,0 +1,181 @@
+#SQL analytics backend for the Habit Tracking App.
+#Answers the per-habit aggregates of analytics_module inside SQLite, grouped per habit
+#in one statement, so no history has to be loaded into Python. Streaks and the broken
+#flag come from a single gaps-and-islands window query (STREAKS_SQL).
+#Every function takes an open sqlite3.Connection (DatabaseHandler.connection or a pooled
+#reader) and works with both stored timestamp formats ('iso' text and 'epoch_us' integers).
+
+# Import built-in modules
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+# Import custom modules
+from history import DAY_US, WEEK_US
+from storage import decode_timestamp
+
+# Calendar day of a completion, as 'YYYY-MM-DD', for either stored format
+DAY_SQL = """
+    CASE WHEN typeof(completion_time) = 'integer'
+         THEN date(completion_time / 1000000, 'unixepoch')
+         ELSE date(completion_time) END
+"""
+
+
+def _micros_sql(column: str) -> str:
+    """
+    SQL expression converting a stored timestamp column of either format to epoch microseconds.
+    """
+    return f"""
+        CASE WHEN typeof({column}) = 'integer'
+             THEN {column}
+             ELSE CAST(strftime('%s', {column}) AS INTEGER) * 1000000
+                  + CAST(substr({column} || '.000000', 21, 6) AS INTEGER) END
+    """
+
+
+# Current streak, longest streak and broken flag for every habit (gaps and islands):
+# LAG finds each completion's predecessor, a running SUM of "starts a new run" flags
+# numbers the islands of consecutive completions, and islands are measured per habit.
+# The first completion of a habit is compared against its start date for the broken flag,
+# exactly like Habit.broken(); a habit without completions counts as broken.
+STREAKS_SQL = f"""
+    WITH completions AS (
+        SELECT c.habit_id,
+               {_micros_sql("c.completion_time")} AS t,
+               CASE WHEN lower(h.frequency) = 'daily' THEN {DAY_US} ELSE {WEEK_US} END AS period,
+               {_micros_sql("h.start_date")} AS start
+        FROM habit_history c
+        JOIN habits h ON h.id = c.habit_id
+    ),
+    gaps AS (
+        SELECT habit_id, t, period,
+               LAG(t) OVER (PARTITION BY habit_id ORDER BY t) AS previous,
+               start
+        FROM completions
+    ),
+    runs AS (
+        SELECT habit_id,
+               CASE WHEN t - COALESCE(previous, start) > period THEN 1 ELSE 0 END AS too_late,
+               SUM(CASE WHEN previous IS NOT NULL AND t - previous <= period THEN 0 ELSE 1 END)
+                   OVER (PARTITION BY habit_id ORDER BY t ROWS UNBOUNDED PRECEDING) AS island
+        FROM gaps
+    ),
+    islands AS (
+        SELECT habit_id, island, COUNT(*) AS length, MAX(too_late) AS too_late,
+               MAX(island) OVER (PARTITION BY habit_id) AS last_island
+        FROM runs
+        GROUP BY habit_id, island
+    )
+    SELECT h.title,
+           COALESCE(MAX(CASE WHEN i.island = i.last_island THEN i.length END), 0),
+           COALESCE(MAX(i.length), 0),
+           COALESCE(MAX(i.too_late), 1)
+    FROM habits h
+    LEFT JOIN islands i ON i.habit_id = h.id
+    GROUP BY h.id
+    ORDER BY h.id
+"""
+
+# Expected number of periods between the start date and :today, as in Habit.completion_rate
+EXPECTED_PERIODS_SQL = """
+    max(CASE WHEN lower(h.frequency) = 'daily'
+             THEN CAST(julianday(:today) - julianday(date(h.start_date)) AS INTEGER) + 1
+             ELSE CAST(julianday(:today) - julianday(date(h.start_date)) AS INTEGER) / 7 + 1 END, 1)
+"""
+
+
+def _today(today: Optional[date]) -> str:
+    """
+    Today's date (or the given one) as an ISO string query parameter.
+    """
+    return (today or datetime.now().date()).isoformat()
+
+
+def habit_aggregates(connection: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+    """
+    Return completion_count, total_completed_days and last_completion for every habit,
+    computed by one grouped query.
+    """
+    rows = connection.execute(f"""
+        SELECT h.title, COUNT(c.completion_time), COUNT(DISTINCT c.day), MAX(c.completion_time)
+        FROM habits h
+        LEFT JOIN (SELECT habit_id, completion_time, {DAY_SQL} AS day FROM habit_history) c
+               ON c.habit_id = h.id
+        GROUP BY h.id
+        ORDER BY h.id
+    """)
+    return {
+        title: {
+            "completion_count": count,
+            "total_completed_days": days,
+            "last_completion": decode_timestamp(last) if last is not None else None,
+        }
+        for title, count, days, last in rows
+    }
+
+
+def completion_rates(connection: sqlite3.Connection, today: Optional[date] = None) -> Dict[str, float]:
+    """
+    Return a dictionary mapping habit names -> completion rate (0.0 to 1.0).
+    """
+    rows = connection.execute(f"""
+        SELECT h.title, min(CAST(COUNT(c.id) AS REAL) / {EXPECTED_PERIODS_SQL}, 1.0)
+        FROM habits h
+        LEFT JOIN habit_history c ON c.habit_id = h.id
+        GROUP BY h.id
+        ORDER BY h.id
+    """, {"today": _today(today)})
+    return dict(rows.fetchall())
+
+
+def average_completion_rate(connection: sqlite3.Connection, today: Optional[date] = None) -> float:
+    """
+    Compute the mean completion rate for all habits.
+    """
+    rates = completion_rates(connection, today)
+    return sum(rates.values()) / len(rates) if rates else 0.0
+
+
+def streak_statistics(connection: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+    """
+    Return current_streak, longest_streak and broken for every habit from one window query.
+    """
+    return {
+        title: {"current_streak": current, "longest_streak": longest, "broken": bool(broken)}
+        for title, current, longest, broken in connection.execute(STREAKS_SQL)
+    }
+
+
+def largest_streak(connection: sqlite3.Connection) -> int:
+    """
+    Return the largest current streak across all habits.
+    """
+    return max((stats["current_streak"] for stats in streak_statistics(connection).values()), default=0)
+
+
+def broken_habits(connection: sqlite3.Connection) -> List[str]:
+    """
+    Return the titles of habits that were ever broken.
+    """
+    return [title for title, stats in streak_statistics(connection).items() if stats["broken"]]
+
+
+def overall_summary(connection: sqlite3.Connection, today: Optional[date] = None) -> Dict[str, Optional[float]]:
+    """
+    Provide the same global summary as analytics_module.overall_summary without loading histories.
+    """
+    return summarize(completion_rates(connection, today), streak_statistics(connection))
+
+
+def summarize(rates: Dict[str, float], streaks: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """
+    Build the overall summary from completion_rates() and streak_statistics() results.
+    """
+    broken_count = sum(1 for stats in streaks.values() if stats["broken"])
+    return {
+        "total_habits": len(rates),
+        "strongest_streak": max((stats["current_streak"] for stats in streaks.values()), default=0),
+        "average_completion_rate": sum(rates.values()) / len(rates) if rates else 0.0,
+        "broken_habits": broken_count,
+        "unbroken_habits": len(rates) - broken_count,
+    }
@@ -4,10 +4,240 @@
 
 # Import built-in modules for database operations and date handling
 import sqlite3
-from datetime import datetime
-from typing import List, Optional
+import threading
+import time as clock
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from queue import Empty, Queue
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 # Import the Habit class from the habit module
 from habit import Habit
+from history import CompletionHistory, DAY_US, EPOCH, WEEK_US, from_micros, to_micros
+from metrics import timed
+
+
+def change_counter_triggers(table: str) -> List[str]:
+    """
+    CREATE TRIGGER statements that bump the 'change_counter' setting on every row
+    inserted into, updated in or deleted from table.
+    """
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_counter AFTER {event} ON {table}
+        BEGIN
+            UPDATE settings SET value = value + 1 WHERE key = 'change_counter';
+        END"""
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+# Ordered schema migrations as (version, SQL script) pairs.
+# A database at PRAGMA user_version N receives every script with a version above N.
+# Never edit a released migration; append a new one instead.
+MIGRATIONS = [
+    # 1: the original tables (IF NOT EXISTS, so files created before versioning upgrade cleanly)
+    (1, """
+        CREATE TABLE IF NOT EXISTS habits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            start_date TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS habit_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            habit_id INTEGER NOT NULL,
+            completion_time TEXT NOT NULL,
+            FOREIGN KEY (habit_id) REFERENCES habits(id)
+        );
+    """),
+    # 2: unique titles and an index for per-habit history lookups.
+    # Duplicate titles from older files are merged into the oldest row first.
+    (2, """
+        UPDATE habit_history SET habit_id = (
+            SELECT MIN(keep.id) FROM habits AS dup
+            JOIN habits AS keep ON keep.title = dup.title
+            WHERE dup.id = habit_history.habit_id
+        )
+        WHERE habit_id IN (SELECT id FROM habits);
+        DELETE FROM habits WHERE id NOT IN (SELECT MIN(id) FROM habits GROUP BY title);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_habits_title ON habits (title);
+        CREATE INDEX IF NOT EXISTS idx_history_habit_time
+            ON habit_history (habit_id, completion_time);
+    """),
+    # 3: key/value settings, starting with the on-disk completion timestamp format
+    (3, """
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        INSERT OR IGNORE INTO settings (key, value) VALUES ('timestamp_format', 'iso');
+    """),
+    # 4: per-habit statistics kept up to date by the storage layer on every write.
+    # Existing habits get a stale row, which DatabaseHandler recomputes when it opens the file.
+    (4, """
+        CREATE TABLE IF NOT EXISTS habit_stats (
+            habit_id INTEGER PRIMARY KEY,
+            completion_count INTEGER NOT NULL DEFAULT 0,
+            distinct_days INTEGER NOT NULL DEFAULT 0,
+            last_completion INTEGER,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            longest_streak INTEGER NOT NULL DEFAULT 0,
+            broken INTEGER NOT NULL DEFAULT 1,
+            stale INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (habit_id) REFERENCES habits(id)
+        );
+        INSERT OR IGNORE INTO habit_stats (habit_id, stale) SELECT id, 1 FROM habits;
+    """),
+    # 5: daily and weekly per-habit rollups (count, first and last completion per bucket).
+    # Days count from 1970-01-01, weeks start on Monday: week = (day + 3) / 7.
+    # Marking every habit stale makes DatabaseHandler fill them in when it opens the file.
+    (5, """
+        CREATE TABLE IF NOT EXISTS habit_daily (
+            habit_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            completions INTEGER NOT NULL,
+            first_completion INTEGER NOT NULL,
+            last_completion INTEGER NOT NULL,
+            PRIMARY KEY (habit_id, day)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS habit_weekly (
+            habit_id INTEGER NOT NULL,
+            week INTEGER NOT NULL,
+            completions INTEGER NOT NULL,
+            first_completion INTEGER NOT NULL,
+            last_completion INTEGER NOT NULL,
+            PRIMARY KEY (habit_id, week)
+        ) WITHOUT ROWID;
+        UPDATE habit_stats SET stale = 1;
+    """),
+    # 6: a counter bumped by triggers on every change to habits or completions, so
+    # snapshot_watermark() also notices rows updated in place by other connections
+    (6, """
+        INSERT OR IGNORE INTO settings (key, value) VALUES ('change_counter', '0');
+    """ + "".join(f"{trigger};\n" for trigger in change_counter_triggers("habits")
+                   + change_counter_triggers("habit_history"))),
+]
+
+# The schema version a fully migrated database reports
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# Supported durability modes:
+#   full  - rollback journal, every write is committed (and fsynced) immediately
+#   group - WAL journal with synchronous=NORMAL; writes are committed in groups once
+#           commit_batch writes are pending or commit_interval seconds have passed
+DURABILITY_MODES = ("full", "group")
+
+
+# Supported encodings of habit_history.completion_time:
+#   iso      - ISO-8601 text, the original format
+#   epoch_us - INTEGER microseconds since 1970-01-01 of the naive wall-clock time
+TIMESTAMP_FORMATS = ("iso", "epoch_us")
+
+def encode_timestamp(time: datetime, timestamp_format: str) -> Union[int, str]:
+    """
+    Converts a completion time into its stored representation.
+    """
+    if timestamp_format == "iso":
+        return time.isoformat()
+    return to_micros(time)
+
+
+def decode_timestamp(value: Union[int, str]) -> datetime:
+    """
+    Converts a stored completion time of either format back into a datetime.
+    """
+    if isinstance(value, int):
+        return from_micros(value)
+    return datetime.fromisoformat(value)
+
+
+def read_only_uri(db_path: str) -> str:
+    """
+    SQLite URI that opens a database file read-only; the path is made absolute and
+    percent-escaped, so names containing '#', '?' or '%' are kept intact.
+    """
+    return Path(db_path).resolve().as_uri() + "?mode=ro"
+
+
+def stored_to_micros(value: Union[int, str]) -> int:
+    """
+    Converts a stored completion time of either format into epoch microseconds.
+    """
+    if isinstance(value, int):
+        return value
+    return to_micros(datetime.fromisoformat(value))
+
+
+# habit_stats values of a habit without completions:
+# (completion_count, distinct_days, last_completion, current_streak, longest_streak, broken)
+EMPTY_STATS = (0, 0, None, 0, 0, 1)
+
+
+def fold_stats(stats: tuple, completions: Iterable[int], period: int, start: int) -> tuple:
+    """
+    Extends a habit_stats tuple with sorted completion times (epoch microseconds)
+    that are not earlier than its last completion. Folding a whole history into
+    EMPTY_STATS gives the same figures as analytics_module.habit_statistics.
+    """
+    count, days, last, current, longest, broken = stats
+    for completion in completions:
+        if last is None:
+            # The first completion is measured against the start date, like Habit.broken()
+            broken = int(completion - start > period)
+            current = days = 1
+        else:
+            if completion - last > period:
+                broken = 1
+                current = 1
+            else:
+                current += 1
+            if completion // DAY_US != last // DAY_US:
+                days += 1
+        longest = max(longest, current)
+        count += 1
+        last = completion
+    return count, days, last, current, longest, broken
+
+
+def day_number(value: date) -> int:
+    """
+    Rollup day of a date: days since 1970-01-01.
+    """
+    return (value - EPOCH.date()).days
+
+
+def week_number(day: int) -> int:
+    """
+    Rollup week of a day number; weeks start on Monday (1970-01-01 was a Thursday).
+    """
+    return (day + 3) // 7
+
+
+def rollup_buckets(completions: Iterable[int]) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Aggregates completion times (epoch microseconds) into daily and weekly
+    (bucket, count, first, last) rows.
+    """
+    days: Dict[int, List[int]] = {}
+    weeks: Dict[int, List[int]] = {}
+    for completion in completions:
+        day = completion // DAY_US
+        for buckets, key in ((days, day), (weeks, week_number(day))):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [1, completion, completion]
+            else:
+                bucket[0] += 1
+                if completion < bucket[1]:
+                    bucket[1] = completion
+                if completion > bucket[2]:
+                    bucket[2] = completion
+    return ([(key, *bucket) for key, bucket in days.items()],
+            [(key, *bucket) for key, bucket in weeks.items()])
 
 
 class DatabaseHandler:
@@ -16,41 +246,448 @@ class DatabaseHandler:
     It creates required tables, saves new habits, loads habits, and stores completion events.
     """
 
-    def __init__(self, db_path: str = "habits.db"):
+    def __init__(self, db_path: str = "habits.db", timestamp_format: Optional[str] = None,
+                 durability: str = "full", commit_interval: float = 1.0, commit_batch: int = 100):
         """
-        Create a database connection and ensure all tables exist.
+        Create a database connection and bring the schema up to date.
+
+        :param timestamp_format: Optional storage format for completion times ('iso' or
+            'epoch_us'). When it differs from the file's current format, the history is
+            converted in place; None keeps whatever the file already uses.
+        :param durability: 'full' commits every write at once; 'group' switches to WAL
+            and commits pending writes together (see flush()).
+        :param commit_interval: In group mode, the longest time in seconds a write may wait.
+        :param commit_batch: In group mode, the number of pending writes that forces a commit.
         """
-        self.connection = sqlite3.connect(db_path)
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability!r}")
+
+        self.connection = self._connect(db_path)
         self.cursor = self.connection.cursor()
-        self._create_tables()
+        self._migrate()
+
+        # Group-commit state: writes not yet committed and when the oldest one was made
+        self.durability = durability
+        self.commit_interval = commit_interval
+        self.commit_batch = commit_batch
+        self._pending_writes = 0
+        self._first_pending = 0.0
+        if durability == "group":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        # Title -> habits.id for every habit this handler has loaded or saved
+        self._habit_ids: Dict[str, int] = {}
+
+        self.timestamp_format = self.connection.execute(
+            "SELECT value FROM settings WHERE key = 'timestamp_format'"
+        ).fetchone()[0]
+        if timestamp_format is not None:
+            self.convert_timestamps(timestamp_format, vacuum=True)
+
+        self._refresh_stale_stats()
 
     
-    def _create_tables(self):
-        """
-        Creates required tables for storing habits and their completion logs.
-        """
-        # Create the habits table
-        self.cursor.execute("""                          
-            CREATE TABLE IF NOT EXISTS habits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                frequency TEXT NOT NULL,
-                start_date TEXT NOT NULL
-            )    
-        """)   
-        # Create the habit_history table
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS habit_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                habit_id INTEGER NOT NULL,
-                completion_time TEXT NOT NULL,
-                FOREIGN KEY (habit_id) REFERENCES habits(id)
-            )
-        """)
-        # Apply the changes to the database
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """
+        Opens the connection used for writes (and, in this class, for reads too).
+        """
+        return sqlite3.connect(db_path)
+
+    
+    def _migrate(self):
+        """
+        Applies every schema migration newer than the database's PRAGMA user_version.
+        Each migration runs in its own transaction together with the version bump,
+        so an interrupted upgrade leaves the file at the last completed version.
+        """
+        current_version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+        for version, script in MIGRATIONS:
+            if version <= current_version:
+                continue
+            try:
+                self.connection.executescript(
+                    f"BEGIN; {script} PRAGMA user_version = {version}; COMMIT;"
+                )
+            except sqlite3.Error:
+                self.connection.rollback()
+                raise
+
+
+    def _commit(self, writes: int = 1):
+        """
+        Commits a write now in 'full' mode, or counts it towards the next group commit.
+        The interval is checked whenever a write arrives; call flush() when idle.
+        """
+        if self.durability == "full":
+            self.connection.commit()
+            return
+
+        if self._pending_writes == 0:
+            self._first_pending = clock.monotonic()
+        self._pending_writes += writes
+        if (self._pending_writes >= self.commit_batch
+                or clock.monotonic() - self._first_pending >= self.commit_interval):
+            self.flush()
+
+
+    @contextmanager
+    def _savepoint(self, name: str):
+        """
+        Runs the writes inside the block as one unit: on a database error all of them are
+        undone, without touching other pending group-commit writes.
+        """
+        began = not self.connection.in_transaction
+        if began:
+            # An outermost savepoint would commit on RELEASE, bypassing group commit
+            self.cursor.execute("BEGIN")
+        self.cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except sqlite3.Error:
+            if began:
+                # Nothing else is pending; ending the transaction also releases its lock
+                self.connection.rollback()
+            else:
+                self.cursor.execute(f"ROLLBACK TO {name}")
+                self.cursor.execute(f"RELEASE {name}")
+            raise
+        self.cursor.execute(f"RELEASE {name}")
+
+
+    @timed("storage.snapshot_watermark")
+    def snapshot_watermark(self) -> Dict[str, int]:
+        """
+        Figures that change whenever habits or completions are added, changed or removed,
+        by this or any other connection: the trigger-maintained change counter, row counts,
+        highest row ids and AUTOINCREMENT sequences, plus the schema version and timestamp
+        format. A saved snapshot of the habits is only valid while the watermark it was
+        taken at is unchanged.
+
+        Every figure is read from an index or a small table, so this costs O(habits).
+        """
+        habits, habit_max = self.connection.execute("SELECT COUNT(*), MAX(id) FROM habits").fetchone()
+        completions = self.connection.execute(
+            "SELECT COALESCE(SUM(completion_count), 0) FROM habit_stats"
+        ).fetchone()[0]
+        history_max = self.connection.execute("SELECT MAX(id) FROM habit_history").fetchone()[0]
+        sequences = dict(self.connection.execute("SELECT name, seq FROM sqlite_sequence"))
+        changes = self.connection.execute(
+            "SELECT value FROM settings WHERE key = 'change_counter'"
+        ).fetchone()[0]
+        return {
+            "user_version": self.connection.execute("PRAGMA user_version").fetchone()[0],
+            "timestamp_format": self.timestamp_format,
+            "changes": int(changes),
+            "habits": habits,
+            "habit_max_id": habit_max or 0,
+            "habit_seq": sequences.get("habits", 0),
+            "completions": completions,
+            "history_max_id": history_max or 0,
+            "history_seq": sequences.get("habit_history", 0),
+        }
+
+
+    @timed("storage.flush")
+    def flush(self):
+        """
+        Commits every pending group-commit write.
+        """
         self.connection.commit()
+        self._pending_writes = 0
 
 
+    def _refresh_stale_stats(self):
+        """
+        Recomputes the habit_stats row and the rollups of every habit marked stale (by the
+        migrations that added those tables) or without statistics (for habits inserted by
+        other tools with plain SQL).
+        """
+        stale = self.connection.execute(
+            """
+            SELECT habit_id FROM habit_stats WHERE stale = 1
+            UNION ALL
+            SELECT id FROM habits WHERE id NOT IN (SELECT habit_id FROM habit_stats)
+            """
+        ).fetchall()
+        if not stale:
+            return
+        for (habit_id,) in stale:
+            self._rebuild_stats(habit_id)
+            self._rebuild_rollups(habit_id)
+        self.connection.commit()
+
+
+    def _rebuild_stats(self, habit_id: int):
+        """
+        Recomputes one habit's habit_stats row from its full history.
+        """
+        habit = self.connection.execute(
+            "SELECT frequency, start_date FROM habits WHERE id = ?", (habit_id,)
+        ).fetchone()
+        if habit is None:
+            self.cursor.execute("DELETE FROM habit_stats WHERE habit_id = ?", (habit_id,))
+            return
+
+        period = DAY_US if habit[0].lower() == "daily" else WEEK_US
+        start = to_micros(datetime.fromisoformat(habit[1]))
+        completions = sorted(
+            stored_to_micros(value) for (value,) in self.connection.execute(
+                "SELECT completion_time FROM habit_history WHERE habit_id = ?", (habit_id,)
+            )
+        )
+        self.cursor.execute(
+            """
+            INSERT OR REPLACE INTO habit_stats (habit_id, completion_count, distinct_days,
+                last_completion, current_streak, longest_streak, broken, stale)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+            """,
+            (habit_id, *fold_stats(EMPTY_STATS, completions, period, start))
+        )
+
+
+    def _rebuild_stale_stats(self):
+        """
+        Recomputes every habit_stats row marked stale, each from one read of its history.
+        """
+        stale = self.connection.execute("SELECT habit_id FROM habit_stats WHERE stale = 1").fetchall()
+        for (habit_id,) in stale:
+            self._rebuild_stats(habit_id)
+        if stale:
+            self._commit(len(stale))
+
+
+    def _rebuild_rollups(self, habit_id: int):
+        """
+        Recomputes one habit's daily and weekly rollups from its full history.
+        """
+        self.cursor.execute("DELETE FROM habit_daily WHERE habit_id = ?", (habit_id,))
+        self.cursor.execute("DELETE FROM habit_weekly WHERE habit_id = ?", (habit_id,))
+        self._add_to_rollups(habit_id, [
+            stored_to_micros(value) for (value,) in self.connection.execute(
+                "SELECT completion_time FROM habit_history WHERE habit_id = ?", (habit_id,)
+            )
+        ])
+
+
+    def _add_to_rollups(self, habit_id: int, completions: List[int]):
+        """
+        Adds completions (epoch microseconds, any order) to their daily and weekly buckets.
+        """
+        daily, weekly = rollup_buckets(completions)
+        for table, bucket, rows in (("habit_daily", "day", daily), ("habit_weekly", "week", weekly)):
+            self.cursor.executemany(
+                f"""
+                INSERT INTO {table} (habit_id, {bucket}, completions, first_completion, last_completion)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (habit_id, {bucket}) DO UPDATE SET
+                    completions = completions + excluded.completions,
+                    first_completion = min(first_completion, excluded.first_completion),
+                    last_completion = max(last_completion, excluded.last_completion)
+                """,
+                [(habit_id, *row) for row in rows]
+            )
+
+
+    @timed("storage.completions_between")
+    def completions_between(self, habit_title: str, start: date, end: date) -> int:
+        """
+        Count a habit's completions on the days start..end (inclusive) from the rollups.
+        Whole weeks are read from the weekly rollup and only the partial weeks at either
+        end from the daily one, so the cost grows with the number of weeks, not completions.
+        """
+        habit_id = self.habit_id(habit_title)
+        first_day, last_day = day_number(start), day_number(end)
+        if habit_id is None or last_day < first_day:
+            return 0
+
+        # Whole weeks inside the range: week w covers days 7w-3 .. 7w+3
+        first_week = -((-first_day - 3) // 7)  # ceil((first_day + 3) / 7)
+        last_week = (last_day + 4) // 7 - 1
+        if first_week > last_week:
+            return self._daily_completions(habit_id, first_day, last_day)
+
+        weekly = self.connection.execute(
+            "SELECT COALESCE(SUM(completions), 0) FROM habit_weekly WHERE habit_id = ? AND week BETWEEN ? AND ?",
+            (habit_id, first_week, last_week)
+        ).fetchone()[0]
+        return (weekly
+                + self._daily_completions(habit_id, first_day, 7 * first_week - 4)
+                + self._daily_completions(habit_id, 7 * last_week + 4, last_day))
+
+
+    def _daily_completions(self, habit_id: int, first_day: int, last_day: int) -> int:
+        if last_day < first_day:
+            return 0
+        return self.connection.execute(
+            "SELECT COALESCE(SUM(completions), 0) FROM habit_daily WHERE habit_id = ? AND day BETWEEN ? AND ?",
+            (habit_id, first_day, last_day)
+        ).fetchone()[0]
+
+
+    @timed("storage.completed_days_between")
+    def completed_days_between(self, habit_title: str, start: date, end: date) -> int:
+        """
+        Count the distinct days start..end (inclusive) on which a habit was completed.
+        """
+        habit_id = self.habit_id(habit_title)
+        if habit_id is None:
+            return 0
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM habit_daily WHERE habit_id = ? AND day BETWEEN ? AND ?",
+            (habit_id, day_number(start), day_number(end))
+        ).fetchone()[0]
+
+
+    def _add_to_stats(self, habit_id: int, completions: List[int], defer: bool = False):
+        """
+        Updates a habit's habit_stats row for newly inserted completions (epoch microseconds).
+        Completions after the last recorded one are folded in; anything else rebuilds the row,
+        or with defer=True only marks it stale for _rebuild_stale_stats() to recompute once.
+        """
+        row = self.connection.execute(
+            """
+            SELECT s.completion_count, s.distinct_days, s.last_completion, s.current_streak,
+                   s.longest_streak, s.broken, s.stale, h.frequency, h.start_date
+            FROM habit_stats s JOIN habits h ON h.id = s.habit_id
+            WHERE s.habit_id = ?
+            """,
+            (habit_id,)
+        ).fetchone()
+        completions = sorted(completions)
+        if row is None or row[6] or (row[2] is not None and completions[0] < row[2]):
+            if not defer:
+                self._rebuild_stats(habit_id)
+            elif row is None:
+                self.cursor.execute("INSERT OR REPLACE INTO habit_stats (habit_id, stale) VALUES (?, 1)", (habit_id,))
+            elif not row[6]:
+                self.cursor.execute("UPDATE habit_stats SET stale = 1 WHERE habit_id = ?", (habit_id,))
+            return
+
+        period = DAY_US if row[7].lower() == "daily" else WEEK_US
+        start = to_micros(datetime.fromisoformat(row[8]))
+        self.cursor.execute(
+            """
+            UPDATE habit_stats SET completion_count = ?, distinct_days = ?, last_completion = ?,
+                current_streak = ?, longest_streak = ?, broken = ?
+            WHERE habit_id = ?
+            """,
+            (*fold_stats(row[:6], completions, period, start), habit_id)
+        )
+
+
+    @timed("storage.load_habit_stats")
+    def load_habit_stats(self) -> Dict[str, Dict]:
+        """
+        Read the maintained per-habit statistics without touching the history table.
+
+        Returns title -> frequency, start_date, completion_count, total_completed_days,
+        last_completion, current_streak, longest_streak and broken, in creation order.
+        Frequencies are lowercased, as Habit does.
+        """
+        rows = self.connection.execute(
+            """
+            SELECT h.title, h.frequency, h.start_date, s.completion_count, s.distinct_days,
+                   s.last_completion, s.current_streak, s.longest_streak, s.broken
+            FROM habits h JOIN habit_stats s ON s.habit_id = h.id
+            ORDER BY h.id
+            """
+        )
+        return {
+            title: {
+                "frequency": frequency.lower(),
+                "start_date": datetime.fromisoformat(start_date),
+                "completion_count": count,
+                "total_completed_days": days,
+                "last_completion": from_micros(last) if last is not None else None,
+                "current_streak": current,
+                "longest_streak": longest,
+                "broken": bool(broken),
+            }
+            for title, frequency, start_date, count, days, last, current, longest, broken in rows
+        }
+
+
+    @timed("storage.convert_timestamps")
+    def convert_timestamps(self, timestamp_format: str, batch_size: int = 10000,
+                           vacuum: bool = False):
+        """
+        Rewrites every stored completion time in the given format.
+
+        The history table is rebuilt without a declared column type (a TEXT column
+        would coerce integers back into text) and filled in batches inside a single
+        transaction, so other connections see either the old or the new table.
+        Pass vacuum=True to give the pages of the old table back to the file system.
+        """
+        if timestamp_format not in TIMESTAMP_FORMATS:
+            raise ValueError(f"Unknown timestamp format: {timestamp_format!r}")
+        if timestamp_format == self.timestamp_format:
+            return
+
+        self.flush()
+        reader = self.connection.cursor()
+        try:
+            self.cursor.execute("BEGIN")
+            self.cursor.execute("""
+                CREATE TABLE habit_history_new (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    habit_id INTEGER NOT NULL,
+                    completion_time NOT NULL,
+                    FOREIGN KEY (habit_id) REFERENCES habits(id)
+                )
+            """)
+            reader.execute("SELECT id, habit_id, completion_time FROM habit_history ORDER BY id")
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                self.cursor.executemany(
+                    "INSERT INTO habit_history_new (id, habit_id, completion_time) VALUES (?, ?, ?)",
+                    [
+                        (row_id, habit_id, encode_timestamp(decode_timestamp(value), timestamp_format))
+                        for row_id, habit_id, value in rows
+                    ]
+                )
+
+            # Keep AUTOINCREMENT from reusing ids of rows deleted before the rebuild
+            self.cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'habit_history'")
+            sequence = self.cursor.fetchone()
+            self.cursor.execute("DROP TABLE habit_history")
+            self.cursor.execute("ALTER TABLE habit_history_new RENAME TO habit_history")
+            if sequence is not None:
+                # The renamed table has no sequence row at all when it is empty, and
+                # sqlite_sequence has no unique key to upsert on, so replace the row by hand
+                self.cursor.execute("SELECT MAX(seq) FROM sqlite_sequence WHERE name = 'habit_history'")
+                current = self.cursor.fetchone()[0]
+                self.cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'habit_history'")
+                self.cursor.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES ('habit_history', ?)",
+                    (max(sequence[0], current or 0),)
+                )
+            self.cursor.execute(
+                "CREATE INDEX idx_history_habit_time ON habit_history (habit_id, completion_time)"
+            )
+            # Triggers were dropped with the old table
+            for trigger in change_counter_triggers("habit_history"):
+                self.cursor.execute(trigger)
+            self.cursor.execute(
+                "UPDATE settings SET value = ? WHERE key = 'timestamp_format'",
+                (timestamp_format,)
+            )
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+        finally:
+            reader.close()
+
+        self.timestamp_format = timestamp_format
+        if vacuum:
+            self.connection.execute("VACUUM")
+
+
+    @timed("storage.save_habit")
     def save_habit(self, habit: Habit) -> bool:
         """
         Save a new habit into the database.
@@ -63,7 +700,10 @@ class DatabaseHandler:
                 """,
                 (habit.title, habit.frequency, habit.start_date.isoformat())
             )
-            self.connection.commit()
+            habit_id = self.cursor.lastrowid
+            self.cursor.execute("INSERT OR REPLACE INTO habit_stats (habit_id) VALUES (?)", (habit_id,))
+            self._commit()
+            self._habit_ids[habit.title] = habit_id
             return True
             
         except sqlite3.IntegrityError:
@@ -71,34 +711,112 @@ class DatabaseHandler:
             return False
         
 
-    def load_habits(self) -> List[Habit]:
+    @timed("storage.load_habits")
+    def load_habits(self, history_source=None) -> List[Habit]:
         """
         Load all habits along with their stored completion history.
+
+        Uses two set-based queries instead of one history query per habit:
+        habits are read first, then the whole history table is streamed once
+        and routed to its habit by id.
+
+        :param history_source: Optional lazy loader (such as LazyHistoryLoader). When given,
+            only habit metadata is read and each history is fetched through it on first use.
+        """
+        habits, self._habit_ids = self._load_habits(self.connection, history_source)
+        return habits
+
+
+    def _load_habits(self, connection: sqlite3.Connection,
+                     history_source=None) -> Tuple[List[Habit], Dict[str, int]]:
+        """
+        Loads all habits through the given connection; returns them and their title -> id map.
         """
-        self.cursor.execute("SELECT id, title, frequency, start_date FROM habits")
-        rows = self.cursor.fetchall()
+        if history_source is not None:
+            return self._load_habit_metadata(connection, history_source)
 
         habits: List[Habit] = []
+        compact = self.timestamp_format == "epoch_us"
+        histories: Dict[int, Union[array, List[str]]] = {}
+        habit_ids: Dict[str, int] = {}
 
-        for habit_id, title, frequency, start_date_str in rows:
+        for habit_id, title, frequency, start_date_str in connection.execute(
+            "SELECT id, title, frequency, start_date FROM habits ORDER BY id"
+        ).fetchall():
+            habit_ids[title] = habit_id
             # Create Habit instance
             habit = Habit(title=title, frequency=frequency)
             habit.start_date = datetime.fromisoformat(start_date_str)
+            histories[habit_id] = array("q") if compact else []
+            habits.append(habit)
 
-            # Load completion history for this habit
-            self.cursor.execute(
-                "SELECT completion_time FROM habit_history WHERE habit_id = ?",
-                (habit_id,)
-            )
-            completion_rows = self.cursor.fetchall()
+        # Stream every completion in a single pass over the (habit_id, completion_time)
+        # index, so each habit's values arrive already in chronological order
+        for habit_id, value in connection.execute(
+            "SELECT habit_id, completion_time FROM habit_history ORDER BY habit_id, completion_time"
+        ):
+            history = histories.get(habit_id)
+            if history is not None:
+                history.append(value)
+
+        # Timestamps stay encoded until a habit's history is first used;
+        # integer timestamps need no conversion at all
+        decode = None if compact else stored_to_micros
+        for habit, values in zip(habits, histories.values()):
+            habit.load_encoded_history(values, decode)
 
-            for (time_str,) in completion_rows:
-                habit.history.append(datetime.fromisoformat(time_str))
+        return habits, habit_ids
+
+    
+    def _load_habit_metadata(self, connection: sqlite3.Connection,
+                             history_source) -> Tuple[List[Habit], Dict[str, int]]:
+        """
+        Loads habits without their histories, attaching the lazy history source to each.
+        """
+        habits: List[Habit] = []
+        habit_ids: Dict[str, int] = {}
+        for habit_id, title, frequency, start_date_str in connection.execute(
+            "SELECT id, title, frequency, start_date FROM habits ORDER BY id"
+        ):
+            habit_ids[title] = habit_id
+            habit = Habit(title=title, frequency=frequency)
+            habit.start_date = datetime.fromisoformat(start_date_str)
+            habit.set_history_source(history_source)
             habits.append(habit)
 
-        return habits
+        return habits, habit_ids
+
+
+    @timed("storage.load_history")
+    def load_history(self, habit_title: str) -> CompletionHistory:
+        """
+        Load the completion history of one habit through the (habit_id, completion_time) index.
+        """
+        habit_id = self.habit_id(habit_title)
+        rows = self.connection.execute(
+            "SELECT completion_time FROM habit_history WHERE habit_id = ? ORDER BY completion_time",
+            (habit_id,)
+        )
+        if self.timestamp_format == "epoch_us":
+            return CompletionHistory.from_sorted_micros(array("q", (value for (value,) in rows)))
+        return CompletionHistory.from_micros(stored_to_micros(value) for (value,) in rows)
 
     
+    @timed("storage.habit_id")
+    def habit_id(self, habit_title: str) -> Optional[int]:
+        """
+        Returns the row id of a habit, using the in-memory title map before asking SQLite.
+        """
+        habit_id = self._habit_ids.get(habit_title)
+        if habit_id is None:
+            self.cursor.execute("SELECT id FROM habits WHERE title = ?", (habit_title,))
+            row = self.cursor.fetchone()
+            if row:
+                habit_id = self._habit_ids[habit_title] = row[0]
+        return habit_id
+
+    
+    @timed("storage.record_completion")
     def record_completion(self, habit_title: str, time: Optional[datetime] = None) -> bool:
         """
         Record a completion event for a habit.     
@@ -109,47 +827,302 @@ class DatabaseHandler:
 
         try:
             # Find habit ID by title
-            self.cursor.execute("SELECT id FROM habits WHERE title = ?", (habit_title,))
-            result = self.cursor.fetchone()
+            habit_id = self.habit_id(habit_title)
     
-            if result:
-                habit_id = result[0]   # Habit not found
-                self.cursor.execute(
-                    """
-                    INSERT INTO habit_history (habit_id, completion_time)
-                    VALUES (?, ?)
-                    """,
-                    (habit_id, time.isoformat())
-                )
-                self.connection.commit()
+            if habit_id is not None:
+                # The completion, its statistics and its rollups are stored together or not at all
+                with self._savepoint("record_completion"):
+                    self.cursor.execute(
+                        """
+                        INSERT INTO habit_history (habit_id, completion_time)
+                        VALUES (?, ?)
+                        """,
+                        (habit_id, encode_timestamp(time, self.timestamp_format))
+                    )
+                    self._add_to_stats(habit_id, [to_micros(time)])
+                    self._add_to_rollups(habit_id, [to_micros(time)])
+                self._commit()
                 return True
             return False
         except sqlite3.Error:
             return False
 
+
+    @timed("storage.record_completions")
+    def record_completions(self, events: Iterable[Tuple[str, datetime]], chunk_size: int = 10000) -> int:
+        """
+        Record many completion events at once and return how many were stored.
+
+        Each title is resolved to its row id only once, rows are inserted with
+        executemany, and every chunk of chunk_size rows is committed as one
+        transaction. Events for unknown titles are skipped. On a database error
+        the current chunk is undone and the count stored so far is returned.
+        Habits that received completions older than their last one (a backfill) get
+        their statistics rebuilt once at the end rather than once per chunk.
+        """
+        fmt = self.timestamp_format
+        unknown = set()
+        stored = 0
+        chunk: List[Tuple[int, Union[int, str]]] = []
+
+        try:
+            for title, time in events:
+                habit_id = self._habit_ids.get(title)
+                if habit_id is None:
+                    if title in unknown:
+                        continue
+                    habit_id = self.habit_id(title)
+                    if habit_id is None:
+                        unknown.add(title)
+                        continue
+                chunk.append((habit_id, encode_timestamp(time, fmt)))
+
+                if len(chunk) >= chunk_size:
+                    stored += self._insert_completions(chunk)
+                    chunk = []
+
+            if chunk:
+                stored += self._insert_completions(chunk)
+        except sqlite3.Error:
+            pass
+        finally:
+            try:
+                self._rebuild_stale_stats()
+            except sqlite3.Error:
+                # Left stale; recomputed the next time the database is opened
+                pass
+        return stored
+
+
+    @timed("storage.insert_completions")
+    def _insert_completions(self, rows: List[Tuple[int, Union[int, str]]]) -> int:
+        """
+        Insert (habit_id, stored time) rows as one unit.
+        A savepoint undoes a failed chunk without touching other pending group-commit writes.
+        """
+        with self._savepoint("insert_chunk"):
+            self.cursor.executemany(
+                "INSERT INTO habit_history (habit_id, completion_time) VALUES (?, ?)",
+                rows
+            )
+            added: Dict[int, List[int]] = {}
+            for habit_id, value in rows:
+                added.setdefault(habit_id, []).append(stored_to_micros(value))
+            for habit_id, completions in added.items():
+                self._add_to_stats(habit_id, completions, defer=True)
+                self._add_to_rollups(habit_id, completions)
+        self._commit(len(rows))
+        return len(rows)
+
     
+    @timed("storage.delete_habit")
     def delete_habit(self, habit_title: str) -> bool:
         """
         Remove a habit and all of its completion logs.
         """
         try:
         # Find ID first
-            self.cursor.execute("SELECT id FROM habits WHERE title = ?", (habit_title,))
-            row = self.cursor.fetchone()
+            habit_id = self.habit_id(habit_title)
     
-            if  row:
-                habit_id = row[0]
-                # Delete completion records
-                self.cursor.execute("DELETE FROM habit_history WHERE habit_id = ?", (habit_id,))
-                 # Delete the habit itself
-                self.cursor.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
-                self.connection.commit()
+            if habit_id is not None:
+                with self._savepoint("delete_habit"):
+                    # Delete completion records and their statistics
+                    self.cursor.execute("DELETE FROM habit_history WHERE habit_id = ?", (habit_id,))
+                    self.cursor.execute("DELETE FROM habit_stats WHERE habit_id = ?", (habit_id,))
+                    self.cursor.execute("DELETE FROM habit_daily WHERE habit_id = ?", (habit_id,))
+                    self.cursor.execute("DELETE FROM habit_weekly WHERE habit_id = ?", (habit_id,))
+                    # Delete the habit itself
+                    self.cursor.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
+                self._commit()
+                self._habit_ids.pop(habit_title, None)
                 return True
             return False
         except sqlite3.Error:
             return False
 
     
+    @timed("storage.close")
     def close(self):
-        """Close the database connection."""
+        """Commit any pending writes and close the database connection."""
+        self.flush()
         self.connection.close()
+
+
+def _serialized(method: Callable) -> Callable:
+    """
+    Runs a DatabaseHandler method while holding the pool's writer lock.
+    """
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class LazyHistoryLoader:
+    """
+    Fetches habit histories from storage on first access and keeps at most
+    max_histories of them in memory, dropping the least recently used one first.
+    """
+
+    def __init__(self, storage: DatabaseHandler, max_histories: int = 1000):
+        self.storage = storage
+        self.max_histories = max(1, max_histories)
+        # Habits whose history is in memory, least recently used first
+        self._loaded: "OrderedDict[int, Habit]" = OrderedDict()
+
+
+    def load(self, habit: Habit) -> CompletionHistory:
+        """
+        Reads one habit's history and evicts the oldest ones above the limit.
+        """
+        history = self.storage.load_history(habit.title)
+        self._loaded[id(habit)] = habit
+        self._loaded.move_to_end(id(habit))
+        while len(self._loaded) > self.max_histories:
+            _, evicted = self._loaded.popitem(last=False)
+            evicted.unload_history()
+        return history
+
+
+    def touch(self, habit: Habit):
+        """
+        Marks a habit's in-memory history as recently used.
+        """
+        if id(habit) in self._loaded:
+            self._loaded.move_to_end(id(habit))
+
+
+    def forget(self, habit: Habit):
+        """
+        Stops tracking a habit (for example after it was deleted).
+        """
+        self._loaded.pop(id(habit), None)
+
+
+    def clear(self):
+        """
+        Forgets every loaded history, for example before the habits are reloaded.
+        """
+        self._loaded.clear()
+
+
+    def __len__(self) -> int:
+        return len(self._loaded)
+
+
+class PooledDatabaseHandler(DatabaseHandler):
+    """
+    A DatabaseHandler that can be shared by many threads.
+
+    All writes go through one connection guarded by a lock, so they are serialized.
+    Reads such as load_habits check out one of up to pool_size read-only connections,
+    each inside its own read transaction, and run in parallel with each other and with
+    the writer thanks to WAL journaling. Pending group-commit writes are not visible to
+    readers until they are flushed.
+    """
+
+    def __init__(self, db_path: str = "habits.db", pool_size: int = 4, busy_timeout: float = 5.0,
+                 **options):
+        """
+        :param pool_size: Maximum number of read connections.
+        :param busy_timeout: Seconds a connection waits for a lock before failing.
+        :param options: Passed on to DatabaseHandler (timestamp_format, durability, ...).
+        """
+        if db_path == ":memory:" or db_path.startswith("file::memory:"):
+            raise ValueError("A connection pool needs a database file, not an in-memory database")
+
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        self._write_lock = threading.RLock()
+        self._readers: "Queue[sqlite3.Connection]" = Queue()
+        self._reader_count = 0
+        self._all_readers: List[sqlite3.Connection] = []
+
+        super().__init__(db_path, **options)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        # The writer is shared between threads; the lock makes that safe
+        return sqlite3.connect(db_path, timeout=self.busy_timeout, check_same_thread=False)
+
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Checks out a read connection holding a consistent snapshot of the database.
+        Blocks while all pool_size connections are in use.
+        """
+        connection = self._checkout()
+        try:
+            connection.execute("BEGIN")
+            yield connection
+        finally:
+            connection.rollback()
+            self._readers.put(connection)
+
+
+    def _checkout(self) -> sqlite3.Connection:
+        """
+        Takes an idle read connection, opening a new one while the pool is not full.
+        """
+        try:
+            return self._readers.get_nowait()
+        except Empty:
+            pass
+        with self._write_lock:
+            if self._reader_count < self.pool_size:
+                self._reader_count += 1
+                connection = sqlite3.connect(
+                    read_only_uri(self.db_path), uri=True,
+                    timeout=self.busy_timeout, check_same_thread=False
+                )
+                self._all_readers.append(connection)
+                return connection
+        return self._readers.get()
+
+
+    @timed("storage.load_habits")
+    def load_habits(self, history_source=None) -> List[Habit]:
+        """
+        Load all habits through a pooled read connection.
+        Pending group-commit writes are flushed first, since readers cannot see them.
+        """
+        with self._write_lock:
+            if self._pending_writes:
+                self.flush()
+        with self.reader() as connection:
+            habits, _ = self._load_habits(connection, history_source)
+        with self._write_lock:
+            # The reader's snapshot may already be out of date; only the writer sees every write
+            self._habit_ids = dict(self.connection.execute("SELECT title, id FROM habits"))
+        return habits
+
+
+    # Every method that uses the shared writer connection or cursor is serialized
+    save_habit = _serialized(DatabaseHandler.save_habit)
+    habit_id = _serialized(DatabaseHandler.habit_id)
+    # Served by the writer so a lazily loaded history includes not-yet-flushed writes
+    load_history = _serialized(DatabaseHandler.load_history)
+    load_habit_stats = _serialized(DatabaseHandler.load_habit_stats)
+    snapshot_watermark = _serialized(DatabaseHandler.snapshot_watermark)
+    completions_between = _serialized(DatabaseHandler.completions_between)
+    completed_days_between = _serialized(DatabaseHandler.completed_days_between)
+    record_completion = _serialized(DatabaseHandler.record_completion)
+    record_completions = _serialized(DatabaseHandler.record_completions)
+    delete_habit = _serialized(DatabaseHandler.delete_habit)
+    convert_timestamps = _serialized(DatabaseHandler.convert_timestamps)
+    flush = _serialized(DatabaseHandler.flush)
+
+
+    def close(self):
+        """
+        Flush and close the writer, then close every read connection.
+        """
+        with self._write_lock:
+            super().close()
+            for connection in self._all_readers:
+                connection.close()
+            self._all_readers.clear()
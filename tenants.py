@@ -0,0 +1,185 @@
+# Multi-tenant front end for the Habit Tracking App.
+# Serves many users from one process, each with their own database file
+# (<directory>/<user_id>.db), while keeping at most max_open managers open at a time
+# (each with a writer and one reader connection by default). The least recently used idle manager
+# is closed when the limit is exceeded and re-opened on the next access.
+#
+#   tenants = TenantManagers("users/", max_open=64)
+#   with tenants.use("alice") as manager:
+#       manager.mark_habit_complete("Read")
+
+# Import necessary built in modules
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+# Import custom modules
+from manager import HabitManager
+from storage import PooledDatabaseHandler
+
+# User ids become file names, so only a safe character set is accepted
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+
+
+class _Tenant:
+    """
+    One manager, how many callers are using it, and the lock that serializes them.
+    The manager is opened by the first caller; others wait on ready until it is.
+    """
+
+    __slots__ = ("manager", "pins", "lock", "ready", "error")
+
+    def __init__(self):
+        self.manager: Optional[HabitManager] = None
+        self.pins = 0
+        self.lock = threading.RLock()
+        self.ready = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class TenantManagers:
+    """
+    An LRU-bounded cache of per-user HabitManagers.
+
+    Managers are pinned while inside use() and are never closed while pinned, so the
+    cache can briefly hold more than max_open managers when all of them are busy.
+    Calls for the same user are serialized; different users proceed in parallel, and
+    opening or closing one user's manager never blocks the others.
+    """
+
+    def __init__(self, directory: str, max_open: int = 64,
+                 manager_factory: Optional[Callable[[str], HabitManager]] = None, **manager_options):
+        """
+        :param directory: Folder holding one database file per user.
+        :param max_open: Number of idle managers kept open.
+        :param manager_factory: Builds the manager for a database path. By default a
+            HabitManager(path, **manager_options) on a PooledDatabaseHandler, which any
+            thread may use. A custom factory must also return thread-safe managers.
+        """
+        self.directory = directory
+        self.max_open = max(1, max_open)
+        self.manager_factory = manager_factory or (
+            lambda path: HabitManager(path, storage=PooledDatabaseHandler(path, pool_size=1), **manager_options)
+        )
+        self._tenants: "OrderedDict[str, _Tenant]" = OrderedDict()
+        # Users whose evicted manager is still closing: user id -> set once it is closed
+        self._closing: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+
+    def path_for(self, user_id: str) -> str:
+        """
+        The database file of a user.
+        """
+        if not USER_ID_PATTERN.fullmatch(user_id) or user_id in (".", ".."):
+            raise ValueError(f"Invalid user id: {user_id!r}")
+        return os.path.join(self.directory, f"{user_id}.db")
+
+
+    @contextmanager
+    def use(self, user_id: str) -> Iterator[HabitManager]:
+        """
+        Opens (or reuses) the user's manager and pins it for the duration of the block.
+        """
+        path = self.path_for(user_id)
+        with self._lock:
+            tenant = self._tenants.get(user_id)
+            opener = tenant is None
+            if opener:
+                tenant = self._tenants[user_id] = _Tenant()
+                closing = self._closing.get(user_id)
+            self._tenants.move_to_end(user_id)
+            tenant.pins += 1
+            evicted = self._evict_idle()
+
+        try:
+            self._close_all(evicted)
+            if opener:
+                self._open(user_id, tenant, path, closing)
+            else:
+                tenant.ready.wait()
+            if tenant.error is not None:
+                raise tenant.error
+            with tenant.lock:
+                yield tenant.manager
+        finally:
+            with self._lock:
+                tenant.pins -= 1
+                evicted = self._evict_idle()
+            self._close_all(evicted)
+
+
+    def _open(self, user_id: str, tenant: _Tenant, path: str, closing: Optional[threading.Event]):
+        """
+        Builds a placeholder's manager outside the cache lock, after any previous manager
+        of the same user has finished closing (and so flushed its writes).
+        """
+        try:
+            if closing is not None:
+                closing.wait()
+            tenant.manager = self.manager_factory(path)
+        except BaseException as error:
+            tenant.error = error
+            with self._lock:
+                if self._tenants.get(user_id) is tenant:
+                    del self._tenants[user_id]
+        finally:
+            tenant.ready.set()
+
+
+    def _evict_idle(self) -> List[Tuple[str, _Tenant, threading.Event]]:
+        """
+        Removes least recently used unpinned managers until at most max_open are open and
+        returns them for _close_all(). The caller holds self._lock.
+        """
+        excess = len(self._tenants) - self.max_open
+        if excess <= 0:
+            return []
+        evicted = []
+        for user_id in [user_id for user_id, tenant in self._tenants.items() if tenant.pins == 0][:excess]:
+            closed = self._closing[user_id] = threading.Event()
+            evicted.append((user_id, self._tenants.pop(user_id), closed))
+        return evicted
+
+
+    def _close_all(self, evicted: List[Tuple[str, _Tenant, threading.Event]]):
+        """
+        Closes evicted managers without holding self._lock.
+        """
+        for user_id, tenant, closed in evicted:
+            try:
+                # close() may catch a manager that is still being opened
+                tenant.ready.wait()
+                if tenant.manager is not None:
+                    tenant.manager.close()
+            finally:
+                with self._lock:
+                    if self._closing.get(user_id) is closed:
+                        del self._closing[user_id]
+                closed.set()
+
+
+    def is_open(self, user_id: str) -> bool:
+        """
+        Whether the user's manager is currently open.
+        """
+        return user_id in self._tenants
+
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+
+    def close(self):
+        """
+        Closes every open manager.
+        """
+        with self._lock:
+            evicted = []
+            while self._tenants:
+                user_id, tenant = self._tenants.popitem(last=False)
+                closed = self._closing[user_id] = threading.Event()
+                evicted.append((user_id, tenant, closed))
+        self._close_all(evicted)
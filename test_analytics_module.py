@@ -123,6 +123,25 @@ class TestAnalyticsModule(unittest.TestCase):
         self.assertEqual(summary["broken_habits"], 1)
         self.assertEqual(summary["unbroken_habits"], 1)
 
+    def test_summary_and_statistics(self):
+        """
+        Test that the single-pass statistics agree with the per-habit methods.
+        """
+        h1 = create_habit("A", "daily", days_completed=4)
+        h2 = create_habit("B", "weekly", days_completed=2, broken=True)
+
+        summary, statistics = analytics.summary_and_statistics([h1, h2])
+
+        self.assertEqual(summary, analytics.overall_summary([h1, h2]))
+        for habit in (h1, h2):
+            stats = statistics[habit.title]
+            self.assertEqual(stats["current_streak"], habit.calculate_current_streak())
+            self.assertEqual(stats["broken"], habit.broken())
+            self.assertEqual(stats["total_completed_days"], habit.total_completed_days())
+            self.assertEqual(stats["last_completion"], habit.get_last_completion_date())
+        self.assertEqual(statistics["A"]["longest_streak"], 4)
+        self.assertEqual(statistics["B"]["longest_streak"], 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+# Test suite for the asyncio manager
+# import necessary built in modules
+import asyncio
+import os
+import tempfile
+import unittest
+# import custom modules
+from async_manager import AsyncHabitManager
+
+
+class TestAsyncHabitManager(unittest.IsolatedAsyncioTestCase):
+    """
+    These tests drive the async manager against a temporary database.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Open a manager on an empty database.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "test.db")
+        self.manager = await AsyncHabitManager.open(self.db_path)
+
+    async def asyncTearDown(self):
+        """
+        Close the manager and remove the database.
+        """
+        await self.manager.close()
+        self.directory.cleanup()
+
+    async def test_create_mark_and_summary(self):
+        """
+        Test the basic write path and an analytics call.
+        """
+        self.assertTrue(await self.manager.create_habit("Read", "daily"))
+        self.assertTrue(await self.manager.mark_habit_complete("Read"))
+
+        summary = await self.manager.summary()
+        self.assertEqual(summary["total_habits"], 1)
+        self.assertEqual(await self.manager.largest_streak(), 1)
+
+    async def test_concurrent_requests(self):
+        """
+        Test that many concurrent coroutines are serialized safely on the storage thread.
+        """
+        await asyncio.gather(*(self.manager.create_habit(f"habit-{i}", "daily") for i in range(20)))
+        await asyncio.gather(*(self.manager.mark_habit_complete(f"habit-{i}") for i in range(20)))
+
+        titles = await self.manager.get_habit_titles()
+        self.assertEqual(sorted(titles), sorted(f"habit-{i}" for i in range(20)))
+        self.assertEqual(len(await self.manager.get_unbroken_habits()), 20)
+
+        # Everything was persisted, as seen by a fresh manager
+        await self.manager.close()
+        self.manager = await AsyncHabitManager.open(self.db_path)
+        self.assertEqual(len(await self.manager.list_habits()), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# Test suite for the benchmark helpers
+# import necessary built in modules
+import tempfile
+import unittest
+# import custom modules
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    """
+    These tests cover the data generator and the regression check, not timings.
+    """
+
+    def test_generator_is_deterministic(self):
+        """
+        Test that a seed always produces the same, sorted data with both frequencies.
+        """
+        first = list(benchmark.generate_dataset(6, 50, seed=4))
+        self.assertEqual(first, list(benchmark.generate_dataset(6, 50, seed=4)))
+        self.assertNotEqual(first, list(benchmark.generate_dataset(6, 50, seed=5)))
+
+        self.assertEqual({frequency for _, frequency, _ in first}, {"daily", "weekly"})
+        for _, _, completions in first:
+            self.assertEqual(len(completions), 50)
+            self.assertEqual(completions, sorted(completions))
+
+    def test_compare_results(self):
+        """
+        Test that only slowdowns beyond both the threshold and the noise floor are reported.
+        """
+        baseline = {"10x10": {"load": 0.100, "tiny": 0.0001, "fast": 0.100}}
+        current = {"10x10": {"load": 0.200, "tiny": 0.0004, "fast": 0.110, "new": 1.0}}
+
+        self.assertEqual(benchmark.compare_results(baseline, current, threshold=0.25, min_delta=0.001),
+                         [("10x10", "load", 0.100, 0.200)])
+
+    def test_benchmark_scale(self):
+        """
+        Test that one small scale times every operation.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            results = benchmark.benchmark_scale(directory, 5, 10, repeat=1, writes=5)
+
+        for name in benchmark.ANALYTICS:
+            self.assertIn(f"analytics.{name}", results)
+        for name in ("load_habits", "record_completion", "HabitManager", "export.csv", "export.columnar"):
+            self.assertGreater(results[name], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
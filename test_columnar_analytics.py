@@ -0,0 +1,96 @@
+# Test suite for the columnar analytics engine
+# import necessary built in modules
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+# import custom modules
+from habit import Habit
+from storage import DatabaseHandler
+import analytics_module as analytics
+import columnar_analytics as columnar
+
+
+def random_habits(count, seed=7):
+    """
+    Builds habits with random gaps so that some are broken and streaks differ.
+    """
+    generator = random.Random(seed)
+    habits = []
+    for index in range(count):
+        habit = Habit(f"habit-{index}", "daily" if index % 3 else "weekly")
+        habit.start_date = datetime.now() - timedelta(days=generator.randint(0, 60))
+        moment = habit.start_date
+        for _ in range(generator.randint(0, 25)):
+            moment += timedelta(hours=generator.choice([1, 12, 23, 24, 25, 30, 24 * 8]))
+            habit.mark_complete(moment)
+        habits.append(habit)
+    return habits
+
+
+class TestColumnarAnalytics(unittest.TestCase):
+    """
+    The columnar engine must agree with analytics_module on every habit.
+    """
+
+    def setUp(self):
+        """
+        Create a mixed set of habits, including one with no completions.
+        """
+        self.habits = random_habits(40) + [Habit("Empty", "daily")]
+
+    def assert_matches_analytics(self, data):
+        """
+        Compare every columnar result with the object-based implementation.
+        """
+        self.assertEqual(columnar.completion_rates(data), analytics.completion_rates(self.habits))
+        self.assertEqual(columnar.largest_streak(data), analytics.largest_streak(self.habits))
+        self.assertEqual(columnar.broken_habits(data),
+                         [habit.title for habit in analytics.broken_habits(self.habits)])
+        self.assertEqual(columnar.rank_by_streak(data),
+                         [habit.title for habit in analytics.rank_by_streak(self.habits)])
+        self.assertEqual(columnar.overall_summary(data), analytics.overall_summary(self.habits))
+
+    def test_pure_python_engine(self):
+        """
+        Test the fallback that runs when NumPy is not installed.
+        """
+        with mock.patch.object(columnar, "np", None):
+            self.assert_matches_analytics(columnar.ColumnarHabits.from_habits(self.habits))
+
+    @unittest.skipIf(columnar.np is None, "NumPy is not installed")
+    def test_numpy_engine(self):
+        """
+        Test the vectorized engine.
+        """
+        self.assert_matches_analytics(columnar.ColumnarHabits.from_habits(self.habits))
+
+    def test_from_database(self):
+        """
+        Test that columns read from SQLite match the loaded Habit objects.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            storage = DatabaseHandler(os.path.join(directory, "test.db"))
+            for habit in self.habits:
+                storage.save_habit(habit)
+                for completion in habit.history:
+                    storage.record_completion(habit.title, completion)
+
+            data = columnar.ColumnarHabits.from_database(storage)
+            storage.close()
+
+        self.assertEqual(data.titles, [habit.title for habit in self.habits])
+        self.assert_matches_analytics(data)
+
+    def test_empty(self):
+        """
+        Test that an empty habit list gives an empty summary.
+        """
+        self.habits = []
+        self.assert_matches_analytics(columnar.ColumnarHabits.from_habits([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
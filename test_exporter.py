@@ -0,0 +1,143 @@
+# Test suite for the streaming exporter
+# import necessary built in modules
+import json
+import os
+import sqlite3
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime
+# import custom modules
+import benchmark
+import exporter
+from habit import Habit
+from history import from_micros
+from importer import import_completions
+from storage import DatabaseHandler
+
+
+class TestExporter(unittest.TestCase):
+    """
+    These tests export a synthetic database and read the files back.
+    """
+
+    def setUp(self):
+        """
+        Create a database of 12 habits with 40 completions each.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = self.path("test.db")
+        benchmark.build_database(self.db_path, 12, 40, seed=2)
+        storage = DatabaseHandler(self.db_path)
+        self.habits = {habit.title: habit for habit in storage.load_habits()}
+        storage.close()
+
+    def tearDown(self):
+        """
+        Remove the database and the exported files.
+        """
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def exported_events(self):
+        """
+        Every (title, completion time) pair of the database, in export order.
+        """
+        return [(title, moment) for title, habit in self.habits.items() for moment in habit.history]
+
+    def test_text_exports_round_trip_through_importer(self):
+        """
+        Test that CSV and JSONL exports re-import into another database unchanged.
+        """
+        for name in ("events.csv", "events.jsonl"):
+            written = exporter.export_database(self.db_path, self.path(name), chunk_size=7)
+            self.assertEqual(written, 480)
+
+            copy = DatabaseHandler(self.path(f"{name}.db"))
+            for title, habit in self.habits.items():
+                copy.save_habit(Habit(title, habit.frequency))
+            self.assertEqual(import_completions(copy, self.path(name)), (480, 480))
+            restored = {habit.title: list(habit.history) for habit in copy.load_habits()}
+            copy.close()
+            self.assertEqual(restored, {title: list(habit.history) for title, habit in self.habits.items()})
+
+    def test_habits_export(self):
+        """
+        Test that --habits writes one record per habit with its frequency and start date.
+        """
+        self.assertEqual(exporter.export_database(self.db_path, self.path("habits.jsonl"), habits=True), 12)
+        with open(self.path("habits.jsonl"), encoding="utf-8") as handle:
+            records = [json.loads(line) for line in handle]
+        self.assertEqual([record["title"] for record in records], list(self.habits))
+        for record in records:
+            habit = self.habits[record["title"]]
+            self.assertEqual(record["frequency"], habit.frequency)
+            self.assertEqual(datetime.fromisoformat(record["start_date"]), habit.start_date)
+
+        with self.assertRaises(ValueError):
+            exporter.export_database(self.db_path, self.path("habits.col"), habits=True)
+
+    def test_columnar_export_from_epoch_database(self):
+        """
+        Test that a columnar export of an epoch_us database holds every completion in chunks.
+        """
+        DatabaseHandler(self.db_path, timestamp_format="epoch_us").close()
+        self.assertEqual(exporter.export_database(self.db_path, self.path("events.col"), chunk_size=100), 480)
+
+        habits, chunks = exporter.read_columnar(self.path("events.col"))
+        titles = {habit_id: title for habit_id, title, _, _ in habits}
+        self.assertEqual(list(titles.values()), list(self.habits))
+
+        sizes = []
+        events = []
+        for columns in chunks:
+            sizes.append(len(columns["habit_id"]))
+            events.extend((titles[habit_id], from_micros(value))
+                          for habit_id, value in zip(columns["habit_id"], columns["completion_us"]))
+        self.assertEqual(sizes, [100, 100, 100, 100, 80])
+        self.assertEqual(events, self.exported_events())
+
+        # Text exports of the same database produce ISO timestamps
+        exporter.export_database(self.db_path, self.path("events.csv"))
+        with open(self.path("events.csv"), encoding="utf-8") as handle:
+            self.assertEqual(handle.readline().strip(), "title,timestamp")
+            title, timestamp = handle.readline().strip().split(",")
+        self.assertEqual((title, datetime.fromisoformat(timestamp)), self.exported_events()[0])
+
+    def test_memory_does_not_grow_with_database(self):
+        """
+        Test that exporting ten times as many completions needs about the same peak memory.
+        """
+        large_path = self.path("large.db")
+        benchmark.build_database(large_path, 12, 400, seed=2)
+
+        peaks = []
+        for db_path in (self.db_path, large_path):
+            tracemalloc.start()
+            exporter.export_database(db_path, self.path("out.csv"), chunk_size=50)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 2)
+
+    def test_path_with_uri_characters(self):
+        """
+        Test that a database whose path contains '#', '?' or '%' is exported.
+        """
+        folder = self.path("a#b?c%d")
+        os.mkdir(folder)
+        os.replace(self.db_path, os.path.join(folder, "test.db"))
+        self.assertEqual(exporter.export_database(os.path.join(folder, "test.db"), self.path("out.csv")), 480)
+
+    def test_missing_database_is_not_created(self):
+        """
+        Test that exporting from a missing file fails instead of creating an empty database.
+        """
+        with self.assertRaises(sqlite3.OperationalError):
+            exporter.export_database(self.path("missing.db"), self.path("out.csv"))
+        self.assertFalse(os.path.exists(self.path("missing.db")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# Test suite for the fleet report
+# import necessary built in modules
+import os
+import tempfile
+import unittest
+# import custom modules
+from storage import DatabaseHandler
+from test_columnar_analytics import random_habits
+import analytics_module as analytics
+import fleet
+
+
+class TestFleetReport(unittest.TestCase):
+    """
+    The merged fleet report must match analytics_module run over every user's habits together.
+    """
+
+    def setUp(self):
+        """
+        Create three user databases and one file that is not a database.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.habits = []
+        for user in range(3):
+            habits = random_habits(12, seed=user)
+            storage = DatabaseHandler(os.path.join(self.directory.name, f"user-{user}.db"))
+            for habit in habits:
+                storage.save_habit(habit)
+                storage.record_completions((habit.title, time) for time in habit.history)
+            storage.close()
+            self.habits.extend(habits)
+        self.broken_path = os.path.join(self.directory.name, "broken.db")
+        with open(self.broken_path, "w") as handle:
+            handle.write("not a database")
+
+    def tearDown(self):
+        """
+        Remove the temporary databases.
+        """
+        self.directory.cleanup()
+
+    def assert_report_matches(self, report):
+        """
+        Compare the report with the object-based analytics over all habits.
+        """
+        # Titles repeat across users, so compare per habit rather than through title-keyed results
+        self.assertEqual(report["files"], 3)
+        self.assertEqual(report["total_habits"], len(self.habits))
+        self.assertAlmostEqual(report["average_completion_rate"],
+                               sum(habit.completion_rate() for habit in self.habits) / len(self.habits))
+        self.assertEqual(report["strongest_streak"], analytics.largest_streak(self.habits))
+        self.assertEqual(report["broken_habits"], len(analytics.broken_habits(self.habits)))
+        self.assertEqual([streak for streak, _, _ in report["top_streaks"]],
+                         sorted((habit.calculate_current_streak() for habit in self.habits), reverse=True)[:5])
+        self.assertEqual(list(report["errors"]), [self.broken_path])
+
+    def test_process_pool(self):
+        """
+        Test the report computed by worker processes, one file per task.
+        """
+        paths = fleet.find_databases([self.directory.name])
+        self.assert_report_matches(fleet.fleet_report(paths, workers=2, top=5, shard_size=1))
+
+    def test_in_process(self):
+        """
+        Test that workers=0 gives the same report without a pool.
+        """
+        paths = fleet.find_databases([self.directory.name])
+        self.assert_report_matches(fleet.fleet_report(paths, workers=0, top=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -51,6 +51,40 @@ class TestHabit(unittest.TestCase):
 
         self.assertEqual(self.habit.get_last_completion_date(), t2)
 
+    # Ordering tests
+    def test_out_of_order_history(self):
+        """
+        Test that late entries are placed in order before the streak is counted.
+        """
+        base = datetime(2025, 1, 1, 8, 0)
+        self.habit.mark_complete(base + timedelta(days=2))
+        self.habit.mark_complete(base)
+        self.habit.mark_complete(base + timedelta(days=1))
+
+        self.assertEqual(list(self.habit.history), [base + timedelta(days=i) for i in range(3)])
+        self.assertEqual(self.habit.calculate_current_streak(), 3)
+        self.assertEqual(self.habit.get_last_completion_date(), base + timedelta(days=2))
+
+    # Streak caching tests
+    def test_incremental_streak_matches_recount(self):
+        """
+        Test that the streak maintained by mark_complete equals a full recount.
+        """
+        base = datetime(2025, 1, 1, 8, 0)
+        gaps = [0, 20, 30, 5, 50, 24, 24, 1, 30, 23]
+        moment = base
+        for hours in gaps:
+            moment += timedelta(hours=hours)
+            self.habit.mark_complete(moment)
+            cached = self.habit.calculate_current_streak()
+            self.assertEqual(cached, self.habit._count_streak(self.habit.history.micros))
+
+        # An earlier completion and a cleared history both force a recount
+        self.habit.mark_complete(base - timedelta(days=3))
+        self.assertEqual(self.habit.calculate_current_streak(), 2)
+        self.habit.clear_completion_history()
+        self.assertEqual(self.habit.calculate_current_streak(), 0)
+
     # Completion rate tests
     def test_completion_rate_daily(self):
         """
@@ -0,0 +1,70 @@
+# Test functions for the CompletionHistory container.
+# import necessary built in modules
+import unittest
+from datetime import datetime, timedelta
+# import custom modules
+from history import CompletionHistory, from_micros, history_clock, to_micros
+
+
+class TestCompletionHistory(unittest.TestCase):
+    """
+    These tests check that the history stays sorted and behaves like a list.
+    """
+
+    def setUp(self):
+        """
+        Create three completions one day apart.
+        """
+        self.t1 = datetime(2025, 1, 1, 8, 0)
+        self.t2 = self.t1 + timedelta(days=1)
+        self.t3 = self.t2 + timedelta(days=1, microseconds=7)
+
+    def test_round_trip(self):
+        """
+        Test that converting to microseconds and back is lossless.
+        """
+        self.assertEqual(from_micros(to_micros(self.t3)), self.t3)
+
+    def test_out_of_order_inserts_stay_sorted(self):
+        """
+        Test that completions added in any order are read back chronologically.
+        """
+        history = CompletionHistory()
+        history.append(self.t3)
+        history.append(self.t1)
+        history.append(self.t2)
+
+        self.assertEqual(list(history), [self.t1, self.t2, self.t3])
+        self.assertEqual(history.first(), self.t1)
+        self.assertEqual(history.last(), self.t3)
+
+    def test_range_queries(self):
+        """
+        Test counting and listing completions inside a half-open time range.
+        """
+        history = CompletionHistory([self.t1, self.t2, self.t3])
+
+        self.assertEqual(history.count_between(self.t1, self.t3), 2)
+        self.assertEqual(list(history.between(self.t2, self.t3 + timedelta(seconds=1))), [self.t2, self.t3])
+        self.assertIn(self.t2, history)
+        self.assertNotIn(self.t2 + timedelta(microseconds=1), history)
+
+    def test_extend_and_clear(self):
+        """
+        Test batch inserts and clearing, including the change counter.
+        """
+        history = CompletionHistory([self.t2])
+        created = history.version
+        history.extend([self.t3, self.t1])
+
+        self.assertEqual(history, [self.t1, self.t2, self.t3])
+        self.assertGreater(history.version, created)
+        self.assertEqual(history.version, history_clock())
+
+        history.clear()
+        self.assertEqual(len(history), 0)
+        self.assertIsNone(history.last())
+
+
+if __name__ == "__main__":
+    unittest.main()
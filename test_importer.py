@@ -0,0 +1,118 @@
+# Test suite for bulk completion import
+# import necessary built in modules
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+# import custom modules
+from habit import Habit
+from importer import EventError, import_completions
+from manager import HabitManager
+from storage import DatabaseHandler
+
+
+class TestBulkImport(unittest.TestCase):
+    """
+    These tests write events through the bulk API and the file importer.
+    """
+
+    def setUp(self):
+        """
+        Create a database with two habits.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "test.db")
+        self.storage = DatabaseHandler(self.db_path)
+        self.storage.save_habit(Habit("Read", "daily"))
+        self.storage.save_habit(Habit("Run", "weekly"))
+        self.base = datetime(2025, 1, 1, 7, 0)
+
+    def tearDown(self):
+        """
+        Close the connection and remove the temporary files.
+        """
+        self.storage.close()
+        self.directory.cleanup()
+
+    def test_record_completions_in_chunks(self):
+        """
+        Test that events spanning several chunks are all stored and unknown titles skipped.
+        """
+        events = [("Read", self.base + timedelta(days=i)) for i in range(25)]
+        events += [("Missing", self.base), ("Run", self.base)]
+
+        stored = self.storage.record_completions(iter(events), chunk_size=10)
+
+        self.assertEqual(stored, 26)
+        habits = {habit.title: habit for habit in self.storage.load_habits()}
+        self.assertEqual(len(habits["Read"].history), 25)
+        self.assertEqual(len(habits["Run"].history), 1)
+
+    def test_manager_updates_memory(self):
+        """
+        Test that the manager applies bulk completions to its in-memory habits.
+        """
+        self.storage.close()
+        manager = HabitManager(self.db_path)
+        stored = manager.record_completions(
+            [("Read", self.base + timedelta(days=1)), ("Read", self.base), ("Nope", self.base)]
+        )
+        habit = manager.get_habit_by_title("Read")
+        manager.close()
+        self.storage = DatabaseHandler(self.db_path)
+
+        self.assertEqual(stored, 2)
+        self.assertEqual(list(habit.history), [self.base, self.base + timedelta(days=1)])
+        self.assertEqual(habit.calculate_current_streak(), 2)
+
+    def test_import_csv_and_jsonl(self):
+        """
+        Test that both file formats are read and imported.
+        """
+        csv_path = os.path.join(self.directory.name, "events.csv")
+        with open(csv_path, "w", encoding="utf-8") as handle:
+            handle.write("title,timestamp\n")
+            handle.write(f"Read,{self.base.isoformat()}\n")
+            handle.write(f"Ghost,{self.base.isoformat()}\n")
+
+        jsonl_path = os.path.join(self.directory.name, "events.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps({"title": "Run", "timestamp": self.base.isoformat()}) + "\n")
+
+        self.assertEqual(import_completions(self.storage, csv_path), (2, 1))
+        self.assertEqual(import_completions(self.storage, jsonl_path), (1, 1))
+
+    def test_malformed_lines_stop_the_import(self):
+        """
+        Test that a bad timestamp or missing key reports its line and keeps the events before it.
+        """
+        csv_path = os.path.join(self.directory.name, "events.csv")
+        with open(csv_path, "w", encoding="utf-8") as handle:
+            handle.write("title,timestamp\n")
+            handle.write(f"Read,{self.base.isoformat()}\n")
+            handle.write("Read,yesterday\n")
+            handle.write(f"Read,{(self.base + timedelta(days=1)).isoformat()}\n")
+
+        jsonl_path = os.path.join(self.directory.name, "events.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps({"title": "Run", "timestamp": self.base.isoformat()}) + "\n")
+            handle.write("\n")
+            handle.write(json.dumps({"title": "Run"}) + "\n")
+
+        with self.assertRaises(EventError) as csv_error:
+            import_completions(self.storage, csv_path, chunk_size=10)
+        self.assertEqual((csv_error.exception.line, csv_error.exception.stored), (3, 1))
+
+        with self.assertRaises(EventError) as jsonl_error:
+            import_completions(self.storage, jsonl_path)
+        self.assertEqual((jsonl_error.exception.line, jsonl_error.exception.stored), (3, 1))
+        self.assertIn("missing 'timestamp'", str(jsonl_error.exception))
+
+        habits = {habit.title: habit for habit in self.storage.load_habits()}
+        self.assertEqual(len(habits["Read"].history), 1)
+        self.assertEqual(len(habits["Run"].history), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
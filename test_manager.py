@@ -1,7 +1,10 @@
 # Test suite for the manager module
 # import necessary built in modules
 import unittest
+from datetime import date, timedelta
+from unittest import mock
 # import custom modules
+import manager as manager_module
 from manager import HabitManager
 from habit import Habit
 
@@ -24,7 +27,7 @@ class FakeDatabaseHandler:
         self.saved_habits.append(habit)
         return True
 
-    def record_completion(self, title):
+    def record_completion(self, title, time=None):
         self.completions.append(title)
         return True
 
@@ -46,8 +49,12 @@ class TestableHabitManager(HabitManager):
     """
 
     def __init__(self):
+        # HabitManager.__init__ is skipped, so set the state it would have set
         self.storage = FakeDatabaseHandler()
-        self.habits = self.storage.load_habits()
+        self.history_loader = None
+        self.snapshot_path = None
+        self.generation = 0
+        self._set_habits(self.storage.load_habits())
 
 
 
@@ -99,6 +106,26 @@ class TestHabitManager(unittest.TestCase):
         self.assertTrue(self.manager.delete_habit("Meditate"))
         self.assertEqual(len(self.manager.habits), 0)
 
+    # Test the title index stays in step with changes
+    def test_title_index(self):
+        """
+        Test that lookups follow create, complete, delete and refresh.
+        """
+        self.manager.create_habit("Read", "daily")
+        self.manager.create_habit("Run", "weekly")
+
+        self.assertTrue(self.manager.has_habit("Read"))
+        self.assertTrue(self.manager.mark_habit_complete("Read"))
+        self.assertEqual(len(self.manager.get_habit_by_title("Read").history), 1)
+
+        self.manager.delete_habit("Read")
+        self.assertFalse(self.manager.has_habit("Read"))
+        self.assertIsNone(self.manager.get_habit_by_title("Read"))
+        self.assertEqual(self.manager.get_habit_titles(), ["Run"])
+
+        self.manager.refresh()
+        self.assertEqual(self.manager.get_habit_titles(), ["Run"])
+
     # Test frequency filter
     def test_filter_by_frequency(self):
         """
@@ -112,6 +139,71 @@ class TestHabitManager(unittest.TestCase):
         self.assertEqual(len(daily), 1)
         self.assertEqual(daily[0].title, "Read")
 
+    def test_habits_list_follows_changes(self):
+        """
+        Test that habits is one list kept in step with the title lookup.
+        """
+        habits = self.manager.habits
+        self.manager.create_habit("Read", "daily")
+        self.manager.create_habit("Run", "weekly")
+        self.manager.delete_habit("Read")
+
+        self.assertIs(self.manager.habits, habits)
+        self.assertEqual([habit.title for habit in habits], ["Run"])
+        self.assertIsNone(self.manager.get_habit_by_title("Read"))
+        self.assertIs(self.manager.get_habit_by_title("Run"), habits[0])
+
+    # Test memoized analytics
+    def test_analytics_are_memoized_until_a_change(self):
+        """
+        Test that repeated reads reuse the result and every kind of change invalidates it.
+        """
+        self.manager.create_habit("Read", "daily")
+        summary = mock.Mock(wraps=manager_module.overall_summary)
+
+        with mock.patch.object(manager_module, "overall_summary", summary):
+            first = self.manager.summary()
+            self.assertEqual(self.manager.summary(), first)
+            self.assertEqual(summary.call_count, 1)
+
+            # Through the manager
+            self.manager.mark_habit_complete("Read")
+            self.assertEqual(self.manager.summary()["strongest_streak"], 1)
+            self.assertEqual(summary.call_count, 2)
+
+            # Directly on a habit
+            self.manager.get_habit_by_title("Read").clear_completion_history()
+            self.assertEqual(self.manager.summary()["strongest_streak"], 0)
+            self.assertEqual(summary.call_count, 3)
+
+            # When the day rolls over
+            tomorrow = date.today() + timedelta(days=1)
+            with mock.patch.object(manager_module, "date", mock.Mock(today=lambda: tomorrow)):
+                self.manager.summary()
+            self.assertEqual(summary.call_count, 4)
+
+            self.manager.create_habit("Run", "weekly")
+            self.assertEqual(self.manager.summary()["total_habits"], 2)
+            self.assertEqual(summary.call_count, 5)
+
+    def test_memoized_results_are_copies(self):
+        """
+        Test that changing a returned list does not change the cached result.
+        """
+        self.manager.create_habit("Read", "daily")
+        self.manager.broken_habits().clear()
+        self.assertEqual(len(self.manager.broken_habits()), 1)
+
+    def test_memo_is_bounded(self):
+        """
+        Test that many distinct arguments keep at most memo_size cached results.
+        """
+        self.manager.create_habit("Read", "daily")
+        for index in range(1000):
+            self.manager.filter_by_frequency(f"frequency-{index}")
+            self.manager.largest_streak_for_habit(f"title-{index}")
+        self.assertEqual(len(self.manager._memo), self.manager.memo_size)
+
 
 
 if __name__ == '__main__':
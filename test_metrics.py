@@ -0,0 +1,83 @@
+# Test suite for the metrics module
+# import necessary built in modules
+import unittest
+# import custom modules
+import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    These tests enable recording only for their own duration.
+    """
+
+    def setUp(self):
+        """
+        Start every test with no timings and recording switched off.
+        """
+        self.was_enabled = metrics.is_enabled()
+        metrics.disable()
+        metrics.reset()
+
+    def tearDown(self):
+        """
+        Restore the recording switch.
+        """
+        metrics.reset()
+        if self.was_enabled:
+            metrics.enable()
+
+    def test_disabled_records_nothing(self):
+        """
+        Test that wrapped calls still work but leave no trace while disabled.
+        """
+        @metrics.timed("test.add")
+        def add(a, b):
+            return a + b
+
+        self.assertEqual(add(1, 2), 3)
+        with metrics.timer("test.block"):
+            pass
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_enabled_records_counts_and_histogram(self):
+        """
+        Test count, total, max and the cumulative histogram, including calls that raise.
+        """
+        @metrics.timed("test.fail")
+        def fail():
+            raise ValueError("boom")
+
+        metrics.enable()
+        metrics.record("test.op", 0.002)
+        metrics.record("test.op", 0.2)
+        with self.assertRaises(ValueError):
+            fail()
+
+        stats = metrics.snapshot()
+        self.assertEqual(stats["test.fail"]["count"], 1)
+        op = stats["test.op"]
+        self.assertEqual(op["count"], 2)
+        self.assertAlmostEqual(op["total"], 0.202)
+        self.assertEqual(op["max"], 0.2)
+        histogram = dict(op["histogram"])
+        self.assertEqual(histogram[0.001], 0)
+        self.assertEqual(histogram[0.005], 1)
+        self.assertEqual(histogram[0.5], 2)
+        self.assertEqual(histogram[float("inf")], 2)
+
+    def test_prometheus_export(self):
+        """
+        Test the text exposition format.
+        """
+        metrics.enable()
+        metrics.record("storage.save_habit", 0.003)
+        text = metrics.export_prometheus()
+
+        self.assertIn("# TYPE habit_operation_duration_seconds histogram", text)
+        self.assertIn('habit_operation_duration_seconds_bucket{operation="storage.save_habit",le="+Inf"} 1', text)
+        self.assertIn('habit_operation_duration_seconds_count{operation="storage.save_habit"} 1', text)
+        self.assertIn('habit_operation_duration_seconds_max{operation="storage.save_habit"} 0.003', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
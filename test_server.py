@@ -0,0 +1,147 @@
+# Test suite for the HTTP server mode
+# import necessary built in modules
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+# import custom modules
+from manager import HabitManager
+from server import create_server
+from storage import PooledDatabaseHandler
+
+
+class TestHabitServer(unittest.TestCase):
+    """
+    These tests start a real server on a free local port.
+    """
+
+    def setUp(self):
+        """
+        Serve an empty temporary database.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        storage = PooledDatabaseHandler(os.path.join(self.directory.name, "server.db"))
+        self.manager = HabitManager(storage=storage)
+        self.server = create_server(self.manager, "127.0.0.1", 0, workers=2)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=10)
+
+    def tearDown(self):
+        """
+        Stop the server and remove the database.
+        """
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.manager.close()
+        self.directory.cleanup()
+
+    def call(self, method, path, body=None):
+        """
+        Send one request and return (status, decoded JSON).
+        """
+        data = json.dumps(body) if body is not None else None
+        self.connection.request(method, path, body=data)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_habit_lifecycle(self):
+        """
+        Test create, duplicate create, complete, details and delete.
+        """
+        status, habit = self.call("POST", "/habits", {"title": "Read book", "frequency": "daily"})
+        self.assertEqual(status, 201)
+        self.assertEqual(habit["title"], "Read book")
+
+        status, _ = self.call("POST", "/habits", {"title": "Read book", "frequency": "daily"})
+        self.assertEqual(status, 409)
+
+        status, habit = self.call("POST", "/habits/Read%20book/complete")
+        self.assertEqual((status, habit["completions"], habit["current_streak"]), (200, 1, 1))
+
+        status, habits = self.call("GET", "/habits")
+        self.assertEqual([habit["title"] for habit in habits], ["Read book"])
+
+        status, _ = self.call("DELETE", "/habits/Read%20book")
+        self.assertEqual(status, 200)
+        status, _ = self.call("GET", "/habits/Read%20book")
+        self.assertEqual(status, 404)
+
+    def test_invalid_habit_bodies(self):
+        """
+        Test that bodies that are not an object with a text title are rejected with 400.
+        """
+        for body in ([1], "x", {"title": ["a"], "frequency": "daily"}, {"title": 5, "frequency": "daily"},
+                     {"title": "", "frequency": "daily"}):
+            status, _ = self.call("POST", "/habits", body)
+            self.assertEqual(status, 400, body)
+        self.assertEqual(self.manager.list_habits(), [])
+
+    def test_failed_delete(self):
+        """
+        Test that a delete the storage could not perform answers 500.
+        """
+        self.call("POST", "/habits", {"title": "Read", "frequency": "daily"})
+        with mock.patch.object(self.manager, "delete_habit", return_value=False):
+            status, _ = self.call("DELETE", "/habits/Read")
+        self.assertEqual(status, 500)
+
+    def test_analytics(self):
+        """
+        Test that analytics endpoints return the manager's results.
+        """
+        self.call("POST", "/habits", {"title": "Run", "frequency": "weekly"})
+        self.call("POST", "/habits/Run/complete")
+
+        status, summary = self.call("GET", "/analytics/summary")
+        self.assertEqual(status, 200)
+        self.assertEqual(summary, self.manager.summary())
+
+        status, streak = self.call("GET", "/analytics/streak?title=Run")
+        self.assertEqual(streak, {"title": "Run", "streak": 1})
+        self.assertEqual(self.call("GET", "/analytics/frequency?frequency=weekly")[1], ["Run"])
+        self.assertEqual(self.call("GET", "/analytics/nothing")[0], 404)
+
+    def test_metrics_endpoint(self):
+        """
+        Test that timings are served in Prometheus text format.
+        """
+        self.connection.request("GET", "/metrics")
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertTrue(response.getheader("Content-Type").startswith("text/plain"))
+        self.assertIn("# TYPE habit_operation_duration_seconds histogram", response.read().decode())
+
+    def test_idle_connections_do_not_block_requests(self):
+        """
+        Test that more idle keep-alive connections than workers neither block other
+        clients nor keep the server from shutting down.
+        """
+        idle = [http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=10) for _ in range(3)]
+        for client in idle:
+            self.addCleanup(client.close)
+            client.request("GET", "/habits")
+            self.assertEqual(client.getresponse().read(), b"[]")
+        self.assertEqual(self.call("GET", "/habits"), (200, []))
+
+        # A client that connects but never sends anything does not hold up shutdown either
+        silent = socket.create_connection(("127.0.0.1", self.server.server_port))
+        self.addCleanup(silent.close)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_idle_connection_timeout(self):
+        """
+        Test that a kept-alive connection is closed once it has been idle for the handler timeout.
+        """
+        self.server.RequestHandlerClass.timeout = 0.2
+        self.assertEqual(self.call("GET", "/habits"), (200, []))
+        self.assertEqual(self.connection.sock.recv(1), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
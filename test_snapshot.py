@@ -0,0 +1,146 @@
+# Test suite for warm-start snapshots
+# import necessary built in modules
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+# import custom modules
+from manager import HabitManager
+from storage import DatabaseHandler
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    These tests close and re-open managers on a temporary database.
+    """
+
+    def setUp(self):
+        """
+        Create a database with two habits, closed by a snapshot-writing manager.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "test.db")
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        manager.create_habit("Read", "daily")
+        manager.create_habit("Run", "weekly")
+        manager.mark_habit_complete("Read")
+        manager.record_completions([("Run", datetime(2025, 1, 1, 7, 0)), ("Run", datetime(2025, 1, 8, 7, 0))])
+        self.expected = self.describe(manager)
+        manager.close()
+
+    def tearDown(self):
+        """
+        Remove the database and its snapshot.
+        """
+        self.directory.cleanup()
+
+    def describe(self, manager):
+        """
+        Everything that must survive a restart.
+        """
+        return [
+            (habit.title, habit.frequency, habit.start_date, list(habit.history))
+            for habit in manager.list_habits()
+        ]
+
+    def open_without_full_load(self):
+        """
+        Open a manager that fails the test if it falls back to a full load.
+        """
+        with mock.patch.object(DatabaseHandler, "load_habits", side_effect=AssertionError("full load")):
+            return HabitManager(self.db_path, use_snapshot=True)
+
+    def test_valid_snapshot_is_used(self):
+        """
+        Test that an unchanged database starts from the snapshot with identical data.
+        """
+        self.assertTrue(os.path.exists(self.db_path + ".snapshot"))
+        manager = self.open_without_full_load()
+        self.assertEqual(self.describe(manager), self.expected)
+        fresh = HabitManager(self.db_path)
+        self.assertEqual(self.describe(manager), self.describe(fresh))
+        fresh.close()
+
+        # Writes after a snapshot start still work and are saved in the next snapshot
+        self.assertTrue(manager.mark_habit_complete("Run"))
+        expected = self.describe(manager)
+        manager.close()
+        manager = self.open_without_full_load()
+        self.assertEqual(self.describe(manager), expected)
+        manager.close()
+
+    def test_stale_snapshot_falls_back(self):
+        """
+        Test that changes made without the snapshot are noticed and loaded from the database.
+        """
+        storage = DatabaseHandler(self.db_path)
+        storage.record_completion("Read", datetime(2025, 2, 1))
+        storage.close()
+
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        self.assertEqual(len(manager.get_habit_by_title("Read").history), 2)
+        manager.close()
+
+        storage = DatabaseHandler(self.db_path)
+        storage.delete_habit("Run")
+        storage.close()
+
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        self.assertEqual(manager.get_habit_titles(), ["Read"])
+        manager.close()
+
+    def test_in_memory_edits_are_not_snapshotted(self):
+        """
+        Test that a history changed only in memory is not saved and trusted on the next start,
+        and that the snapshot taken before the change is removed.
+        """
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        manager.get_habit_by_title("Read").clear_completion_history()
+        manager.close()
+        self.assertFalse(os.path.exists(self.db_path + ".snapshot"))
+
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        self.assertEqual(len(manager.get_habit_by_title("Read").history), 1)
+        manager.close()
+
+    def test_rows_updated_in_place_are_noticed(self):
+        """
+        Test that another connection updating a completion time or a frequency invalidates the snapshot.
+        """
+        connection = sqlite3.connect(self.db_path)
+        connection.execute(
+            "UPDATE habit_history SET completion_time = ? WHERE id = (SELECT MIN(id) FROM habit_history)",
+            (datetime(2024, 6, 1, 9, 0).isoformat(),)
+        )
+        connection.commit()
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        expected = HabitManager(self.db_path)
+        self.assertEqual(self.describe(manager), self.describe(expected))
+        self.assertNotEqual(self.describe(manager), self.expected)
+        expected.close()
+        manager.close()
+
+        connection.execute("UPDATE habits SET frequency = 'weekly' WHERE title = 'Read'")
+        connection.commit()
+        connection.close()
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        self.assertEqual(manager.get_habit_by_title("Read").frequency, "weekly")
+        manager.close()
+
+    def test_damaged_snapshot_falls_back(self):
+        """
+        Test that a truncated snapshot is ignored.
+        """
+        path = self.db_path + ".snapshot"
+        with open(path, "r+b") as handle:
+            handle.truncate(os.path.getsize(path) - 4)
+
+        manager = HabitManager(self.db_path, use_snapshot=True)
+        self.assertEqual(self.describe(manager), self.expected)
+        manager.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
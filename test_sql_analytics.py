@@ -0,0 +1,152 @@
+# Test suite for the SQL analytics backend
+# import necessary built in modules
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+# import custom modules
+from habit import Habit
+from storage import DatabaseHandler
+from test_columnar_analytics import random_habits
+import analytics_module as analytics
+import sql_analytics
+
+
+class TestSqlAnalytics(unittest.TestCase):
+    """
+    Query results must agree with analytics_module on the same habits, in both timestamp formats.
+    """
+
+    def setUp(self):
+        """
+        Store a mixed set of habits, including one with no completions.
+        """
+        self.habits = random_habits(40) + [Habit("Empty", "daily")]
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = DatabaseHandler(os.path.join(self.directory.name, "test.db"))
+        for habit in self.habits:
+            self.storage.save_habit(habit)
+            self.storage.record_completions((habit.title, completion) for completion in habit.history)
+
+    def tearDown(self):
+        """
+        Close the connection and remove the temporary database.
+        """
+        self.storage.close()
+        self.directory.cleanup()
+
+    def assert_matches_analytics(self):
+        """
+        Compare every query result with the object-based implementation.
+        """
+        connection = self.storage.connection
+        aggregates = sql_analytics.habit_aggregates(connection)
+        self.assertEqual(list(aggregates), [habit.title for habit in self.habits])
+        for habit in self.habits:
+            self.assertEqual(aggregates[habit.title], {
+                "completion_count": len(habit.history),
+                "total_completed_days": habit.total_completed_days(),
+                "last_completion": habit.get_last_completion_date(),
+            })
+
+        self.assertEqual(sql_analytics.completion_rates(connection), analytics.completion_rates(self.habits))
+        self.assertEqual(sql_analytics.average_completion_rate(connection),
+                         analytics.average_completion_rate(self.habits))
+        self.assertEqual(sql_analytics.overall_summary(connection), analytics.overall_summary(self.habits))
+
+    def test_iso_timestamps(self):
+        """
+        Test against the default ISO text format.
+        """
+        self.assert_matches_analytics()
+
+    def test_epoch_timestamps(self):
+        """
+        Test against integer epoch-microsecond timestamps.
+        """
+        self.storage.convert_timestamps("epoch_us")
+        self.assert_matches_analytics()
+
+    def test_empty_database(self):
+        """
+        Test that an empty database gives an empty summary.
+        """
+        for habit in self.habits:
+            self.storage.delete_habit(habit.title)
+        self.habits = []
+        self.assert_matches_analytics()
+
+
+class TestSqlStreakParity(unittest.TestCase):
+    """
+    The window query must give the same streaks and broken flags as analytics_module.habit_statistics.
+    """
+
+    def setUp(self):
+        """
+        Open an empty temporary database.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = DatabaseHandler(os.path.join(self.directory.name, "test.db"))
+
+    def tearDown(self):
+        """
+        Close the connection and remove the temporary database.
+        """
+        self.storage.close()
+        self.directory.cleanup()
+
+    def habit(self, title, frequency, start, offsets):
+        """
+        Build a habit started at start and completed at each (start + offset).
+        """
+        habit = Habit(title, frequency)
+        habit.start_date = start
+        for offset in offsets:
+            habit.mark_complete(start + offset)
+        return habit
+
+    def assert_parity(self, habits):
+        """
+        Store the habits in both timestamp formats and compare with the Python statistics.
+        """
+        for habit in habits:
+            self.storage.save_habit(habit)
+            # Stored in reverse so the query cannot rely on insertion order
+            for completion in reversed(list(habit.history)):
+                self.storage.record_completion(habit.title, completion)
+
+        expected = {}
+        for habit in habits:
+            stats = analytics.habit_statistics(habit)
+            expected[habit.title] = {key: stats[key] for key in ("current_streak", "longest_streak", "broken")}
+
+        self.assertEqual(sql_analytics.streak_statistics(self.storage.connection), expected)
+        self.storage.convert_timestamps("epoch_us")
+        self.assertEqual(sql_analytics.streak_statistics(self.storage.connection), expected)
+
+    def test_random_histories(self):
+        """
+        Test many daily and weekly habits with random gaps.
+        """
+        self.assert_parity(random_habits(60, seed=11))
+
+    def test_edge_cases(self):
+        """
+        Test exact period boundaries, duplicate timestamps, late first completions and empty habits.
+        """
+        start = datetime(2025, 3, 1, 8, 0)
+        day, week = timedelta(days=1), timedelta(weeks=1)
+        self.assert_parity([
+            self.habit("exact-day", "daily", start, [day, 2 * day, 3 * day]),
+            self.habit("just-over", "daily", start, [day, 2 * day + timedelta(microseconds=1)]),
+            self.habit("duplicates", "daily", start, [timedelta(hours=1)] * 3),
+            self.habit("late-start", "daily", start, [3 * day, 3 * day + timedelta(hours=5)]),
+            self.habit("weekly", "weekly", start, [week, 2 * week, 4 * week, 5 * week, 6 * week]),
+            self.habit("long-then-short", "daily", start, [day, 2 * day, 3 * day, 9 * day]),
+            self.habit("empty", "daily", start, []),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
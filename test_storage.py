@@ -0,0 +1,574 @@
+# Test suite for the storage module
+# import necessary built in modules
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+# import custom modules
+from habit import Habit
+from manager import HabitManager
+from test_columnar_analytics import random_habits
+import analytics_module as analytics
+from storage import DatabaseHandler, LazyHistoryLoader, PooledDatabaseHandler, SCHEMA_VERSION
+
+
+class TestDatabaseHandler(unittest.TestCase):
+    """
+    These tests run the DatabaseHandler against a temporary SQLite file.
+    """
+
+    def setUp(self):
+        """
+        Create an empty database before each test runs.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "test.db")
+        self.storage = DatabaseHandler(self.db_path)
+
+    def tearDown(self):
+        """
+        Close the connection and remove the temporary database.
+        """
+        self.storage.close()
+        self.directory.cleanup()
+
+    # Loading tests
+    def test_load_habits_with_history(self):
+        """
+        Test that every habit comes back with its own completions in insertion order.
+        """
+        self.storage.save_habit(Habit("Read", "daily"))
+        self.storage.save_habit(Habit("Run", "weekly"))
+
+        t1 = datetime(2025, 1, 1, 9, 30)
+        t2 = datetime(2025, 1, 2, 7, 15, 0, 123456)
+        self.storage.record_completion("Read", t1)
+        self.storage.record_completion("Run", t2)
+        self.storage.record_completion("Read", t2)
+
+        habits = {habit.title: habit for habit in self.storage.load_habits()}
+
+        self.assertEqual(list(habits), ["Read", "Run"])
+        self.assertEqual(list(habits["Read"].history), [t1, t2])
+        self.assertEqual(list(habits["Run"].history), [t2])
+        self.assertEqual(habits["Run"].frequency, "weekly")
+
+    def test_load_habits_without_history(self):
+        """
+        Test that a habit with no completions loads with an empty history.
+        """
+        habit = Habit("Meditate", "daily")
+        habit.start_date = datetime.now() - timedelta(days=3)
+        self.storage.save_habit(habit)
+
+        loaded = self.storage.load_habits()
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].start_date, habit.start_date)
+        self.assertEqual(len(loaded[0].history), 0)
+
+    def test_lazy_histories_are_bounded(self):
+        """
+        Test that lazy habits read their history on first access and the oldest is unloaded.
+        """
+        t1 = datetime(2025, 1, 1, 9, 30)
+        for title in ("Read", "Run", "Swim"):
+            self.storage.save_habit(Habit(title, "daily"))
+            self.storage.record_completion(title, t1)
+
+        loader = LazyHistoryLoader(self.storage, max_histories=2)
+        read, run, swim = self.storage.load_habits(loader)
+        self.assertFalse(read.history_loaded)
+
+        self.assertEqual(list(read.history), [t1])
+        self.assertEqual(list(run.history), [t1])
+        read.history
+        self.assertEqual(list(swim.history), [t1])
+
+        # Run was the least recently used
+        self.assertEqual(len(loader), 2)
+        self.assertTrue(read.history_loaded)
+        self.assertFalse(run.history_loaded)
+        self.assertEqual(run.calculate_current_streak(), 1)
+        self.assertTrue(run.history_loaded)
+
+    def test_lazy_manager_does_not_duplicate_completions(self):
+        """
+        Test that completing an unloaded habit is only read back from storage once.
+        """
+        self.storage.save_habit(Habit("Read", "daily"))
+        manager = HabitManager(storage=self.storage, lazy=True, max_loaded_histories=1)
+        manager.create_habit("Run", "daily")
+
+        self.assertTrue(manager.mark_habit_complete("Read"))
+        self.assertTrue(manager.mark_habit_complete("Run"))
+        self.assertEqual(len(manager.get_habit_by_title("Read").history), 1)
+        self.assertTrue(manager.mark_habit_complete("Read"))
+        self.assertEqual(len(manager.get_habit_by_title("Read").history), 2)
+        self.assertEqual(len(manager.get_habit_by_title("Run").history), 1)
+
+    def test_manager_analytics_use_one_source(self):
+        """
+        Test that an eager manager answers from memory and a lazy one from habit_stats.
+        """
+        self.storage.save_habit(Habit("Read", "daily"))
+        self.storage.record_completion("Read")
+        manager = HabitManager(storage=self.storage)
+        manager.get_habit_by_title("Read").clear_completion_history()
+
+        self.assertEqual(manager.summary()["strongest_streak"], 0)
+        self.assertEqual(manager.largest_streak(), manager.largest_streak_for_habit("Read"))
+        self.assertEqual(manager.get_completion_rates(), {"Read": 0.0})
+
+        lazy = HabitManager(storage=self.storage, lazy=True)
+        with mock.patch.object(self.storage, "load_history", side_effect=AssertionError):
+            self.assertEqual(lazy.summary()["strongest_streak"], 1)
+
+    def test_mixed_case_frequency(self):
+        """
+        Test that a frequency stored as 'Daily' gives the same statistics eagerly and lazily.
+        """
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=6)
+        self.storage.connection.execute(
+            "INSERT INTO habits (title, frequency, start_date) VALUES ('Read', 'Daily', ?)",
+            (start.isoformat(),)
+        )
+        self.storage.connection.commit()
+        for day in range(4, 7):
+            self.storage.record_completion("Read", start + timedelta(days=day, hours=8))
+
+        self.assertEqual(self.storage.load_habit_stats()["Read"]["frequency"], "daily")
+        eager = HabitManager(storage=self.storage)
+        lazy = HabitManager(storage=self.storage, lazy=True)
+        self.assertEqual(lazy.largest_streak(), 3)
+        self.assertEqual(lazy.largest_streak(), eager.largest_streak())
+        self.assertEqual(lazy.get_completion_rates(), eager.get_completion_rates())
+
+    # Schema tests
+    def test_new_database_is_fully_migrated(self):
+        """
+        Test that a fresh database reports the latest schema version.
+        """
+        version = self.storage.connection.execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, SCHEMA_VERSION)
+
+    def test_duplicate_title_is_rejected(self):
+        """
+        Test that the UNIQUE title index makes a second save with the same title fail.
+        """
+        self.assertTrue(self.storage.save_habit(Habit("Read", "daily")))
+        self.assertFalse(self.storage.save_habit(Habit("Read", "weekly")))
+        self.assertEqual(len(self.storage.load_habits()), 1)
+
+    def test_history_lookup_uses_index(self):
+        """
+        Test that per-habit history queries are answered from an index.
+        """
+        plan = self.storage.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT completion_time FROM habit_history WHERE habit_id = 1"
+        ).fetchall()
+        self.assertIn("idx_history_habit_time", " ".join(row[-1] for row in plan))
+
+    def test_legacy_database_is_upgraded(self):
+        """
+        Test that an unversioned file with duplicate titles is merged and upgraded in place.
+        """
+        legacy_path = os.path.join(self.directory.name, "legacy.db")
+        connection = sqlite3.connect(legacy_path)
+        connection.executescript("""
+            CREATE TABLE habits (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                                 frequency TEXT NOT NULL, start_date TEXT NOT NULL);
+            CREATE TABLE habit_history (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                        habit_id INTEGER NOT NULL, completion_time TEXT NOT NULL);
+            INSERT INTO habits VALUES (1, 'Read', 'daily', '2025-01-01T08:00:00');
+            INSERT INTO habits VALUES (2, 'Read', 'daily', '2025-01-02T08:00:00');
+            INSERT INTO habit_history VALUES (1, 1, '2025-01-01T09:00:00');
+            INSERT INTO habit_history VALUES (2, 2, '2025-01-02T09:00:00');
+        """)
+        connection.close()
+
+        upgraded = DatabaseHandler(legacy_path)
+        habits = upgraded.load_habits()
+        version = upgraded.connection.execute("PRAGMA user_version").fetchone()[0]
+        upgraded.close()
+
+        self.assertEqual(version, SCHEMA_VERSION)
+        self.assertEqual([habit.title for habit in habits], ["Read"])
+        self.assertEqual(len(habits[0].history), 2)
+
+    # Timestamp format tests
+    def test_convert_to_epoch_keeps_history(self):
+        """
+        Test that converting to integer timestamps keeps every completion intact.
+        """
+        self.storage.save_habit(Habit("Read", "daily"))
+        t1 = datetime(2025, 3, 1, 6, 0)
+        t2 = datetime(2025, 3, 2, 6, 0, 0, 999999)
+        self.storage.record_completion("Read", t1)
+
+        self.storage.convert_timestamps("epoch_us")
+        self.storage.record_completion("Read", t2)
+
+        stored = self.storage.connection.execute(
+            "SELECT typeof(completion_time) FROM habit_history"
+        ).fetchall()
+        self.assertEqual(stored, [("integer",), ("integer",)])
+        self.assertEqual(list(self.storage.load_habits()[0].history), [t1, t2])
+
+        # The rebuilt table still bumps the change counter when a row is updated in place
+        watermark = self.storage.snapshot_watermark()
+        self.storage.connection.execute("UPDATE habit_history SET completion_time = completion_time + 1")
+        self.assertNotEqual(self.storage.snapshot_watermark(), watermark)
+
+    def test_convert_keeps_sequence_of_empty_history(self):
+        """
+        Test that ids of deleted completions are not reused after converting an empty history.
+        """
+        self.storage.save_habit(Habit("Read", "daily"))
+        for day in range(1, 6):
+            self.storage.record_completion("Read", datetime(2025, 3, day))
+        self.storage.connection.execute("DELETE FROM habit_history")
+        self.storage.connection.commit()
+
+        self.storage.convert_timestamps("epoch_us")
+        self.storage.record_completion("Read", datetime(2025, 3, 6))
+
+        row_id = self.storage.connection.execute("SELECT id FROM habit_history").fetchone()[0]
+        self.assertEqual(row_id, 6)
+        sequences = self.storage.connection.execute(
+            "SELECT COUNT(*) FROM sqlite_sequence WHERE name = 'habit_history'"
+        ).fetchone()[0]
+        self.assertEqual(sequences, 1)
+
+    def test_timestamp_format_is_persisted(self):
+        """
+        Test that a reopened database remembers and can undo the chosen format.
+        """
+        self.storage.close()
+        self.storage = DatabaseHandler(self.db_path, timestamp_format="epoch_us")
+        self.storage.save_habit(Habit("Read", "daily"))
+        self.storage.record_completion("Read", datetime(2025, 3, 1, 6, 0))
+        self.storage.close()
+
+        self.storage = DatabaseHandler(self.db_path)
+        self.assertEqual(self.storage.timestamp_format, "epoch_us")
+
+        self.storage.convert_timestamps("iso")
+        stored = self.storage.connection.execute("SELECT completion_time FROM habit_history").fetchall()
+        self.assertEqual(stored, [("2025-03-01T06:00:00",)])
+
+    def test_unknown_timestamp_format(self):
+        """
+        Test that an unsupported format name is rejected.
+        """
+        with self.assertRaises(ValueError):
+            self.storage.convert_timestamps("unix")
+
+    # Durability tests
+    def test_group_commit(self):
+        """
+        Test that group mode uses WAL and only commits on batch size, flush or close.
+        """
+        self.storage.close()
+        self.storage = DatabaseHandler(self.db_path, durability="group",
+                                       commit_interval=3600, commit_batch=3)
+        journal = self.storage.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(journal, "wal")
+
+        observer = sqlite3.connect(self.db_path)
+        count = "SELECT COUNT(*) FROM habit_history"
+
+        self.storage.save_habit(Habit("Read", "daily"))
+        self.storage.record_completion("Read")
+        self.assertEqual(observer.execute(count).fetchone()[0], 0)
+
+        self.storage.record_completion("Read")
+        self.assertEqual(observer.execute(count).fetchone()[0], 2)
+
+        self.storage.record_completions([("Read", datetime(2025, 1, 1))])
+        self.assertEqual(observer.execute(count).fetchone()[0], 2)
+        self.storage.flush()
+        self.assertEqual(observer.execute(count).fetchone()[0], 3)
+
+        self.storage.record_completion("Read")
+        self.storage.close()
+        self.assertEqual(observer.execute(count).fetchone()[0], 4)
+        observer.close()
+        self.storage = DatabaseHandler(self.db_path)
+
+    def test_failed_writes_are_undone(self):
+        """
+        Test that a completion or deletion failing halfway leaves nothing behind, in both
+        durability modes, while other pending group-commit writes are kept.
+        """
+        t1 = datetime(2025, 1, 1, 8, 0)
+        for durability in ("full", "group"):
+            self.storage.close()
+            os.remove(self.db_path)
+            self.storage = DatabaseHandler(self.db_path, durability=durability, commit_interval=3600)
+            self.storage.save_habit(Habit("Read", "daily"))
+            self.storage.record_completion("Read", t1)
+
+            with mock.patch.object(self.storage, "_add_to_rollups", side_effect=sqlite3.OperationalError):
+                self.assertFalse(self.storage.record_completion("Read", datetime(2025, 1, 2, 8, 0)))
+            self.storage.connection.execute(
+                "CREATE TEMP TRIGGER keep_habits BEFORE DELETE ON main.habits BEGIN SELECT RAISE(ABORT, 'kept'); END"
+            )
+            self.assertFalse(self.storage.delete_habit("Read"))
+            self.storage.connection.execute("DROP TRIGGER keep_habits")
+            self.storage.flush()
+
+            self.assertEqual(list(self.storage.load_habits()[0].history), [t1])
+            self.assertEqual(self.storage.load_habit_stats()["Read"]["completion_count"], 1)
+            self.assertEqual(self.storage.completions_between("Read", date(2025, 1, 1), date(2025, 1, 7)), 1)
+
+    # Statistics table tests
+    def assert_stats_match(self, habits):
+        """
+        Compare habit_stats with the statistics computed from the Habit objects.
+        """
+        stats = self.storage.load_habit_stats()
+        self.assertEqual(list(stats), [habit.title for habit in habits])
+        for habit in habits:
+            expected = analytics.habit_statistics(habit)
+            row = stats[habit.title]
+            for key in ("completion_count", "total_completed_days", "last_completion",
+                        "current_streak", "longest_streak", "broken"):
+                self.assertEqual(row[key], expected[key], (habit.title, key))
+        self.assertEqual(analytics.overall_summary_from_stats(stats), analytics.overall_summary(habits))
+
+    def test_stats_follow_single_and_bulk_writes(self):
+        """
+        Test that habit_stats stays correct for in-order, out-of-order and bulk completions.
+        """
+        habits = random_habits(30, seed=3)
+        for index, habit in enumerate(habits):
+            self.storage.save_habit(habit)
+            completions = list(habit.history)
+            if index % 3 == 0:
+                self.storage.record_completions((habit.title, time) for time in completions)
+            elif index % 3 == 1:
+                for time in reversed(completions):
+                    self.storage.record_completion(habit.title, time)
+            else:
+                for time in completions:
+                    self.storage.record_completion(habit.title, time)
+        self.assert_stats_match(habits)
+
+    def test_backfill_rebuilds_stats_once_per_habit(self):
+        """
+        Test that importing older completions in many chunks rebuilds each habit's statistics once.
+        """
+        habits = random_habits(6, seed=8)
+        for habit in habits:
+            self.storage.save_habit(habit)
+            completions = list(habit.history)
+            if completions:
+                self.storage.record_completion(habit.title, completions[-1])
+        events = [(habit.title, time) for habit in habits for time in reversed(list(habit.history)[:-1])]
+
+        with mock.patch.object(self.storage, "_rebuild_stats", wraps=self.storage._rebuild_stats) as rebuild:
+            self.storage.record_completions(events, chunk_size=3)
+        rebuilt = [call.args[0] for call in rebuild.call_args_list]
+        self.assertEqual(len(rebuilt), len(set(rebuilt)))
+        self.assert_stats_match(habits)
+
+    def test_stats_are_backfilled_on_upgrade(self):
+        """
+        Test that a database from before the statistics table gets it filled in when opened.
+        """
+        habits = random_habits(10, seed=5)
+        for habit in habits:
+            self.storage.save_habit(habit)
+            self.storage.record_completions((habit.title, time) for time in habit.history)
+        self.storage.connection.executescript("DROP TABLE habit_stats; PRAGMA user_version = 3;")
+        self.storage.close()
+
+        self.storage = DatabaseHandler(self.db_path)
+        self.assert_stats_match(habits)
+
+    # Rollup tests
+    def assert_rollups_match(self, habits):
+        """
+        Compare range queries over the rollups with a search of each habit's history.
+        """
+        generator = random.Random(11)
+        for habit in habits:
+            first = habit.start_date.date() - timedelta(days=3)
+            last = habit.history.last().date() if habit.history else first
+            ranges = [(first, last), (last, first)]
+            for _ in range(20):
+                start = first + timedelta(days=generator.randint(0, (last - first).days + 3))
+                ranges.append((start, start + timedelta(days=generator.randint(0, 40))))
+            for start, end in ranges:
+                self.assertEqual(self.storage.completions_between(habit.title, start, end),
+                                 analytics.completions_between(habit, start, end), (habit.title, start, end))
+                self.assertEqual(self.storage.completed_days_between(habit.title, start, end),
+                                 analytics.total_completed_days_between(habit, start, end))
+                self.assertEqual(analytics.completion_rate_between(habit, start, end, self.storage),
+                                 analytics.completion_rate_between(habit, start, end))
+
+            # The whole life of a habit gives the plain figures
+            end = max(last, habit.start_date.date())
+            self.assertEqual(analytics.total_completed_days_between(habit, first, end, self.storage),
+                             habit.total_completed_days())
+            self.assertEqual(analytics.completion_rate_between(habit, first, end, self.storage),
+                             habit.completion_rate(datetime.combine(end, datetime.min.time())))
+
+    def test_rollups_follow_single_and_bulk_writes(self):
+        """
+        Test that range queries read from the rollups match the raw history.
+        """
+        habits = random_habits(30, seed=4)
+        for index, habit in enumerate(habits):
+            self.storage.save_habit(habit)
+            completions = list(habit.history)
+            if index % 2:
+                self.storage.record_completions((habit.title, time) for time in completions)
+            else:
+                for time in reversed(completions):
+                    self.storage.record_completion(habit.title, time)
+        self.assert_rollups_match(habits)
+
+        self.storage.delete_habit(habits[0].title)
+        for table in ("habit_daily", "habit_weekly"):
+            orphans = self.storage.connection.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE habit_id NOT IN (SELECT id FROM habits)"
+            ).fetchone()[0]
+            self.assertEqual(orphans, 0)
+
+    def test_rollups_are_backfilled_on_upgrade(self):
+        """
+        Test that a database from before the rollup tables gets them filled in when opened.
+        """
+        habits = random_habits(10, seed=6)
+        for habit in habits:
+            self.storage.save_habit(habit)
+            self.storage.record_completions((habit.title, time) for time in habit.history)
+        self.storage.connection.executescript(
+            "DROP TABLE habit_daily; DROP TABLE habit_weekly; PRAGMA user_version = 4;"
+        )
+        self.storage.close()
+
+        self.storage = DatabaseHandler(self.db_path)
+        self.assert_rollups_match(habits)
+
+    # Deletion tests
+    def test_delete_habit_removes_history(self):
+        """
+        Test that deleting a habit also deletes its completions.
+        """
+        self.storage.save_habit(Habit("Read", "daily"))
+        self.storage.record_completion("Read")
+
+        self.assertTrue(self.storage.delete_habit("Read"))
+        self.assertFalse(self.storage.delete_habit("Read"))
+        self.assertEqual(self.storage.load_habits(), [])
+        self.assertEqual(self.storage.load_habit_stats(), {})
+
+
+class TestPooledDatabaseHandler(unittest.TestCase):
+    """
+    These tests share one pooled handler between several threads.
+    """
+
+    def setUp(self):
+        """
+        Create a pooled handler with two read connections.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = PooledDatabaseHandler(os.path.join(self.directory.name, "pool.db"), pool_size=2)
+
+    def tearDown(self):
+        """
+        Close every connection and remove the database.
+        """
+        self.storage.close()
+        self.directory.cleanup()
+
+    def test_rejects_memory_database(self):
+        """
+        Test that a pool cannot be built over a private in-memory database.
+        """
+        with self.assertRaises(ValueError):
+            PooledDatabaseHandler(":memory:")
+
+    def test_refresh_sees_unflushed_writes(self):
+        """
+        Test that a manager refresh over group commit keeps pending creates and deletes.
+        """
+        storage = PooledDatabaseHandler(os.path.join(self.directory.name, "group.db"),
+                                        durability="group", commit_interval=60)
+        manager = HabitManager(storage=storage)
+        try:
+            manager.create_habit("Read", "daily")
+            manager.mark_habit_complete("Read")
+            manager.refresh()
+            self.assertEqual(len(manager.get_habit_by_title("Read").history), 1)
+
+            manager.create_habit("Gone", "daily")
+            storage.flush()
+            manager.delete_habit("Gone")
+            manager.refresh()
+            self.assertEqual(manager.get_habit_titles(), ["Read"])
+            self.assertFalse(manager.mark_habit_complete("Gone"))
+            orphans = storage.connection.execute(
+                "SELECT COUNT(*) FROM habit_history WHERE habit_id NOT IN (SELECT id FROM habits)"
+            ).fetchone()[0]
+            self.assertEqual(orphans, 0)
+        finally:
+            manager.close()
+
+    def test_path_with_uri_characters(self):
+        """
+        Test that readers open the right file when its path contains '#', '?' or '%'.
+        """
+        folder = os.path.join(self.directory.name, "a#b?c%d")
+        os.mkdir(folder)
+        storage = PooledDatabaseHandler(os.path.join(folder, "x.db"))
+        try:
+            storage.save_habit(Habit("Read", "daily"))
+            self.assertEqual([habit.title for habit in storage.load_habits()], ["Read"])
+        finally:
+            storage.close()
+
+    def test_concurrent_writers_and_readers(self):
+        """
+        Test that parallel writes are all stored while other threads keep reading.
+        """
+        for index in range(4):
+            self.storage.save_habit(Habit(f"habit-{index}", "daily"))
+        errors = []
+
+        def write(index):
+            try:
+                for day in range(50):
+                    self.storage.record_completion(f"habit-{index}", datetime(2025, 1, 1) + timedelta(days=day))
+            except Exception as error:  # surfaced by the assertion below
+                errors.append(error)
+
+        def read():
+            try:
+                for _ in range(20):
+                    self.assertEqual(len(self.storage.load_habits()), 4)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=write, args=(index,)) for index in range(4)]
+        threads += [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(all(len(habit.history) == 50 for habit in self.storage.load_habits()))
+        self.assertLessEqual(len(self.storage._all_readers), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+# Test suite for the multi-tenant manager cache
+# import necessary built in modules
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+# import custom modules
+from manager import HabitManager
+from storage import PooledDatabaseHandler
+from tenants import TenantManagers
+
+
+class TestTenantManagers(unittest.TestCase):
+    """
+    These tests give every user a database in a temporary folder.
+    """
+
+    def setUp(self):
+        """
+        Create a tenant cache that keeps two managers open.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.tenants = TenantManagers(self.directory.name, max_open=2)
+
+    def tearDown(self):
+        """
+        Close all managers and remove the databases.
+        """
+        self.tenants.close()
+        self.directory.cleanup()
+
+    def test_users_are_isolated(self):
+        """
+        Test that each user gets their own database file.
+        """
+        with self.tenants.use("alice") as manager:
+            manager.create_habit("Read", "daily")
+        with self.tenants.use("bob") as manager:
+            self.assertEqual(manager.get_habit_titles(), [])
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "alice.db")))
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "bob.db")))
+
+    def test_least_recently_used_is_closed_and_reopened(self):
+        """
+        Test that a cold manager is closed on eviction and re-opened with its data on access.
+        """
+        with self.tenants.use("alice") as alice:
+            alice.create_habit("Read", "daily")
+            alice.mark_habit_complete("Read")
+        with self.tenants.use("bob"):
+            pass
+        with self.tenants.use("alice"):
+            pass
+        with self.tenants.use("carol"):
+            pass
+
+        # bob was the least recently used
+        self.assertEqual(len(self.tenants), 2)
+        self.assertFalse(self.tenants.is_open("bob"))
+        with self.tenants.use("bob"):
+            pass
+        self.assertFalse(self.tenants.is_open("alice"))
+        with self.assertRaises(sqlite3.ProgrammingError):
+            alice.storage.connection.execute("SELECT 1")
+
+        with self.tenants.use("alice") as manager:
+            self.assertEqual(len(manager.get_habit_by_title("Read").history), 1)
+
+    def test_pinned_managers_are_not_closed(self):
+        """
+        Test that a manager in use survives eviction pressure and is closed once released.
+        """
+        with self.tenants.use("alice") as alice:
+            for user in ("bob", "carol", "dave"):
+                with self.tenants.use(user):
+                    pass
+            self.assertTrue(self.tenants.is_open("alice"))
+            self.assertTrue(alice.create_habit("Still open", "daily"))
+        self.assertLessEqual(len(self.tenants), 2)
+
+    def test_managers_can_be_used_from_other_threads(self):
+        """
+        Test that the default managers work from a thread other than the one that opened them.
+        """
+        with self.tenants.use("alice") as manager:
+            manager.create_habit("Read", "daily")
+
+        results = []
+        def complete():
+            with self.tenants.use("alice") as manager:
+                results.append(manager.mark_habit_complete("Read"))
+        worker = threading.Thread(target=complete)
+        worker.start()
+        worker.join()
+        self.assertEqual(results, [True])
+
+    def test_slow_open_does_not_block_other_users(self):
+        """
+        Test that one user's manager being opened does not hold up other users.
+        """
+        opening = threading.Event()
+        release = threading.Event()
+
+        def factory(path):
+            if path.endswith("slow.db"):
+                opening.set()
+                release.wait(5)
+            return HabitManager(path, storage=PooledDatabaseHandler(path))
+
+        tenants = TenantManagers(self.directory.name, max_open=2, manager_factory=factory)
+        def open_slow():
+            with tenants.use("slow"):
+                pass
+        slow = threading.Thread(target=open_slow)
+        slow.start()
+        self.assertTrue(opening.wait(5))
+        try:
+            with tenants.use("fast") as manager:
+                self.assertTrue(manager.create_habit("Read", "daily"))
+            self.assertTrue(slow.is_alive())
+        finally:
+            release.set()
+            slow.join()
+        tenants.close()
+
+    def test_invalid_user_id(self):
+        """
+        Test that user ids cannot escape the tenant folder.
+        """
+        for user_id in ("../etc", "a/b", "", ".."):
+            with self.assertRaises(ValueError):
+                with self.tenants.use(user_id):
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()